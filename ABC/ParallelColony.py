@@ -0,0 +1,182 @@
+import importlib
+import multiprocessing
+import random
+from array import array
+from typing import Dict, List, Optional, Union
+from utils.cohort import Cohort
+from utils.sharedCohort import SharedCohort, SharedCohortHandle, attach_cohort
+from utils.swapEvaluator import SwapEvaluator
+from utils.fitnessCache import FitnessCache
+from utils.randomness import spawn_seeds
+
+
+def _shard_main(connection, cohort: Union[Cohort, SharedCohortHandle], num_groups: int, bees: List[int], limit: int, module_name: str, with_preferences: bool, seed: int,
+                initial: Optional[Dict[int, array]] = None) -> None:
+    """
+    לולאת תהליך עבודה שמחזיק חלק מהדבורים (shard) לאורך כל הריצה.
+    כל דבורה היא SwapEvaluator, כך שהיצירה, ההערכה והקבלה החמדנית של שכנים נעשות בתהליך עצמו,
+    ורק הציונים ורשימות הבחירה של הצופות עוברים בין התהליכים.
+    :param initial: פתרונות התחלתיים לחלק מהדבורים (התחלה חמה). שאר הדבורים מתחילות מחלוקה אקראית.
+    """
+    module = importlib.import_module(module_name)
+    cohort = attach_cohort(cohort)
+    rng = random.Random(seed)
+    # מטמון כושר מקומי לכל תהליך, משותף לכל הדבורים שלו
+    cache = FitnessCache()
+
+    initial = initial or {}
+    solutions = {
+        bee: SwapEvaluator(cohort, initial[bee] if bee in initial else module.initialize_groups(cohort, num_groups, rng), num_groups, with_preferences)
+        for bee in bees
+    }
+    stagnation = {bee: 0 for bee in bees}
+    connection.send({bee: solutions[bee].fitness for bee in bees})
+
+    while True:
+        command, payload = connection.recv()
+        if command == "employed":
+            # 2) Employed Bees
+            for bee in bees:
+                if module.try_improve(solutions[bee], solutions[bee].fitness, rng, cache):
+                    stagnation[bee] = 0
+                else:
+                    stagnation[bee] += 1
+            connection.send({bee: solutions[bee].fitness for bee in bees})
+
+        elif command == "onlooker":
+            # 3) Onlooker Bees: הצופות כבר חולקו לדבורים לפי ההסתברויות, וכל דבורה מקבלת את מספר הניסיונות שלה
+            for bee, trials in payload.items():
+                for _ in range(trials):
+                    module.try_improve(solutions[bee], solutions[bee].fitness, rng, cache)
+
+            # 4) Scout Bees
+            for bee in bees:
+                if stagnation[bee] > limit:
+                    solutions[bee] = SwapEvaluator(cohort, module.initialize_groups(cohort, num_groups, rng), num_groups, with_preferences)
+                    stagnation[bee] = 0
+            connection.send({bee: solutions[bee].fitness for bee in bees})
+
+        elif command == "assignment":
+            connection.send(solutions[payload].assignment)
+
+        else:
+            connection.close()
+            return
+
+
+class ParallelColony:
+    """
+    מושבת דבורים שמחולקת בין כמה תהליכי עבודה.
+    בכל איטרציה יש שני סבבי תקשורת: שלב הפועלות, ואחריו שלב הצופות יחד עם הסיירות.
+    המחזור נמצא בזיכרון משותף שכל התהליכים מתחברים אליו, ומשוחרר ב-close.
+    """
+    def __init__(self, cohort: Cohort, num_groups: int, colony_size: int, limit: int, module_name: str, with_preferences: bool, workers: int, rng: random.Random = random,
+                 initial: Optional[List[array]] = None):
+        """
+        :param colony_size: מספר הדבורים (פתרונות) במושבה.
+        :param module_name: המודול שממנו נלקחות initialize_groups ו-try_improve.
+        :param workers: מספר התהליכים.
+        :param rng: מחולל אקראי לבחירת הצופות, ממנו נגזר גם זרם נפרד לכל תהליך.
+        :param initial: פתרונות התחלתיים לדבורים, לפי הסדר (התחלה חמה, ראו WarmStart).
+        """
+        self.colony_size = colony_size
+        self.scores = [0.0] * colony_size
+        self._owner: Dict[int, int] = {}
+        self._connections = []
+        self._processes = []
+        self._rng = rng
+        self._shared: Optional[SharedCohort] = None
+
+        # אם ההקמה נכשלת באמצע, התהליכים שכבר עלו נסגרים והזיכרון המשותף משוחרר
+        try:
+            workers = max(1, min(workers, colony_size))
+            self._shared = SharedCohort(cohort)
+            context = multiprocessing.get_context()
+            for worker, seed in enumerate(spawn_seeds(rng, workers)):
+                bees = list(range(worker, colony_size, workers))
+                for bee in bees:
+                    self._owner[bee] = worker
+                parent_connection, child_connection = context.Pipe()
+                self._connections.append(parent_connection)
+                process = context.Process(
+                    target=_shard_main,
+                    args=(child_connection, self._shared.handle, num_groups, bees, limit, module_name, with_preferences, seed,
+                          {bee: initial[bee] for bee in bees if bee < len(initial)} if initial else None),
+                    daemon=True
+                )
+                try:
+                    process.start()
+                finally:
+                    child_connection.close()
+                self._processes.append(process)
+
+            self._collect()
+        except BaseException:
+            self.close()
+            raise
+
+    def _collect(self) -> None:
+        """
+        מקבל את הציונים המעודכנים מכל התהליכים.
+        """
+        for connection in self._connections:
+            for bee, score in connection.recv().items():
+                self.scores[bee] = score
+
+    def iterate(self) -> List[float]:
+        """
+        מריץ איטרציה אחת: Employed Bees, Onlooker Bees ו-Scout Bees.
+        :return: הציונים של כל הדבורים אחרי האיטרציה.
+        """
+        for connection in self._connections:
+            connection.send(("employed", None))
+        self._collect()
+
+        # בחירת הצופות לפי ההסתברויות, פעם אחת לכל השלב כמו ב-onlooker_bees
+        trials = [{} for _ in self._connections]
+        total_score = sum(self.scores)
+        if total_score != 0:
+            probabilities = [score / total_score for score in self.scores]
+            for bee in self._rng.choices(range(self.colony_size), probabilities, k=self.colony_size):
+                shard = trials[self._owner[bee]]
+                shard[bee] = shard.get(bee, 0) + 1
+
+        for connection, payload in zip(self._connections, trials):
+            connection.send(("onlooker", payload))
+        self._collect()
+        return self.scores
+
+    def assignment(self, bee: int) -> array:
+        """
+        מחזיר את וקטור השיוך של דבורה מסוימת.
+        """
+        connection = self._connections[self._owner[bee]]
+        connection.send(("assignment", bee))
+        return connection.recv()
+
+    def close(self) -> None:
+        """
+        סוגר את כל תהליכי העבודה ומשחרר את הזיכרון המשותף. בטוח גם למושבה שההקמה שלה נכשלה באמצע.
+        """
+        for connection in self._connections:
+            try:
+                connection.send(("close", None))
+                connection.close()
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self._connections = []
+        self._processes = []
+        if self._shared is not None:
+            self._shared.close()
+            self._shared = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
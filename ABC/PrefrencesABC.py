@@ -1,49 +1,29 @@
 import random
 import statistics
-from typing import List
+from array import array
+from typing import List, Optional, Tuple, Union
 from utils.student import Student
-
-GLOBAL_MAX = []
-GLOBAL_MAX_VAL = float("-inf")
-def initialize_groups(students: List[Student], num_groups: int) -> List[List[Student]]:
+from utils.cohort import Cohort, as_cohort, assignment_diversity
+from utils.groupMembers import group_member_ids
+from utils.swapEvaluator import SwapEvaluator
+from utils.preferenceSeeding import seeder_for
+from utils.fitnessCache import FitnessCache
+from utils.randomness import Seed, make_rng
+from utils.stopping import StoppingCriteria, iteration_range
+from utils.progress import ProgressCallback, ProgressReporter
+from utils.warmStart import WarmStart
+from utils.checkpoint import Checkpointer, run_fingerprint
+from ABC.ParallelColony import ParallelColony
+
+
+def initialize_groups(cohort: Cohort, num_groups: int, rng: random.Random = random) -> array:
     """
     הערה מקורית: יוצר קבוצות התחלתיות
-    מה הוספנו? לא ביצענו באופן אקראי לחלוטין, אנחנו מתאימים תלמידים לפי התאמות אישיות
+    מה הוספנו? לא ביצענו באופן אקראי לחלוטין, אנחנו מתאימים תלמידים לפי התאמות אישיות:
+    גושים קטנים של תלמידים שמעדיפים זה את זה נבנים פעם אחת למחזור, וכל חלוקה היא סידור אקראי שלהם
+    בקבוצות בגדלים מאוזנים (ראו utils/preferenceSeeding)
     """
-    # ניצור את הקבוצות ריקות
-    groups = [[] for _ in range(num_groups)]
-    # נשמור תלמידים שהכנסנו לקבוצה
-    assigned_students = set()
-
-    # נחשב את הגודל המקסימלי של כל קבוצה
-    max_group_size = len(students) // num_groups + (1 if len(students) % num_groups != 0 else 0)
-    
-    random.shuffle(students)
-    # נרוץ על כל תלמיד, ננסה להכניס אותו לקבוצה רק אם יש לו את אחת מהעדפות שלו בקבוצה
-    # ואם הקבוצה לא עברה את הגודל המקסימלי
-    for student in students:
-        for group in groups:
-            if len(group) < max_group_size and any(preference in [s.id for s in group] for preference in student.preferences):
-                group.append(student)
-                assigned_students.add(student.id)
-                break
-
-        # אם התלמיד לא הוכנס לאף קבוצה, נכניס אותו לקבוצה הכי קטנה (אם היא לא מלאה)
-        if student.id not in assigned_students:
-            smallest_group = min(groups, key=len)
-            if len(smallest_group) < max_group_size:
-                smallest_group.append(student)
-                assigned_students.add(student.id)
-
-    # נרוץ על התלמידים שעוד לא הוכנסו לקבוצות, כל אחד מהם בתורו נכניס לקבוצה הקטנה ביותר (אם היא לא מלאה)
-    remaining_students = [student for student in students if student.id not in assigned_students]
-    for student in remaining_students:
-        for group in groups:
-            if len(group) < max_group_size:
-                group.append(student)
-                break
-
-    return groups
+    return seeder_for(cohort, num_groups).population(1, rng)[0]
 
 def calculate_diversity(groups: List[List[Student]]) -> float:
     """
@@ -53,7 +33,7 @@ def calculate_diversity(groups: List[List[Student]]) -> float:
     group_diversities = []
     preference_score = 0
 
-    for group in groups:
+    for group, member_ids in zip(groups, group_member_ids(groups)):
         scores = [student.get_score() for student in group]
         if len(scores) > 1:  # סטיית תקן מוגדרת רק עבור יותר מנתון אחד
             diversity = statistics.stdev(scores)
@@ -63,7 +43,7 @@ def calculate_diversity(groups: List[List[Student]]) -> float:
 
         # נרוץ על כל התלמידים בקבוצה, נבדוק אם הוא עם לפחות העדפה אחת שלו. אם כן, נוסיף נקודה לציון
         for student in group:
-            if any(preference in [s.id for s in group] for preference in student.preferences):
+            if not member_ids.isdisjoint(student.preferences):
                 preference_score += 1
 
     # ממוצע הגיוון בקבוצות
@@ -76,36 +56,58 @@ def calculate_diversity(groups: List[List[Student]]) -> float:
     total_score = mean_diversity + preference_score - diversity_variance
     return total_score
 
+def calculate_assignment_diversity(cohort: Cohort, assignment: array, num_groups: int) -> float:
+    """
+    חישוב הגיוון של וקטור שיוך, זהה ל-calculate_diversity של החלוקה המתאימה
+    """
+    return assignment_diversity(cohort, assignment, num_groups, with_preferences=True)
+
 
-def improve_solution(groups: List[List[Student]]) -> List[List[Student]]:
+def improve_solution(solution: SwapEvaluator, rng: random.Random = random) -> Optional[Tuple[int, int]]:
     """
-    כאן אנו מבצעים 'Swap' בין שני תלמידים בקבוצות שונות,
+    כאן אנו בוחרים 'Swap' בין שני תלמידים בקבוצות שונות,
     כדי לשמור על גודל קבוצה קבוע.
+    מחזיר את זוג התלמידים להחלפה (או None אם אין החלפה אפשרית), את הציון שלה מחשבים בהפרש דרך solution.swap_fitness.
     """
-    new_groups = [g[:] for g in groups]  # עותק לקבוצות
-
-    if len(new_groups) < 2:  # אם רק קבוצה אחת, אין מה להחליף
-        return new_groups
+    if solution.num_groups < 2:  # אם רק קבוצה אחת, אין מה להחליף
+        return None
 
     # בוחרים 2 קבוצות שונות באקראי
-    idx1, idx2 = random.sample(range(len(new_groups)), 2)
-    group1 = new_groups[idx1]
-    group2 = new_groups[idx2]
+    idx1, idx2 = rng.sample(range(solution.num_groups), 2)
+    group1 = solution.members[idx1]
+    group2 = solution.members[idx2]
 
     if len(group1) == 0 or len(group2) == 0:
-        return new_groups
+        return None
 
     # בוחרים תלמיד אחד מכל קבוצה
-    i1 = random.randrange(len(group1))
-    i2 = random.randrange(len(group2))
-
-    # מבצעים את ההחלפה
-    group1[i1], group2[i2] = group2[i2], group1[i1]
+    i1 = rng.randrange(len(group1))
+    i2 = rng.randrange(len(group2))
 
-    return new_groups
+    return group1[i1], group2[i2]
 
 
-def onlooker_bees(solutions: List[List[List[Student]]], scores: List[float]) -> None:
+def try_improve(solution: SwapEvaluator, old_score: float, rng: random.Random = random, cache: Optional[FitnessCache] = None) -> bool:
+    """
+    מנסה החלפה אקראית אחת ומבצע אותה רק אם היא משפרת את הציון.
+    :param cache: מטמון כושר לפי המפתח הקנוני של השכן, כדי לא להעריך שוב שכנים שכבר נבדקו.
+    """
+    swap = improve_solution(solution, rng)
+    if swap is None:
+        return False
+
+    # הערכת ההחלפה בהפרש, בלי להעתיק את הפתרון ובלי לחשב אותו מחדש
+    if cache is None:
+        new_score = solution.swap_fitness(*swap)
+    else:
+        new_score = cache.evaluate(solution.swap_key(*swap), lambda: solution.swap_fitness(*swap))
+    if new_score > old_score:
+        solution.apply_swap(*swap)
+        return True
+    return False
+
+
+def onlooker_bees(solutions: List[SwapEvaluator], scores: List[float], rng: random.Random = random, cache: Optional[FitnessCache] = None) -> None:
     total_score = sum(scores)
     if total_score == 0:
         # אם הכל אפס, אי אפשר לחשב הסתברויות
@@ -116,64 +118,201 @@ def onlooker_bees(solutions: List[List[List[Student]]], scores: List[float]) ->
 
     for _ in range(num_solutions):
         # בוחרים פתרון לפי ההסתברויות
-        chosen_idx = random.choices(range(num_solutions), probabilities)[0]
-        old_solution = solutions[chosen_idx]
-        old_score = scores[chosen_idx]
-
-        new_solution = improve_solution(old_solution)
-        new_score = calculate_diversity(new_solution)
+        chosen_idx = rng.choices(range(num_solutions), probabilities)[0]
+        if try_improve(solutions[chosen_idx], scores[chosen_idx], rng, cache):
+            scores[chosen_idx] = solutions[chosen_idx].fitness
 
-        if new_score > old_score:
-            solutions[chosen_idx] = new_solution
-            scores[chosen_idx] = new_score
 
-
-def abc_algorithm_with_prefrences(students: List[Student], num_groups: int, num_iterations: int = 3, limit: int = 3):
+class PreferencesABCSolver:
     """
-    אלגוריתם ABC בסיסי:
+    אלגוריתם ABC עם העדפות כאובייקט פותר:
     1. Initialization
     2. Employed Bees
     3. Onlooker Bees
     4. Scout Bees
+
+    האובייקט מחזיק רק את ההגדרות. כל המצב של ריצה (המושבה והפתרון הטוב ביותר שנמצא) נוצר מחדש בכל קריאה ל-solve
+    ונשאר מקומי לה, כך שאותו פותר יכול לשרת כמה מחזורים ברצף (למשל בתהליך עבודה ארוך) או כמה ריצות במקביל מ-threads.
+    """
+    def __init__(self, num_groups: int, num_iterations: Optional[int] = 3, limit: int = 3, colony_size: Optional[int] = None, workers: Optional[int] = None):
+        """
+        :param num_groups: מספר הקבוצות.
+        :param num_iterations: מספר האיטרציות. None אפשרי כשתנאי העצירה מגביל את הריצה (זמן, הערכות או סבלנות).
+        :param limit: מספר האיטרציות בלי שיפור עד שדבורה הופכת לסיירת.
+        :param colony_size: מספר הפתרונות (דבורים) במושבה, ברירת מחדל: מספר הקבוצות.
+        :param workers: מספר תהליכים להרצת המושבה במקביל (ברירת מחדל: הרצה בתהליך הנוכחי).
+        """
+        self.num_groups = num_groups
+        self.num_iterations = num_iterations
+        self.limit = limit
+        self.colony_size = colony_size or num_groups
+        self.workers = workers
+
+    def solve(self, students: List[Student], seed: Seed = None, fitness_cache: Optional[FitnessCache] = None, stopping: Optional[StoppingCriteria] = None,
+              progress: Optional[ProgressCallback] = None, progress_interval: int = 1, initial_groups: Optional[List[list]] = None,
+              checkpoint: Optional[Checkpointer] = None, return_reason: bool = False) -> Union[List[List[Student]], Tuple[List[List[Student]], str]]:
+        """
+        מריץ את האלגוריתם על מחזור אחד ומחזיר את החלוקה הטובה ביותר שנמצאה בריצה.
+        ריצות מקבילות צריכות מטמון ותנאי עצירה נפרדים (ברירת המחדל יוצרת חדשים לכל ריצה).
+
+        :param seed: זרע או אובייקט Random לשחזור ההרצה (ברירת מחדל: המחולל הגלובלי של random).
+        :param fitness_cache: מטמון הכושר של הריצה (ברירת מחדל: מטמון חדש). בהרצה מקבילית לכל תהליך יש מטמון משלו.
+        :param stopping: תנאי עצירה מוקדמת (ראו StoppingCriteria). סיבת העצירה נשמרת ב-stopping.reason (ומוחזרת עם return_reason).
+        :param progress: callback שמקבל ProgressEvent (איטרציה, ציון טוב ביותר וממוצע, הערכות, זמן), למשל print_progress. ברירת מחדל: בלי דיווח.
+        :param progress_interval: כל כמה איטרציות לדווח.
+        :param initial_groups: חלוקה קודמת (קבוצות של תלמידים או של מזהים) להתחלה חמה אחרי שינוי ברשימת התלמידים:
+                               החלוקה מתוקנת למחזור הנוכחי והמושבה ההתחלתית נבנית סביבה (ראו WarmStart). הסיירות מתחילות מחלוקה אקראית כרגיל.
+        :param checkpoint: נקודות שמירה תקופתיות של המושבה, הציונים, מוני הסיירות, המטמון, מצב המחולל האקראי ומונה האיטרציות.
+                           אם כבר יש נקודת שמירה של אותה ריצה, הריצה ממשיכה ממנה ומגיעה לאותה תוצאה כמו ריצה בלי הפסקה
+                           (עם seed, ובלי תקציב זמן). נתמך רק בהרצה בתהליך אחד. ראו utils/checkpoint.
+        :param return_reason: האם להחזיר גם את סיבת העצירה, כזוג (groups, reason). ברירת מחדל: רק הקבוצות.
+        """
+        if checkpoint is not None and self.workers and self.workers > 1:
+            raise ValueError("Checkpoints are only supported with a single process (workers=None or 1)")
+        rng = make_rng(seed)
+        cache = fitness_cache if fitness_cache is not None else FitnessCache()
+        # השעון מתחיל בכניסה, כך שתקציב הזמן כולל גם את בניית המושבה והפעלת התהליכים
+        stopping = stopping or StoppingCriteria()
+        stopping.start()
+        # המרת התלמידים למערכים קומפקטיים פעם אחת
+        cohort = as_cohort(students)
+        reporter = ProgressReporter(progress, progress_interval)
+        initial = WarmStart(cohort, initial_groups, self.num_groups).population(self.colony_size, rng) if initial_groups is not None else None
+
+        if self.workers and self.workers > 1:
+            best_assignment = self._solve_parallel(cohort, rng, stopping, reporter, initial)
+        else:
+            best_assignment = self._solve_serial(cohort, rng, cache, stopping, reporter, initial, checkpoint)
+        groups = cohort.to_groups(best_assignment, self.num_groups)
+        return (groups, stopping.reason) if return_reason else groups
+
+    def _solve_serial(self, cohort: Cohort, rng: random.Random, cache: FitnessCache, stopping: StoppingCriteria, reporter: ProgressReporter,
+                      initial: Optional[List[array]] = None, checkpoint: Optional[Checkpointer] = None) -> array:
+        """
+        הרצה בתהליך הנוכחי.
+        :param initial: פתרונות התחלתיים לדבורים (התחלה חמה), או None לחלוקות אקראיות.
+        :param checkpoint: נקודות שמירה (ראו solve).
+        :return: וקטור השיוך הטוב ביותר שנמצא.
+        """
+        num_groups = self.num_groups
+        colony_size = self.colony_size
+
+        # המשך מנקודת שמירה, אם יש
+        state = None
+        if checkpoint is not None:
+            fingerprint = run_fingerprint("abc_preferences", cohort, num_groups, limit=self.limit, colony_size=colony_size)
+            state = checkpoint.load(fingerprint)
+
+        if state is not None:
+            solutions = [SwapEvaluator.from_state(cohort, num_groups, True, solution) for solution in state["solutions"]]
+            scores = state["scores"]
+            stagnation = state["stagnation"]
+            best_fitness = state["best_fitness"]
+            best_assignment = state["best_assignment"]
+            rng.setstate(state["rng"])
+            cache.set_state(state["cache"])
+            stopping.set_state(state["stopping"])
+            start_iteration = state["iteration"]
+        else:
+            # 1) יצירת פתרונות התחלתיים
+            if initial is None:
+                initial = [initialize_groups(cohort, num_groups, rng) for _ in range(colony_size)]
+            # הציונים (גם של הסיירות) באים מ-SwapEvaluator ולא מ-evaluate_population, כמו ב-StandardABC
+            solutions = [SwapEvaluator(cohort, assignment, num_groups, with_preferences=True) for assignment in initial]
+            scores = [sol.fitness for sol in solutions]
+            stagnation = [0] * colony_size  # מעקב אחרי מספר הפעמים ללא שיפור
+            # הפתרון הטוב ביותר בריצה הזו (דבורה סיירת יכולה להחליף אותו במושבה, ולכן שומרים עותק)
+            best_fitness = max(scores)
+            best_assignment = solutions[scores.index(best_fitness)].assignment[:]
+            stopping.add_evaluations(colony_size)
+            start_iteration = 0
+
+        for iteration in iteration_range(self.num_iterations, stopping, start_iteration):
+            # דבורים עובדות ודבורים צופות: הערכה אחת לכל דבורה
+            evaluations = 2 * colony_size
+            # 2) Employed Bees
+            for i in range(colony_size):
+                if try_improve(solutions[i], scores[i], rng, cache):
+                    scores[i] = solutions[i].fitness
+                    stagnation[i] = 0
+                else:
+                    stagnation[i] += 1
+
+            # 3) Onlooker Bees
+            onlooker_bees(solutions, scores, rng, cache)
+
+            # 4) Scout Bees
+            for i in range(colony_size):
+                if stagnation[i] > self.limit:
+                    new_sol = SwapEvaluator(cohort, initialize_groups(cohort, num_groups, rng), num_groups, with_preferences=True)
+                    solutions[i] = new_sol
+                    scores[i] = new_sol.fitness
+                    stagnation[i] = 0
+                    evaluations += 1
+            # דיווח על האיטרציה
+            if max(scores) > best_fitness:
+                best_fitness = max(scores)
+                best_assignment = solutions[scores.index(best_fitness)].assignment[:]
+            stopped = stopping.update(best_fitness, evaluations) is not None
+            reporter.update(iteration, best_fitness, scores, stopping, stopped)
+            if checkpoint is not None and checkpoint.due(iteration, self.num_iterations, stopped):
+                checkpoint.save(fingerprint, {
+                    "iteration": iteration + 1, "solutions": [solution.get_state() for solution in solutions], "scores": scores,
+                    "stagnation": stagnation, "best_fitness": best_fitness, "best_assignment": best_assignment,
+                    "rng": rng.getstate(), "cache": cache.get_state(), "stopping": stopping.get_state(),
+                })
+            if stopped:
+                break
+        stopping.finish()
+
+        # בסוף, מחזירים את הפתרון הטוב ביותר
+        return best_assignment
+
+    def _solve_parallel(self, cohort: Cohort, rng: random.Random, stopping: StoppingCriteria, reporter: ProgressReporter, initial: Optional[List[array]] = None) -> array:
+        """
+        אותו אלגוריתם, כשהמושבה מחולקת בין כמה תהליכים (ראו ParallelColony).
+        מספר ההערכות באיטרציה מוערך כשתי הערכות לכל דבורה (הצופים בכל תהליך לא מדווחים על החלפות).
+        """
+        colony_size = self.colony_size
+        with ParallelColony(cohort, self.num_groups, colony_size, self.limit, __name__, True, self.workers, rng, initial) as colony:
+            scores = colony.scores
+            best_fitness = max(scores)
+            best_assignment = colony.assignment(scores.index(best_fitness))
+            stopping.add_evaluations(colony_size)
+            for iteration in iteration_range(self.num_iterations, stopping):
+                scores = colony.iterate()
+
+                # דיווח על האיטרציה
+                if max(scores) > best_fitness:
+                    best_fitness = max(scores)
+                    best_assignment = colony.assignment(scores.index(best_fitness))
+                stopped = stopping.update(best_fitness, 2 * colony_size) is not None
+                reporter.update(iteration, best_fitness, scores, stopping, stopped)
+                if stopped:
+                    break
+            stopping.finish()
+
+        # בסוף, מחזירים את הפתרון הטוב ביותר
+        return best_assignment
+
+
+def abc_algorithm_with_prefrences(students: List[Student], num_groups: int, num_iterations: Optional[int] = 3, limit: int = 3, colony_size: Optional[int] = None, workers: Optional[int] = None, seed: Seed = None,
+                                  fitness_cache: Optional[FitnessCache] = None, stopping: Optional[StoppingCriteria] = None, progress: Optional[ProgressCallback] = None, progress_interval: int = 1,
+                                  initial_groups: Optional[List[list]] = None, checkpoint: Optional[Checkpointer] = None, return_reason: bool = False):
+    """
+    אלגוריתם ABC עם העדפות, בריצה אחת (ראו PreferencesABCSolver).
+
+    :param colony_size: מספר הפתרונות (דבורים) במושבה, ברירת מחדל: מספר הקבוצות.
+    :param workers: מספר תהליכים להרצת המושבה במקביל (ברירת מחדל: הרצה בתהליך הנוכחי).
+    :param seed: זרע או אובייקט Random לשחזור ההרצה (ברירת מחדל: המחולל הגלובלי של random).
+    :param fitness_cache: מטמון הכושר של הריצה (ברירת מחדל: מטמון חדש). בהרצה מקבילית לכל תהליך יש מטמון משלו.
+    :param num_iterations: מספר האיטרציות. None אפשרי כשתנאי העצירה מגביל את הריצה (זמן, הערכות או סבלנות).
+    :param stopping: תנאי עצירה מוקדמת (ראו StoppingCriteria). סיבת העצירה נשמרת ב-stopping.reason (ומוחזרת עם return_reason).
+    :param progress: callback שמקבל ProgressEvent, למשל print_progress. ברירת מחדל: בלי דיווח.
+    :param progress_interval: כל כמה איטרציות לדווח.
+    :param initial_groups: חלוקה קודמת להתחלה חמה (ראו PreferencesABCSolver.solve).
+    :param checkpoint: נקודות שמירה והמשך מהן (ראו PreferencesABCSolver.solve).
+    :param return_reason: האם להחזיר גם את סיבת העצירה, כזוג (groups, reason). ברירת מחדל: רק הקבוצות.
     """
-    global GLOBAL_MAX, GLOBAL_MAX_VAL
-    # 1) יצירת פתרונות התחלתיים
-    solutions = [initialize_groups(students[:], num_groups) for _ in range(num_groups)]
-    scores = [calculate_diversity(sol) for sol in solutions]
-    stagnation = [0] * num_groups  # מעקב אחרי מספר הפעמים ללא שיפור
-
-    for iteration in range(num_iterations):
-        # 2) Employed Bees
-        for i in range(num_groups):
-            old_score = scores[i]
-            old_sol = solutions[i]
-
-            new_sol = improve_solution(old_sol)
-            new_score = calculate_diversity(new_sol)
-
-            if new_score > old_score:
-                solutions[i] = new_sol
-                scores[i] = new_score
-                stagnation[i] = 0
-            else:
-                stagnation[i] += 1
-
-        # 3) Onlooker Bees
-        onlooker_bees(solutions, scores)
-
-        # 4) Scout Bees
-        for i in range(num_groups):
-            if stagnation[i] > limit:
-                new_sol = initialize_groups(students[:], num_groups)
-                solutions[i] = new_sol
-                scores[i] = calculate_diversity(new_sol)
-                stagnation[i] = 0
-        # הדפסת מידע על הדור
-        best_fitness = max(scores)
-        if best_fitness > GLOBAL_MAX_VAL:
-            GLOBAL_MAX_VAL = best_fitness
-            GLOBAL_MAX = solutions[scores.index(GLOBAL_MAX_VAL)]
-        print(f"Iteration {iteration + 1}, Best Fitness: {GLOBAL_MAX_VAL}")
-
-    # בסוף, מחזירים את הפתרון הטוב ביותר
-    return GLOBAL_MAX
+    solver = PreferencesABCSolver(num_groups, num_iterations, limit, colony_size, workers)
+    return solver.solve(students, seed, fitness_cache, stopping, progress, progress_interval, initial_groups, checkpoint, return_reason)
@@ -1,7 +1,16 @@
 import random
 import statistics
-from typing import List
+from array import array
+from typing import List, Optional, Tuple
 from utils.student import Student
+from utils.cohort import Cohort, as_cohort, assignment_diversity
+from utils.swapEvaluator import SwapEvaluator
+from utils.fitnessCache import FitnessCache
+from utils.randomness import Seed, make_rng
+from utils.stopping import StoppingCriteria, iteration_range
+from utils.progress import ProgressCallback, ProgressReporter
+from utils.warmStart import WarmStart
+from ABC.ParallelColony import ParallelColony
 
 # פונקציית הערכה: גיוון פנימי ע"י סכום הפרשי הציונים בכל קבוצה
 def calculate_diversity(groups: List[List[Student]]) -> float:
@@ -29,47 +38,70 @@ def calculate_diversity(groups: List[List[Student]]) -> float:
     total_score = mean_diversity - diversity_variance
     return total_score
 
+def calculate_assignment_diversity(cohort: Cohort, assignment: array, num_groups: int) -> float:
+    """
+    חישוב הגיוון של וקטור שיוך, זהה ל-calculate_diversity של החלוקה המתאימה
+    """
+    return assignment_diversity(cohort, assignment, num_groups)
+
 # יצירת פתרון אקראי המבטיח גודל קבוצות שווה
-def initialize_groups(students: List[Student], num_groups: int) -> List[List[Student]]:
+def initialize_groups(cohort: Cohort, num_groups: int, rng: random.Random = random) -> array:
     """
-    יוצר קבוצות התחלתיות
+    יוצר קבוצות התחלתיות בתור וקטור שיוך
     """
-    random.shuffle(students)
-    groups = [[] for _ in range(num_groups)]
-    for i, student in enumerate(students):
-        groups[i % num_groups].append(student)
-    return groups
+    order = list(range(cohort.size))
+    rng.shuffle(order)
+    assignment = cohort.new_assignment()
+    for position, index in enumerate(order):
+        assignment[index] = position % num_groups
+    return assignment
 
 
-def improve_solution(groups: List[List[Student]]) -> List[List[Student]]:
+def improve_solution(solution: SwapEvaluator, rng: random.Random = random) -> Optional[Tuple[int, int]]:
     """
-    כאן אנו מבצעים 'Swap' בין שני תלמידים בקבוצות שונות,
+    כאן אנו בוחרים 'Swap' בין שני תלמידים בקבוצות שונות,
     כדי לשמור על גודל קבוצה קבוע.
+    מחזיר את זוג התלמידים להחלפה (או None אם אין החלפה אפשרית), את הציון שלה מחשבים בהפרש דרך solution.swap_fitness.
     """
-    new_groups = [g[:] for g in groups]  # עותק לקבוצות
-
-    if len(new_groups) < 2:  # אם רק קבוצה אחת, אין מה להחליף
-        return new_groups
+    if solution.num_groups < 2:  # אם רק קבוצה אחת, אין מה להחליף
+        return None
 
     # בוחרים 2 קבוצות שונות באקראי
-    idx1, idx2 = random.sample(range(len(new_groups)), 2)
-    group1 = new_groups[idx1]
-    group2 = new_groups[idx2]
+    idx1, idx2 = rng.sample(range(solution.num_groups), 2)
+    group1 = solution.members[idx1]
+    group2 = solution.members[idx2]
 
     if len(group1) == 0 or len(group2) == 0:
-        return new_groups
+        return None
 
     # בוחרים תלמיד אחד מכל קבוצה
-    i1 = random.randrange(len(group1))
-    i2 = random.randrange(len(group2))
-
-    # מבצעים את ההחלפה
-    group1[i1], group2[i2] = group2[i2], group1[i1]
+    i1 = rng.randrange(len(group1))
+    i2 = rng.randrange(len(group2))
 
-    return new_groups
+    return group1[i1], group2[i2]
 
 
-def onlooker_bees(solutions: List[List[List[Student]]], scores: List[float]) -> None:
+def try_improve(solution: SwapEvaluator, old_score: float, rng: random.Random = random, cache: Optional[FitnessCache] = None) -> bool:
+    """
+    מנסה החלפה אקראית אחת ומבצע אותה רק אם היא משפרת את הציון.
+    :param cache: מטמון כושר לפי המפתח הקנוני של השכן, כדי לא להעריך שוב שכנים שכבר נבדקו.
+    """
+    swap = improve_solution(solution, rng)
+    if swap is None:
+        return False
+
+    # הערכת ההחלפה בהפרש, בלי להעתיק את הפתרון ובלי לחשב אותו מחדש
+    if cache is None:
+        new_score = solution.swap_fitness(*swap)
+    else:
+        new_score = cache.evaluate(solution.swap_key(*swap), lambda: solution.swap_fitness(*swap))
+    if new_score > old_score:
+        solution.apply_swap(*swap)
+        return True
+    return False
+
+
+def onlooker_bees(solutions: List[SwapEvaluator], scores: List[float], rng: random.Random = random, cache: Optional[FitnessCache] = None) -> None:
     total_score = sum(scores)
     if total_score == 0:
         # אם הכל אפס, אי אפשר לחשב הסתברויות
@@ -80,61 +112,117 @@ def onlooker_bees(solutions: List[List[List[Student]]], scores: List[float]) ->
 
     for _ in range(num_solutions):
         # בוחרים פתרון לפי ההסתברויות
-        chosen_idx = random.choices(range(num_solutions), probabilities)[0]
-        old_solution = solutions[chosen_idx]
-        old_score = scores[chosen_idx]
-
-        new_solution = improve_solution(old_solution)
-        new_score = calculate_diversity(new_solution)
+        chosen_idx = rng.choices(range(num_solutions), probabilities)[0]
+        if try_improve(solutions[chosen_idx], scores[chosen_idx], rng, cache):
+            scores[chosen_idx] = solutions[chosen_idx].fitness
 
-        if new_score > old_score:
-            solutions[chosen_idx] = new_solution
-            scores[chosen_idx] = new_score
 
-
-def abc_algorithm(students: List[Student], num_groups: int, num_iterations: int = 3, limit: int = 3):
+def abc_algorithm(students: List[Student], num_groups: int, num_iterations: Optional[int] = 3, limit: int = 3, colony_size: Optional[int] = None, workers: Optional[int] = None, seed: Seed = None,
+                  fitness_cache: Optional[FitnessCache] = None, stopping: Optional[StoppingCriteria] = None, progress: Optional[ProgressCallback] = None, progress_interval: int = 1,
+                  initial_groups: Optional[List[list]] = None, return_reason: bool = False):
     """
     אלגוריתם ABC בסיסי:
     1. Initialization
     2. Employed Bees
     3. Onlooker Bees
     4. Scout Bees
+
+    :param colony_size: מספר הפתרונות (דבורים) במושבה, ברירת מחדל: מספר הקבוצות.
+    :param workers: מספר תהליכים להרצת המושבה במקביל (ברירת מחדל: הרצה בתהליך הנוכחי).
+    :param seed: זרע או אובייקט Random לשחזור ההרצה (ברירת מחדל: המחולל הגלובלי של random).
+    :param fitness_cache: מטמון הכושר של הריצה (ברירת מחדל: מטמון חדש). בהרצה מקבילית לכל תהליך יש מטמון משלו.
+    :param num_iterations: מספר האיטרציות. None אפשרי כשתנאי העצירה מגביל את הריצה (זמן, הערכות או סבלנות).
+    :param stopping: תנאי עצירה מוקדמת (ראו StoppingCriteria). סיבת העצירה נשמרת ב-stopping.reason (ומוחזרת עם return_reason).
+    :param progress: callback שמקבל ProgressEvent (איטרציה, ציון טוב ביותר וממוצע, הערכות, זמן), למשל print_progress. ברירת מחדל: בלי דיווח.
+    :param progress_interval: כל כמה איטרציות לדווח.
+    :param initial_groups: חלוקה קודמת (קבוצות של תלמידים או של מזהים) להתחלה חמה אחרי שינוי ברשימת התלמידים:
+                           החלוקה מתוקנת למחזור הנוכחי והמושבה ההתחלתית נבנית סביבה (ראו WarmStart). הסיירות מתחילות מחלוקה אקראית כרגיל.
+    :param return_reason: האם להחזיר גם את סיבת העצירה, כזוג (groups, reason). ברירת מחדל: רק הקבוצות.
     """
-    # 1) יצירת פתרונות התחלתיים
-    solutions = [initialize_groups(students[:], num_groups) for _ in range(num_groups)]
-    scores = [calculate_diversity(sol) for sol in solutions]
-    stagnation = [0] * num_groups  # מעקב אחרי מספר הפעמים ללא שיפור
+    rng = make_rng(seed)
+    cache = fitness_cache if fitness_cache is not None else FitnessCache()
+    # השעון מתחיל בכניסה, כך שתקציב הזמן כולל גם את בניית המושבה (כמו באלגוריתמים הגנטיים)
+    stopping = stopping or StoppingCriteria()
+    stopping.start()
+    # המרת התלמידים למערכים קומפקטיים פעם אחת
+    cohort = as_cohort(students)
+    colony_size = colony_size or num_groups
+    reporter = ProgressReporter(progress, progress_interval)
+    initial = WarmStart(cohort, initial_groups, num_groups).population(colony_size, rng) if initial_groups is not None else None
+
+    if workers and workers > 1:
+        groups = parallel_abc_algorithm(cohort, num_groups, num_iterations, limit, colony_size, workers, rng, stopping, reporter, initial)
+        return (groups, stopping.reason) if return_reason else groups
 
-    for iteration in range(num_iterations):
+    # 1) יצירת פתרונות התחלתיים
+    if initial is None:
+        initial = [initialize_groups(cohort, num_groups, rng) for _ in range(colony_size)]
+    # בלי evaluate_population: הציון מחושב ממילא ב-SwapEvaluator יחד עם הסכומים הרצים שההערכה בהפרש צריכה,
+    # וחישוב נוסף במטריצה היה מעבר שני על המושבה עם עיגול שונה מזה של swap_fitness
+    solutions = [SwapEvaluator(cohort, assignment, num_groups) for assignment in initial]
+    scores = [sol.fitness for sol in solutions]
+    stagnation = [0] * colony_size  # מעקב אחרי מספר הפעמים ללא שיפור
+    stopping.add_evaluations(colony_size)
+
+    for iteration in iteration_range(num_iterations, stopping):
+        # דבורים עובדות ודבורים צופות: הערכה אחת לכל דבורה
+        evaluations = 2 * colony_size
         # 2) Employed Bees
-        for i in range(num_groups):
-            old_score = scores[i]
-            old_sol = solutions[i]
-
-            new_sol = improve_solution(old_sol)
-            new_score = calculate_diversity(new_sol)
-
-            if new_score > old_score:
-                solutions[i] = new_sol
-                scores[i] = new_score
+        for i in range(colony_size):
+            if try_improve(solutions[i], scores[i], rng, cache):
+                scores[i] = solutions[i].fitness
                 stagnation[i] = 0
             else:
                 stagnation[i] += 1
 
         # 3) Onlooker Bees
-        onlooker_bees(solutions, scores)
+        onlooker_bees(solutions, scores, rng, cache)
 
         # 4) Scout Bees
-        for i in range(num_groups):
+        for i in range(colony_size):
             if stagnation[i] > limit:
-                new_sol = initialize_groups(students[:], num_groups)
+                new_sol = SwapEvaluator(cohort, initialize_groups(cohort, num_groups, rng), num_groups)
                 solutions[i] = new_sol
-                scores[i] = calculate_diversity(new_sol)
+                scores[i] = new_sol.fitness
                 stagnation[i] = 0
-        # הדפסת מידע על הדור
+                evaluations += 1
+        # דיווח על האיטרציה
         best_fitness = max(scores)
-        print(f"Iteration {iteration + 1}, Best Fitness: {best_fitness}")
+        stopped = stopping.update(best_fitness, evaluations) is not None
+        reporter.update(iteration, best_fitness, scores, stopping, stopped)
+        if stopped:
+            break
+    stopping.finish()
 
     # בסוף, מחזירים את הפתרון הטוב ביותר
     best_index = scores.index(max(scores))
-    return solutions[best_index]
+    groups = cohort.to_groups(solutions[best_index].assignment, num_groups)
+    return (groups, stopping.reason) if return_reason else groups
+
+
+def parallel_abc_algorithm(cohort: Cohort, num_groups: int, num_iterations: Optional[int], limit: int, colony_size: int, workers: int, rng: random.Random = random,
+                           stopping: Optional[StoppingCriteria] = None, reporter: Optional[ProgressReporter] = None, initial: Optional[List[array]] = None):
+    """
+    אותו אלגוריתם, כשהמושבה מחולקת בין כמה תהליכים (ראו ParallelColony).
+    מספר ההערכות באיטרציה מוערך כשתי הערכות לכל דבורה (הצופים בכל תהליך לא מדווחים על החלפות).
+    השעון של stopping לא מתאפס כאן: abc_algorithm מפעיל אותו בכניסה, כך שהזמן של הפעלת התהליכים נספר בתקציב.
+    """
+    stopping = stopping or StoppingCriteria()
+    reporter = reporter or ProgressReporter()
+    with ParallelColony(cohort, num_groups, colony_size, limit, __name__, False, workers, rng, initial) as colony:
+        scores = colony.scores
+        stopping.add_evaluations(colony_size)
+        for iteration in iteration_range(num_iterations, stopping):
+            scores = colony.iterate()
+
+            # דיווח על האיטרציה
+            best_fitness = max(scores)
+            stopped = stopping.update(best_fitness, 2 * colony_size) is not None
+            reporter.update(iteration, best_fitness, scores, stopping, stopped)
+            if stopped:
+                break
+        stopping.finish()
+
+        # בסוף, מחזירים את הפתרון הטוב ביותר
+        best_index = scores.index(max(scores))
+        return cohort.to_groups(colony.assignment(best_index), num_groups)
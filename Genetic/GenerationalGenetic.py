@@ -0,0 +1,76 @@
+import heapq
+import random
+from array import array
+from itertools import accumulate
+from typing import Callable, List, Tuple
+from Genetic.GeneticOperators import Crossover, Mutation
+
+# מצבי הריצה של האלגוריתם הגנטי: ילד אחד בכל דור (המקורי), או אוכלוסייה חדשה שלמה בכל דור
+GA_MODES = ("steady_state", "generational")
+SELECTION_METHODS = ("tournament", "rank")
+
+# ברירות מחדל למצב הדורי
+DEFAULT_ELITISM = 1
+DEFAULT_TOURNAMENT_SIZE = 3
+
+
+def tournament_selection(fitness_scores: List[float], count: int, rng: random.Random = random, tournament_size: int = DEFAULT_TOURNAMENT_SIZE) -> List[int]:
+    """
+    בחירת טורניר: בכל בחירה מגרילים tournament_size פתרונות ולוקחים את הטוב מביניהם.
+    :return: המיקומים של הפתרונות שנבחרו.
+    """
+    size = len(fitness_scores)
+    tournament_size = max(1, min(tournament_size, size))
+    return [
+        max((rng.randrange(size) for _ in range(tournament_size)), key=fitness_scores.__getitem__)
+        for _ in range(count)
+    ]
+
+
+def rank_selection(fitness_scores: List[float], count: int, rng: random.Random = random) -> List[int]:
+    """
+    בחירה לפי דירוג: הסיכוי של פתרון להיבחר פרופורציונלי למקום שלו בדירוג (הגרוע ביותר 1, הטוב ביותר N),
+    כך שהבחירה לא תלויה בגודל של הציונים עצמם (שיכולים גם להיות שליליים).
+    """
+    order = sorted(range(len(fitness_scores)), key=fitness_scores.__getitem__)
+    cumulative_weights = list(accumulate(range(1, len(order) + 1)))
+    return rng.choices(order, cum_weights=cumulative_weights, k=count)
+
+
+def next_generation(population: List[array], fitness_scores: List[float], num_groups: int, mutation_rate: float,
+                    crossover: Crossover, mutate: Mutation, evaluate: Callable[[List[array]], List[float]], rng: random.Random = random,
+                    elitism: int = DEFAULT_ELITISM, selection_method: str = "tournament", tournament_size: int = DEFAULT_TOURNAMENT_SIZE) -> Tuple[List[array], List[float]]:
+    """
+    יוצר דור חדש שלם: elitism הפתרונות הטובים ביותר עוברים כמו שהם, ושאר האוכלוסייה מוחלפת בילדים.
+    כל הילדים נוצרים קודם ומוערכים יחד בקריאה אחת ל-evaluate (חישוב וקטורי על כל הדור).
+
+    :param crossover: פונקציית הכלאה (parent1, parent2, num_groups, rng).
+    :param mutate: פונקציית מוטציה (assignment, mutation_rate, num_groups, rng).
+    :param evaluate: מחשבת את הכושר של רשימת פתרונות.
+    :param elitism: כמה מהפתרונות הטובים ביותר נשמרים לדור הבא.
+    :param selection_method: "tournament" או "rank".
+    :return: האוכלוסייה החדשה והציונים שלה.
+    """
+    if selection_method not in SELECTION_METHODS:
+        raise ValueError(f"Unknown selection method: {selection_method}")
+
+    population_size = len(population)
+    elitism = max(0, min(elitism, population_size))
+    elite = heapq.nlargest(elitism, range(population_size), key=fitness_scores.__getitem__)
+
+    num_children = population_size - elitism
+    if selection_method == "tournament":
+        parents = tournament_selection(fitness_scores, 2 * num_children, rng, tournament_size)
+    else:
+        parents = rank_selection(fitness_scores, 2 * num_children, rng)
+
+    children = []
+    for child_index in range(num_children):
+        parent1 = population[parents[2 * child_index]]
+        parent2 = population[parents[2 * child_index + 1]]
+        child = crossover(parent1, parent2, num_groups, rng)
+        # ההכלאה תמיד מחזירה וקטור חדש, כך שהמוטציה לא משנה את ההורה שנשאר באוכלוסייה
+        children.append(mutate(child, mutation_rate, num_groups, rng))
+
+    children_scores = evaluate(children) if children else []
+    return [population[index] for index in elite] + children, [fitness_scores[index] for index in elite] + list(children_scores)
@@ -0,0 +1,114 @@
+import heapq
+import random
+from array import array
+from typing import Callable, Tuple
+from utils.cohort import UNASSIGNED, group_sizes
+
+# אופרטורי ההכלאה והמוטציה שאפשר לבחור באלגוריתמים הגנטיים.
+# "classic" הם האופרטורים המקוריים של המודול (crossover ו-mutate)
+CROSSOVER_OPERATORS = ("classic", "group")
+MUTATION_OPERATORS = ("classic", "swap", "multi_swap")
+
+# מספר ההחלפות המקסימלי במוטציה מרובה
+MULTI_SWAP_COUNT = 3
+# כמה פעמים מנסים להגריל תלמיד מקבוצה אחרת לפני שמוותרים על ההחלפה
+MAX_SWAP_ATTEMPTS = 16
+
+Crossover = Callable[[array, array, int, random.Random], array]
+Mutation = Callable[[array, float, int, random.Random], array]
+
+
+def group_crossover(parent1: array, parent2: array, num_groups: int, rng: random.Random = random) -> array:
+    """
+    הכלאה שמשמרת קבוצות: חצי מהקבוצות (בהגרלה) עוברות מהורה 2 כמו שהן, ושאר התלמידים נשארים בקבוצה שלהם בהורה 1.
+    אחר כך גדלי הקבוצות מתוקנים לגדלים של הורה 1: תלמידים עודפים ותלמידים שנשארו בלי קבוצה
+    עוברים לקבוצה עם החוסר הגדול ביותר (ערימה). עלות O(N + G log G) לילד.
+    """
+    inherited = bytearray(num_groups)
+    for group_index in rng.sample(range(num_groups), num_groups // 2 or 1):
+        inherited[group_index] = 1
+
+    child = parent1[:]
+    members = {group_index: [] for group_index in range(num_groups) if inherited[group_index]}
+    homeless = []
+    for index, group_index in enumerate(parent2):
+        if inherited[group_index]:
+            child[index] = group_index
+            members[group_index].append(index)
+        elif inherited[child[index]]:
+            # התלמיד היה בהורה 1 בקבוצה שעוברת עכשיו מהורה 2, ולכן הוא נשאר בלי קבוצה
+            child[index] = UNASSIGNED
+            homeless.append(index)
+
+    # רק קבוצה שעברה מהורה 2 יכולה להיות גדולה מהיעד. מוציאים ממנה תלמידים אקראיים
+    targets = group_sizes(parent1, num_groups)
+    sizes = group_sizes(child, num_groups)
+    for group_index, group in members.items():
+        excess = sizes[group_index] - targets[group_index]
+        if excess > 0:
+            homeless.extend(rng.sample(group, excess))
+            sizes[group_index] -= excess
+
+    # ערימת חוסרים: (מינוס החוסר, קבוצה), הקבוצה עם החוסר הגדול ביותר יוצאת ראשונה
+    deficits = [(sizes[group_index] - targets[group_index], group_index) for group_index in range(num_groups) if sizes[group_index] < targets[group_index]]
+    heapq.heapify(deficits)
+    for index in homeless:
+        deficit, group_index = heapq.heappop(deficits)
+        child[index] = group_index
+        if deficit + 1 < 0:
+            heapq.heappush(deficits, (deficit + 1, group_index))
+    return child
+
+
+def _random_swap(assignment: array, rng: random.Random) -> None:
+    """
+    מחליף שני תלמידים אקראיים מקבוצות שונות. תלמיד מהקבוצה השנייה מוגרל עד שנמצא אחד מקבוצה אחרת,
+    כך שבקבוצות מאוזנות העלות היא O(1) בממוצע במקום מעבר על כל וקטור השיוך.
+    """
+    size = len(assignment)
+    first = rng.randrange(size)
+    for _ in range(MAX_SWAP_ATTEMPTS):
+        second = rng.randrange(size)
+        if assignment[second] != assignment[first]:
+            assignment[first], assignment[second] = assignment[second], assignment[first]
+            return
+
+
+def swap_mutation(assignment: array, mutation_rate: float, num_groups: int, rng: random.Random = random) -> array:
+    """
+    מוטציית החלפה: בסיכוי mutation_rate מחליפים שני תלמידים מקבוצות שונות. גדלי הקבוצות נשמרים.
+    """
+    if num_groups > 1 and rng.random() < mutation_rate:
+        _random_swap(assignment, rng)
+    return assignment
+
+
+def multi_swap_mutation(assignment: array, mutation_rate: float, num_groups: int, rng: random.Random = random) -> array:
+    """
+    מוטציה מרובה: עד MULTI_SWAP_COUNT החלפות, כל אחת בסיכוי mutation_rate.
+    """
+    if num_groups > 1:
+        for _ in range(MULTI_SWAP_COUNT):
+            if rng.random() < mutation_rate:
+                _random_swap(assignment, rng)
+    return assignment
+
+
+def get_operators(crossover_operator: str, mutation_operator: str, classic_crossover: Callable[[array, array, int], array], classic_mutation: Mutation) -> Tuple[Crossover, Mutation]:
+    """
+    מחזיר את פונקציות ההכלאה והמוטציה לפי השם, בחתימה אחידה (parent1, parent2, num_groups, rng) ו-(assignment, rate, num_groups, rng).
+    :param classic_crossover: ההכלאה המקורית של האלגוריתם (עבור "classic").
+    :param classic_mutation: המוטציה המקורית של האלגוריתם (עבור "classic").
+    """
+    if crossover_operator not in CROSSOVER_OPERATORS:
+        raise ValueError(f"Unknown crossover operator: {crossover_operator}")
+    if mutation_operator not in MUTATION_OPERATORS:
+        raise ValueError(f"Unknown mutation operator: {mutation_operator}")
+
+    if crossover_operator == "group":
+        crossover = group_crossover
+    else:
+        crossover = lambda parent1, parent2, num_groups, rng: classic_crossover(parent1, parent2, num_groups)
+
+    mutations = {"classic": classic_mutation, "swap": swap_mutation, "multi_swap": multi_swap_mutation}
+    return crossover, mutations[mutation_operator]
@@ -0,0 +1,160 @@
+import os
+import random
+import heapq
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple, Union
+from utils.student import Student
+from utils.cohort import Cohort, as_cohort
+from utils.fitnessCache import FitnessCache
+from utils.sharedCohort import SharedCohort, SharedCohortHandle, attach_cohort
+from utils.randomness import Seed, make_rng
+from utils.warmStart import WarmStart
+from Genetic import PreferencesGenetic, StandardGenetic
+
+# טופולוגיות ההגירה הנתמכות
+TOPOLOGIES = ("ring", "full")
+
+# מצב תהליך העבודה: המחזור ומודול האלגוריתם, נטענים פעם אחת לכל תהליך
+_WORKER_COHORT: Optional[Cohort] = None
+_WORKER_NUM_GROUPS: int = 0
+_WORKER_MODULE = None
+
+
+def _init_worker(cohort: Union[Cohort, SharedCohortHandle, None], num_groups: int, with_preferences: bool) -> None:
+    """
+    מאתחל תהליך עבודה עם המחזור (או מזהה של מחזור בזיכרון משותף), מספר הקבוצות וסוג האלגוריתם.
+    """
+    global _WORKER_COHORT, _WORKER_NUM_GROUPS, _WORKER_MODULE
+    _WORKER_COHORT = attach_cohort(cohort) if cohort is not None else None
+    _WORKER_NUM_GROUPS = num_groups
+    _WORKER_MODULE = PreferencesGenetic if with_preferences else StandardGenetic
+
+
+def _evolve_island(task: Tuple[Optional[List[array]], Optional[List[float]], int, int, float, str]) -> Tuple[List[array], List[float]]:
+    """
+    מריץ מספר דורות על אי אחד עם אותו מחזור של בחירה, הכלאה, מוטציה ועדכון כמו באלגוריתם הרגיל.
+    אם האוכלוסייה ריקה (None) יוצרים אוכלוסייה ראשונית, ואם אין ציונים (התחלה חמה) מחשבים אותם.
+    """
+    population, fitness_scores, population_size, generations, mutation_rate, seed = task
+    module = _WORKER_MODULE
+    cohort = _WORKER_COHORT
+    num_groups = _WORKER_NUM_GROUPS
+
+    # זרם אקראי נפרד לכל אי ולכל שלב, אחרת תהליכים שנוצרו ב-fork מתחילים מאותו מצב
+    rng = random.Random(seed)
+    cache = FitnessCache()
+
+    if population is None:
+        population = module.generate_initial_population(cohort, num_groups, population_size, rng)
+    if fitness_scores is None:
+        fitness_scores = module.calculate_population_fitness(cohort, population, num_groups, cache)
+
+    for _ in range(generations):
+        parent1, parent2 = module.selection(population, fitness_scores)
+        child = module.crossover(parent1, parent2, num_groups)
+        mutated_child = module.mutate(child, mutation_rate, num_groups, rng)
+        module.update_population(cohort, population, fitness_scores, mutated_child, num_groups, cache)
+
+    return population, fitness_scores
+
+
+def migrate(populations: List[List[array]], fitness_scores: List[List[float]], migration_size: int, topology: str = "ring") -> None:
+    """
+    מעביר את הפתרונות הטובים ביותר בין האיים. כל מהגר מחליף את הפתרון הגרוע ביותר ביעד, רק אם הוא טוב ממנו.
+    ring: כל אי שולח לאי הבא אחריו. full: כל אי מקבל את הטובים ביותר מכל שאר האיים.
+    """
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"Unknown topology: {topology}")
+    num_islands = len(populations)
+    if num_islands < 2 or migration_size <= 0:
+        return
+
+    # המהגרים נבחרים מתמונת מצב לפני ההחלפות, כך שסדר העיבוד של האיים לא משנה את התוצאה
+    emigrants = []
+    for population, scores in zip(populations, fitness_scores):
+        best = heapq.nlargest(migration_size, range(len(scores)), key=scores.__getitem__)
+        emigrants.append([(scores[index], population[index][:]) for index in best])
+
+    for destination in range(num_islands):
+        if topology == "ring":
+            candidates = emigrants[destination - 1]
+        else:
+            candidates = [migrant for source in range(num_islands) if source != destination for migrant in emigrants[source]]
+        migrants = heapq.nlargest(migration_size, candidates, key=lambda migrant: migrant[0])
+
+        scores = fitness_scores[destination]
+        for migrant_score, migrant in migrants:
+            worst_index = scores.index(min(scores))
+            if migrant_score > scores[worst_index]:
+                populations[destination][worst_index] = migrant[:]
+                scores[worst_index] = migrant_score
+
+
+def island_genetic_algorithm(students: List[Student], num_groups: int, population_size: int, generations: int, mutation_rate: float,
+                             num_islands: int = 4, migration_interval: int = 10, migration_size: int = 1, topology: str = "ring",
+                             with_preferences: bool = True, workers: Optional[int] = None, seed: Seed = None, initial_groups: Optional[List[list]] = None):
+    """
+    אלגוריתם גנטי במודל איים: num_islands תת-אוכלוסיות מתפתחות במקביל בתהליכים נפרדים,
+    וכל migration_interval דורות הפתרונות הטובים ביותר מהגרים ביניהן לפי הטופולוגיה.
+
+    :param population_size: גודל האוכלוסייה בכל אי.
+    :param generations: מספר הדורות שכל אי מריץ.
+    :param migration_size: כמה פתרונות מהגרים מכל אי בכל הגירה.
+    :param topology: "ring" (טבעת) או "full" (כל אי מחובר לכל האיים).
+    :param with_preferences: האם להשתמש באלגוריתם עם ההעדפות (ברירת מחדל) או באלגוריתם הרגיל.
+    :param workers: מספר התהליכים (ברירת מחדל: מספר האיים, 1 = הרצה בתהליך הנוכחי).
+    :param seed: זרע או אובייקט Random לשחזור ההרצה (ברירת מחדל: המחולל הגלובלי של random).
+    :param initial_groups: חלוקה קודמת (קבוצות של תלמידים או של מזהים) להתחלה חמה: כל אי מתחיל מהחלוקה המתוקנת
+                           ומעותקים מופרעים שלה (ראו WarmStart).
+    """
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"Unknown topology: {topology}")
+    if migration_interval < 1:
+        raise ValueError("migration_interval must be at least 1")
+
+    cohort = as_cohort(students)
+    base_seed = seed if isinstance(seed, (int, str)) else make_rng(seed).getrandbits(64)
+    workers = workers or min(num_islands, os.cpu_count() or 1)
+
+    populations = [None] * num_islands
+    fitness_scores = [None] * num_islands
+    if initial_groups is not None:
+        warm_start = WarmStart(cohort, initial_groups, num_groups)
+        populations = [warm_start.population(population_size, random.Random(f"{base_seed}:{island}:warm")) for island in range(num_islands)]
+
+    def run_epochs(evolve) -> None:
+        completed = 0
+        epoch = 0
+        # בשלב הראשון נוצרות גם האוכלוסיות הראשוניות (גם אם אין דורות להריץ)
+        while epoch == 0 or completed < generations:
+            step = min(migration_interval, generations - completed)
+            tasks = [
+                (populations[island], fitness_scores[island], population_size, step, mutation_rate, f"{base_seed}:{island}:{epoch}")
+                for island in range(num_islands)
+            ]
+            for island, (population, scores) in enumerate(evolve(tasks)):
+                populations[island] = population
+                fitness_scores[island] = scores
+            completed += step
+            epoch += 1
+
+            # הגירה בין האיים (לא אחרי השלב האחרון)
+            if completed < generations:
+                migrate(populations, fitness_scores, migration_size, topology)
+
+    if workers == 1:
+        _init_worker(cohort, num_groups, with_preferences)
+        try:
+            run_epochs(lambda tasks: [_evolve_island(task) for task in tasks])
+        finally:
+            _init_worker(None, 0, with_preferences)
+    else:
+        with SharedCohort(cohort) as shared, ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(shared.handle, num_groups, with_preferences)) as executor:
+            run_epochs(lambda tasks: executor.map(_evolve_island, tasks))
+
+    # מחזירים את הפתרון הטוב ביותר מכל האיים
+    best_island = max(range(num_islands), key=lambda island: max(fitness_scores[island]))
+    scores = fitness_scores[best_island]
+    best_index = scores.index(max(scores))
+    return cohort.to_groups(populations[best_island][best_index], num_groups)
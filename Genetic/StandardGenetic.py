@@ -1,18 +1,30 @@
 import random
 import statistics
 import heapq
-from typing import List, Tuple
+from array import array
+from typing import List, Optional, Tuple
 from utils.student import Student
-
-def initialize_groups(students: List[Student], num_groups: int) -> List[List[Student]]:
-    """
-    יוצר קבוצות התחלתיות
-    """
-    random.shuffle(students)
-    groups = [[] for _ in range(num_groups)]
-    for i, student in enumerate(students):
-        groups[i % num_groups].append(student)
-    return groups
+from utils.randomness import Seed, make_rng
+from utils.batchFitness import evaluate_population
+from utils.fitnessCache import FitnessCache, assignment_key
+from utils.stopping import StoppingCriteria, iteration_range
+from utils.progress import ProgressCallback, ProgressReporter
+from utils.localSearch import LocalSearch
+from utils.warmStart import WarmStart
+from Genetic.GeneticOperators import get_operators
+from Genetic.GenerationalGenetic import DEFAULT_ELITISM, DEFAULT_TOURNAMENT_SIZE, GA_MODES, next_generation
+from utils.cohort import UNASSIGNED, Cohort, as_cohort, assignment_diversity, group_members, group_sizes
+
+def initialize_groups(cohort: Cohort, num_groups: int, rng: random.Random = random) -> array:
+    """
+    יוצר קבוצות התחלתיות בתור וקטור שיוך
+    """
+    order = list(range(cohort.size))
+    rng.shuffle(order)
+    assignment = cohort.new_assignment()
+    for position, index in enumerate(order):
+        assignment[index] = position % num_groups
+    return assignment
 
 def calculate_diversity(groups: List[List[Student]]) -> float:
     """
@@ -38,28 +50,33 @@ def calculate_diversity(groups: List[List[Student]]) -> float:
     total_score = mean_diversity - diversity_variance
     return total_score
 
-def generate_initial_population(students: List[Student], num_groups: int, population_size: int) -> List[List[List[Student]]]:
+def calculate_assignment_diversity(cohort: Cohort, assignment: array, num_groups: int) -> float:
+    """
+    חישוב הגיוון של וקטור שיוך, זהה ל-calculate_diversity של החלוקה המתאימה
+    """
+    return assignment_diversity(cohort, assignment, num_groups)
+
+def generate_initial_population(cohort: Cohort, num_groups: int, population_size: int, rng: random.Random = random) -> List[array]:
     """
     יוצרת אוכלוסייה ראשונית של פתרונות.
-    כל פתרון הוא חלוקה של התלמידים לקבוצות.
+    כל פתרון הוא וקטור שיוך של התלמידים לקבוצות.
     """
     population = []  # רשימת פתרונות
     for _ in range(population_size):
-        groups = initialize_groups(students, num_groups)  # חלוקה אקראית
-        population.append(groups)
+        assignment = initialize_groups(cohort, num_groups, rng)  # חלוקה אקראית
+        population.append(assignment)
     return population
 
-def calculate_population_fitness(population: List[List[List[Student]]]) -> List[float]:
+def calculate_population_fitness(cohort: Cohort, population: List[array], num_groups: int, cache: Optional[FitnessCache] = None) -> List[float]:
     """
-    מחשבת את הכושר עבור כל פתרון באוכלוסייה.
+    מחשבת את הכושר עבור כל פתרון באוכלוסייה, בחישוב וקטורי אחד על כל האוכלוסייה.
+    עם מטמון, מחושבים רק הפתרונות שלא נמצאים בו.
     """
-    fitness_scores = []
-    for groups in population:
-        fitness = calculate_diversity(groups)  # חישוב הגיוון
-        fitness_scores.append(fitness)
-    return fitness_scores
+    if cache is None:
+        return evaluate_population(cohort, population, num_groups)
+    return cache.evaluate_population(population, num_groups, lambda missing: evaluate_population(cohort, missing, num_groups))
 
-def selection(population: List[List[List[Student]]], fitness_scores: List[float]) -> Tuple[Student, Student]:
+def selection(population: List[array], fitness_scores: List[float]) -> Tuple[array, array]:
     """
     מחזיר את שני ההורים עם הניקוד הגבוה ביותר
     """
@@ -74,58 +91,50 @@ def selection(population: List[List[List[Student]]], fitness_scores: List[float]
     parent2 = population[fitness_scores.index(largest_scores[1])]
     return parent1, parent2
 
-def crossover(parent1: List[List[Student]], parent2: List[List[Student]]) -> List[List[Student]]:
+def crossover(parent1: array, parent2: array, num_groups: int) -> array:
     """
     מבצע הכלאה בין שני הורים ליצירת ילד חדש, תוך הבטחת חלוקה מלאה של כל התלמידים.
     """
-    all_students = {student.id: student for group in parent1 + parent2 for student in group}
-
     # חלוקה ראשונית מהורה 1
-    child = [group[:] for group in parent1]
+    child = parent1[:]
+    sizes = group_sizes(child, num_groups)
 
-    # שמירה על התלמידים שכבר הוקצו
-    assigned_students = {student.id for group in child for student in group}
-
-    # הוספת תלמידים חסרים מהורה 2
-    for group in parent2:
-        for student in group:
-            if student.id not in assigned_students:
-                smallest_group = min(child, key=len)
-                smallest_group.append(student)
-                assigned_students.add(student.id)
-
-    # בדיקה אם כל התלמידים מוקצים
-    remaining_students = list(all_students.keys() - assigned_students)
-    for student_id in remaining_students:
-        smallest_group = min(child, key=len)
-        smallest_group.append(all_students[student_id])
+    # תלמידים שלא הוקצו בהורה 1 נכנסים לקבוצה הקטנה ביותר
+    for index, group_index in enumerate(child):
+        if group_index == UNASSIGNED:
+            smallest_group = sizes.index(min(sizes))
+            child[index] = smallest_group
+            sizes[smallest_group] += 1
 
     return child
 
-def mutate(groups: List[List[Student]], mutation_rate: float) -> List[List[Student]]:
+def mutate(assignment: array, mutation_rate: float, num_groups: int, rng: random.Random = random) -> array:
     """
     מבצע מוטציה על פתרון עם סיכוי מסוים, תוך הבטחת חלוקה מלאה של כל התלמידים.
     """
-    if random.random() < mutation_rate:
-        group1, group2 = random.sample(range(len(groups)), 2)
-        if groups[group1] and groups[group2]:
+    if rng.random() < mutation_rate:
+        group1, group2 = rng.sample(range(num_groups), 2)
+        members1 = group_members(assignment, group1)
+        members2 = group_members(assignment, group2)
+        if members1 and members2:
             # בחירת תלמידים להחלפה
-            student1 = random.choice(groups[group1])
-            student2 = random.choice(groups[group2])
+            student1 = rng.choice(members1)
+            student2 = rng.choice(members2)
 
             # החלפה
-            groups[group1].remove(student1)
-            groups[group2].remove(student2)
-            groups[group1].append(student2)
-            groups[group2].append(student1)
-    return groups
+            assignment[student1] = group2
+            assignment[student2] = group1
+    return assignment
 
-def update_population(population: List[List[List[Student]]], fitness_scores: List[float], child: List[List[Student]]) -> None:
+def update_population(cohort: Cohort, population: List[array], fitness_scores: List[float], child: array, num_groups: int, cache: Optional[FitnessCache] = None) -> None:
     """
     מעדכן את האוכלוסייה על ידי החלפת הפתרון הגרוע ביותר בילד החדש (אם הילד טוב יותר).
     """
-    # חישוב הכושר של הילד
-    child_fitness = calculate_diversity(child)
+    # חישוב הכושר של הילד (ילד שזהה לפתרון שכבר הוערך נלקח מהמטמון)
+    if cache is None:
+        child_fitness = calculate_assignment_diversity(cohort, child, num_groups)
+    else:
+        child_fitness = cache.evaluate(assignment_key(child, num_groups), lambda: calculate_assignment_diversity(cohort, child, num_groups))
 
     # מציאת הפתרון הגרוע ביותר
     worst_index = fitness_scores.index(min(fitness_scores))
@@ -135,26 +144,83 @@ def update_population(population: List[List[List[Student]]], fitness_scores: Lis
         population[worst_index] = child
         fitness_scores[worst_index] = child_fitness
 
-def genetic_algorithm(students: List[Student], num_groups: int, population_size: int, generations: int, mutation_rate: float):
-    # יצירת אוכלוסייה ראשונית
-    population = generate_initial_population(students, num_groups, population_size)
-    fitness_scores = calculate_population_fitness(population)
+def genetic_algorithm(students: List[Student], num_groups: int, population_size: int, generations: Optional[int], mutation_rate: float, seed: Seed = None, fitness_cache: Optional[FitnessCache] = None,
+                      crossover_operator: str = "classic", mutation_operator: str = "classic", mode: str = "steady_state",
+                      selection_method: str = "tournament", elitism: int = DEFAULT_ELITISM, tournament_size: int = DEFAULT_TOURNAMENT_SIZE,
+                      stopping: Optional[StoppingCriteria] = None, local_search: Optional[LocalSearch] = None,
+                      progress: Optional[ProgressCallback] = None, progress_interval: int = 1, initial_groups: Optional[List[list]] = None,
+                      return_reason: bool = False):
+    """
+    :param generations: מספר הדורות. None אפשרי עם stopping שמגביל את הריצה (למשל תקציב זמן).
+    :param seed: זרע או אובייקט Random לשחזור ההרצה (ברירת מחדל: המחולל הגלובלי של random).
+    :param fitness_cache: מטמון הכושר של הריצה (ברירת מחדל: מטמון חדש), למשל כדי לקרוא את מוני הפגיעות אחר כך.
+    :param crossover_operator: "classic" (ההכלאה המקורית) או "group" (הכלאה שמשמרת קבוצות עם תיקון גדלים, ראו GeneticOperators).
+    :param mutation_operator: "classic" (המוטציה המקורית), "swap" (החלפה ב-O(1)) או "multi_swap" (כמה החלפות).
+    :param mode: "steady_state" (ילד אחד בכל דור, המקורי) או "generational" (דור שלם של ילדים שמוערך בבת אחת, ראו GenerationalGenetic).
+    :param selection_method: במצב הדורי, "tournament" או "rank".
+    :param elitism: במצב הדורי, כמה מהפתרונות הטובים ביותר עוברים לדור הבא כמו שהם.
+    :param tournament_size: במצב הדורי, גודל הטורניר בבחירת טורניר.
+    :param stopping: תנאי עצירה מוקדמת (זמן, הערכות, סבלנות, ציון יעד). סיבת העצירה נשמרת ב-stopping.reason (ומוחזרת עם return_reason).
+    :param progress: callback שמקבל ProgressEvent (דור, ציון טוב ביותר וממוצע, הערכות, זמן), למשל print_progress. ברירת מחדל: בלי דיווח.
+    :param progress_interval: כל כמה דורות לדווח.
+    :param initial_groups: חלוקה קודמת (קבוצות של תלמידים או של מזהים) להתחלה חמה אחרי שינוי ברשימת התלמידים:
+                           החלוקה מתוקנת למחזור הנוכחי והאוכלוסייה הראשונית נבנית סביבה (ראו WarmStart).
+    :param local_search: צעד ממטי - כל ילד מלוטש בחיפוש מקומי אחרי המוטציה (ראו utils/localSearch),
+                         למשל LocalSearch("first", max_moves=5) כדי להגביל את העלות של כל ילד.
+    :param return_reason: האם להחזיר גם את סיבת העצירה, כזוג (groups, reason). ברירת מחדל: רק הקבוצות.
+    """
+    if mode not in GA_MODES:
+        raise ValueError(f"Unknown mode: {mode}")
+    rng = make_rng(seed)
+    cache = fitness_cache if fitness_cache is not None else FitnessCache()
+    crossover_child, mutate_child = get_operators(crossover_operator, mutation_operator, crossover, mutate)
+    stopping = stopping if stopping is not None else StoppingCriteria()
+    stopping.start()
+    reporter = ProgressReporter(progress, progress_interval)
+
+    # המרת התלמידים למערכים קומפקטיים פעם אחת
+    cohort = as_cohort(students)
+    if local_search is not None:
+        mutate_child = local_search.memetic(mutate_child, cohort, with_preferences=False)
 
-    for generation in range(generations):
-        # בחירת הורים
-        parent1, parent2 = selection(population, fitness_scores)
+    # יצירת אוכלוסייה ראשונית
+    if initial_groups is not None:
+        population = WarmStart(cohort, initial_groups, num_groups).population(population_size, rng)
+    else:
+        population = generate_initial_population(cohort, num_groups, population_size, rng)
+    fitness_scores = calculate_population_fitness(cohort, population, num_groups, cache)
+    stopping.add_evaluations(len(population))
+    # מספר ההערכות בכל דור: ילד אחד, או כל הילדים במצב הדורי
+    evaluations_per_generation = population_size - max(0, min(elitism, population_size)) if mode == "generational" else 1
+
+    for generation in iteration_range(generations, stopping):
+        if mode == "generational":
+            # דור חדש שלם, עם הערכה וקטורית אחת לכל הילדים
+            population, fitness_scores = next_generation(
+                population, fitness_scores, num_groups, mutation_rate, crossover_child, mutate_child,
+                lambda children: calculate_population_fitness(cohort, children, num_groups, cache),
+                rng, elitism, selection_method, tournament_size
+            )
+        else:
+            # בחירת הורים
+            parent1, parent2 = selection(population, fitness_scores)
 
-        # יצירת ילד חדש
-        child = crossover(parent1, parent2)
-        mutated_child = mutate(child, mutation_rate)
+            # יצירת ילד חדש
+            child = crossover_child(parent1, parent2, num_groups, rng)
+            mutated_child = mutate_child(child, mutation_rate, num_groups, rng)
 
-        # עדכון האוכלוסייה
-        update_population(population, fitness_scores, mutated_child)
+            # עדכון האוכלוסייה
+            update_population(cohort, population, fitness_scores, mutated_child, num_groups, cache)
 
-        # הדפסת מידע על הדור
+        # דיווח על הדור
         best_fitness = max(fitness_scores)
-        print(f"Generation {generation + 1}, Best Fitness: {best_fitness}")
+        stopped = stopping.update(best_fitness, evaluations_per_generation) is not None
+        reporter.update(generation, best_fitness, fitness_scores, stopping, stopped)
+        if stopped:
+            break
+    stopping.finish()
 
     # מחזירים את הפתרון הטוב ביותר
     best_index = fitness_scores.index(max(fitness_scores))
-    return population[best_index]
+    groups = cohort.to_groups(population[best_index], num_groups)
+    return (groups, stopping.reason) if return_reason else groups
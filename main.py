@@ -1,8 +1,9 @@
-from utils.helperFunctions import generate_random_student_list, generate_students_json, print_students_table, run_generations_experiment, run_mutation_experiment, run_mutation_timing_experiment, run_population_experiment, run_population_timing_experiment, run_timing_experiment, translate_file_to_students
+from utils.helperFunctions import generate_random_student_list, generate_students_json, print_students_table, run_generations_experiment, run_mutation_experiment, run_mutation_timing_experiment, run_population_experiment, run_population_timing_experiment, run_timing_experiment, translate_file_to_cohort
 from Genetic.StandardGenetic import genetic_algorithm
 from Genetic.PreferencesGenetic import genetic_algorithm_with_preferences
 from ABC.StandardABC import abc_algorithm
 from ABC.PrefrencesABC import abc_algorithm_with_prefrences
+from utils.progress import print_progress
 
 
 def get_filename(num_students: int, num_criteria: int):
@@ -16,7 +17,7 @@ def test_standard_genetic(students):
     mutation_rate = 0.3
 
     # הרצה
-    best_solution = genetic_algorithm(students, num_groups, population_size, generations, mutation_rate)
+    best_solution = genetic_algorithm(students, num_groups, population_size, generations, mutation_rate, progress=print_progress)
 
     # הדפסת הפתרון הטוב ביותר
     print("\nBest Solution:")
@@ -31,7 +32,7 @@ def test_preferences_genetic(students):
     mutation_rate = 0.3
 
     # הרצה
-    best_solution = genetic_algorithm_with_preferences(students, num_groups, population_size, generations, mutation_rate)
+    best_solution = genetic_algorithm_with_preferences(students, num_groups, population_size, generations, mutation_rate, progress=print_progress)
 
     # הדפסת הפתרון הטוב ביותר
     print("\nBest Solution:")
@@ -44,7 +45,7 @@ def test_standard_abc(students):
     num_iterations = 50
     limit = 10
     # הרצה
-    best_solution = abc_algorithm(students, num_groups, num_iterations, limit)
+    best_solution = abc_algorithm(students, num_groups, num_iterations, limit, progress=print_progress)
 
     # הדפסת הפתרון הטוב ביותר
     print("\nBest Solution:")
@@ -57,7 +58,7 @@ def test_prefrences_abc(students):
     num_iterations = 50
     limit = 10
     # הרצה
-    best_solution = abc_algorithm_with_prefrences(students, num_groups, num_iterations, limit)
+    best_solution = abc_algorithm_with_prefrences(students, num_groups, num_iterations, limit, progress=print_progress)
 
     # הדפסת הפתרון הטוב ביותר
     print("\nBest Solution:")
@@ -65,5 +66,6 @@ def test_prefrences_abc(students):
         print(f"Group {i}: {group}")
 
 if __name__ == "__main__":
-    students = translate_file_to_students(get_filename(15, 1))
-    test_prefrences_abc(students)
+    students = translate_file_to_cohort(get_filename(15, 1))
+    if students is not None:
+        test_prefrences_abc(students)
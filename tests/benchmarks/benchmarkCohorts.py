@@ -0,0 +1,63 @@
+import json
+import random
+from pathlib import Path
+
+from utils.student import Student
+
+SAMPLES = Path(__file__).resolve().parents[2] / "samples"
+
+# קבצי הדוגמה ומחזורים שנוצרים בזרע קבוע
+SAMPLE_FILES = [
+    "students(10)_criteria(3).json",
+    "students(15)_criteria(1).json",
+    "students(50)_criteria(2).json",
+    "students(200)_criteria(5).json",
+]
+GENERATED_SIZES = [1000, 10000]
+COHORTS = SAMPLE_FILES + [f"generated({size})" for size in GENERATED_SIZES]
+# מחזורים גדולים מדי לשער הרגרסיה שרץ בכל push (מסומנים large ורצים רק כשמבקשים אותם)
+LARGE_COHORTS = {"generated(10000)"}
+
+# זרע קבוע לכל קלט אקראי במבחנים
+SEED = 2024
+NUM_GROUPS = 3
+ROUNDS = 5
+# מבחני המאקרו (הרצה שלמה של אלגוריתם) הם שער הרגרסיה ב-CI, ולכן מקבלים יותר סבבים
+MACRO_ROUNDS = 15
+WARMUP_ROUNDS = 1
+
+_CACHE = {}
+
+
+def generate_students(amount: int, num_criteria: int = 3, seed: int = SEED) -> list:
+    """
+    יוצר מחזור אקראי בזרע קבוע, באותו מבנה כמו generate_students_json.
+    """
+    rng = random.Random(seed)
+    types = [rng.choice(["0-1", "0-10", "0-100"]) for _ in range(num_criteria)]
+    scales = {"0-1": 1.0, "0-10": 10.0, "0-100": 100.0}
+    return [
+        Student({
+            "id": student_id,
+            "name": f"Student_{student_id}",
+            "preferences": rng.sample([i for i in range(1, amount + 1) if i != student_id], 4) if amount > 4 else [],
+            "criteria": [
+                {"name": f"Criteria_{i + 1}", "type": criteria_type, "value": round(rng.uniform(0, scales[criteria_type]), 2)}
+                for i, criteria_type in enumerate(types)
+            ]
+        })
+        for student_id in range(1, amount + 1)
+    ]
+
+
+def load_cohort_students(name: str) -> list:
+    """
+    טוען (עם מטמון) את התלמידים של מחזור לפי שם: קובץ דוגמה או generated(N).
+    """
+    if name not in _CACHE:
+        if name.startswith("generated("):
+            _CACHE[name] = generate_students(int(name[len("generated("):-1]))
+        else:
+            with open(SAMPLES / name) as file:
+                _CACHE[name] = [Student(data) for data in json.load(file)]
+    return _CACHE[name]
@@ -0,0 +1,32 @@
+"""
+מבחני ביצועים (pytest-benchmark) לנתיבים החמים של האלגוריתמים.
+
+בהרצה רגילה של pytest המבחנים רצים פעם אחת בלבד בלי מדידה (--benchmark-disable ב-pytest.ini), כדי לוודא שהם תקינים.
+ב-CI רק מבחני המאקרו (סימון macro, בלי המחזורים המסומנים large) משמשים שער רגרסיה. קו הבסיס נמדד באותה עבודה
+ועל אותה מכונה: קודם ה-commit של הבסיס (ב-worktree), ואחריו השינוי, שנכשל אם הממוצע של הרצה כלשהי גדל ביותר מ-30%:
+    pytest tests/benchmarks --benchmark-enable --benchmark-only --benchmark-disable-gc -m "macro and not large" --benchmark-json=base.json
+    pytest tests/benchmarks --benchmark-enable --benchmark-only --benchmark-disable-gc -m "macro and not large" --benchmark-compare=base.json --benchmark-compare-fail=mean:30%
+שאר המבחנים (מיקרו ומחזורים גדולים) הם למדידה מקומית:
+    pytest tests/benchmarks --benchmark-enable --benchmark-only
+"""
+import random
+
+import pytest
+
+from utils.cohort import Cohort
+from benchmarkCohorts import COHORTS, LARGE_COHORTS, SEED, load_cohort_students
+
+
+@pytest.fixture(params=[pytest.param(name, marks=pytest.mark.large) if name in LARGE_COHORTS else name for name in COHORTS])
+def students(request):
+    return load_cohort_students(request.param)
+
+
+@pytest.fixture
+def cohort(students):
+    return Cohort(students)
+
+
+@pytest.fixture
+def rng():
+    return random.Random(SEED)
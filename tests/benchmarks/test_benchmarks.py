@@ -0,0 +1,100 @@
+import pytest
+
+from Genetic import StandardGenetic, PreferencesGenetic
+from ABC import StandardABC, PrefrencesABC
+from utils.cohort import assignment_diversity
+from utils.batchFitness import evaluate_population
+from utils.swapEvaluator import SwapEvaluator
+from utils.localSearch import LocalSearch
+from utils.preferenceSeeding import seeder_for
+from Genetic.GeneticOperators import group_crossover, multi_swap_mutation, swap_mutation
+from benchmarkCohorts import MACRO_ROUNDS, NUM_GROUPS, ROUNDS, WARMUP_ROUNDS, SEED
+
+
+def run(benchmark, function, *args, rounds=ROUNDS, **kwargs):
+    return benchmark.pedantic(function, args=args, kwargs=kwargs, rounds=rounds, warmup_rounds=WARMUP_ROUNDS, iterations=1)
+
+
+@pytest.mark.parametrize("module", [StandardGenetic, PreferencesGenetic], ids=["standard", "preferences"])
+def test_calculate_diversity(benchmark, module, cohort, rng):
+    groups = cohort.to_groups(module.initialize_groups(cohort, NUM_GROUPS, rng), NUM_GROUPS)
+    run(benchmark, module.calculate_diversity, groups)
+
+
+@pytest.mark.parametrize("with_preferences", [False, True], ids=["standard", "preferences"])
+def test_assignment_diversity(benchmark, with_preferences, cohort, rng):
+    assignment = PreferencesGenetic.initialize_groups(cohort, NUM_GROUPS, rng)
+    run(benchmark, assignment_diversity, cohort, assignment, NUM_GROUPS, with_preferences)
+
+
+def test_batch_population_fitness(benchmark, cohort, rng):
+    population = [PreferencesGenetic.initialize_groups(cohort, NUM_GROUPS, rng) for _ in range(20)]
+    run(benchmark, evaluate_population, cohort, population, NUM_GROUPS, True)
+
+
+@pytest.mark.parametrize("module", [StandardGenetic, PreferencesGenetic], ids=["standard", "preferences"])
+def test_initialize_groups(benchmark, module, cohort, rng):
+    run(benchmark, module.initialize_groups, cohort, NUM_GROUPS, rng)
+
+
+def test_seed_population(benchmark, cohort, rng):
+    # אוכלוסייה התחלתית שלמה עם העדפות (הגושים של המחזור כבר בנויים)
+    seeder = seeder_for(cohort, NUM_GROUPS)
+    run(benchmark, seeder.population, 100, rng)
+
+
+def test_crossover(benchmark, cohort, rng):
+    parent1 = PreferencesGenetic.initialize_groups(cohort, NUM_GROUPS, rng)
+    parent2 = PreferencesGenetic.initialize_groups(cohort, NUM_GROUPS, rng)
+    run(benchmark, PreferencesGenetic.crossover, parent1, parent2, NUM_GROUPS)
+
+
+def test_mutate(benchmark, cohort, rng):
+    assignment = PreferencesGenetic.initialize_groups(cohort, NUM_GROUPS, rng)
+    # סיכוי מוטציה 1 כדי שכל קריאה תבצע החלפה
+    run(benchmark, PreferencesGenetic.mutate, assignment, 1.0, NUM_GROUPS, rng)
+
+
+def test_group_crossover(benchmark, cohort, rng):
+    parent1 = PreferencesGenetic.initialize_groups(cohort, NUM_GROUPS, rng)
+    parent2 = PreferencesGenetic.initialize_groups(cohort, NUM_GROUPS, rng)
+    run(benchmark, group_crossover, parent1, parent2, NUM_GROUPS, rng)
+
+
+@pytest.mark.parametrize("mutation", [swap_mutation, multi_swap_mutation], ids=["swap", "multi_swap"])
+def test_swap_mutation(benchmark, mutation, cohort, rng):
+    assignment = PreferencesGenetic.initialize_groups(cohort, NUM_GROUPS, rng)
+    run(benchmark, mutation, assignment, 1.0, NUM_GROUPS, rng)
+
+
+def test_improve_solution(benchmark, cohort, rng):
+    solution = SwapEvaluator(cohort, PrefrencesABC.initialize_groups(cohort, NUM_GROUPS, rng), NUM_GROUPS, with_preferences=True)
+    run(benchmark, PrefrencesABC.try_improve, solution, solution.fitness, rng)
+
+
+def test_onlooker_bees(benchmark, cohort, rng):
+    solutions = [SwapEvaluator(cohort, PrefrencesABC.initialize_groups(cohort, NUM_GROUPS, rng), NUM_GROUPS, with_preferences=True) for _ in range(10)]
+    scores = [solution.fitness for solution in solutions]
+    run(benchmark, PrefrencesABC.onlooker_bees, solutions, scores, rng)
+
+
+@pytest.mark.parametrize("strategy", ["best", "first"])
+def test_local_search_move(benchmark, strategy, cohort, rng):
+    # צעד אחד של חיפוש מקומי: סריקת השכונה וביצוע ההחלפה
+    solution = SwapEvaluator(cohort, PrefrencesABC.initialize_groups(cohort, NUM_GROUPS, rng), NUM_GROUPS, with_preferences=True)
+    run(benchmark, LocalSearch(strategy, max_moves=1).improve, solution)
+
+
+SOLVERS = {
+    "genetic": lambda students: StandardGenetic.genetic_algorithm(students, NUM_GROUPS, 10, 20, 0.3, seed=SEED),
+    "genetic_preferences": lambda students: PreferencesGenetic.genetic_algorithm_with_preferences(students, NUM_GROUPS, 10, 20, 0.3, seed=SEED),
+    "abc": lambda students: StandardABC.abc_algorithm(students, NUM_GROUPS, 20, 5, seed=SEED),
+    "abc_preferences": lambda students: PrefrencesABC.abc_algorithm_with_prefrences(students, NUM_GROUPS, 20, 5, seed=SEED),
+}
+
+
+@pytest.mark.macro
+@pytest.mark.parametrize("solver", SOLVERS)
+def test_solver(benchmark, solver, students):
+    groups = run(benchmark, SOLVERS[solver], students, rounds=MACRO_ROUNDS)
+    assert sum(len(group) for group in groups) == len(students)
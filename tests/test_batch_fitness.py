@@ -0,0 +1,24 @@
+import random
+
+import pytest
+
+from utils.batchFitness import evaluate_population
+from utils.cohort import Cohort
+from Genetic import StandardGenetic, PreferencesGenetic
+from test_cohort import load_students
+
+
+@pytest.mark.parametrize("sample", ["students(10)_criteria(3).json", "students(200)_criteria(5).json"])
+@pytest.mark.parametrize("num_groups", [1, 3, 8])
+def test_batch_matches_calculate_diversity(sample, num_groups):
+    random.seed(2)
+    cohort = Cohort(load_students(sample))
+    population = [PreferencesGenetic.initialize_groups(cohort, num_groups) for _ in range(12)]
+
+    standard = evaluate_population(cohort, population, num_groups)
+    preferences = evaluate_population(cohort, population, num_groups, with_preferences=True)
+
+    for assignment, standard_score, preference_score in zip(population, standard, preferences):
+        groups = cohort.to_groups(assignment, num_groups)
+        assert standard_score == pytest.approx(StandardGenetic.calculate_diversity(groups), abs=1e-9)
+        assert preference_score == pytest.approx(PreferencesGenetic.calculate_diversity(groups), abs=1e-9)
@@ -0,0 +1,48 @@
+import pytest
+
+from utils.cohort import Cohort
+from utils.batchSolve import SolveJob, solve_batch
+from test_cohort import load_students
+
+
+def make_jobs():
+    small = load_students("students(15)_criteria(1).json")
+    large = Cohort(load_students("students(50)_criteria(2).json"))
+    return [
+        SolveJob(small, 3, "genetic_preferences", {"generations": 20}, name="small-ga"),
+        SolveJob(large, 4, "abc_preferences", {"num_iterations": 10}, name="large-abc"),
+        SolveJob(small, 3, "genetic", {"mode": "unknown"}, name="broken"),
+        SolveJob(large, 5, "abc", name="large-standard"),
+    ]
+
+
+def grouping_ids(result):
+    return [sorted(student.id for student in group) for group in result.groups]
+
+
+def test_serial_batch_runs_largest_first_and_reports_errors():
+    results = list(solve_batch(make_jobs(), workers=1, seed=7))
+    assert [result.name for result in results] == ["large-abc", "large-standard", "small-ga", "broken"]
+
+    by_name = {result.name: result for result in results}
+    assert by_name["broken"].groups is None and by_name["broken"].error.startswith("ValueError")
+    for name in ("small-ga", "large-abc", "large-standard"):
+        result = by_name[name]
+        assert result.error is None and result.fitness is not None
+        assert sum(len(group) for group in result.groups) == (15 if name == "small-ga" else 50)
+
+
+def test_pool_results_match_serial_results():
+    jobs = make_jobs()
+    serial = {result.index: result for result in solve_batch(jobs, workers=1, seed=3)}
+    pooled = {result.index: result for result in solve_batch(jobs, workers=2, seed=3)}
+    assert sorted(pooled) == list(range(len(jobs)))
+    for index, result in serial.items():
+        if result.error is None:
+            assert grouping_ids(pooled[index]) == grouping_ids(result)
+            assert pooled[index].fitness == pytest.approx(result.fitness)
+
+
+def test_unknown_solver_is_rejected_upfront():
+    with pytest.raises(ValueError):
+        solve_batch([SolveJob(load_students("students(15)_criteria(1).json"), 3, "annealing")])
@@ -0,0 +1,111 @@
+import os
+import random
+
+import pytest
+
+from utils.cohort import Cohort
+from utils.checkpoint import Checkpointer
+from utils.swapEvaluator import SwapEvaluator
+from utils.stopping import StoppingCriteria
+from Genetic.PreferencesGenetic import genetic_algorithm_with_preferences
+from ABC.PrefrencesABC import abc_algorithm_with_prefrences, initialize_groups
+from test_cohort import load_students
+
+NUM_GROUPS = 4
+
+
+class Preempted(Exception):
+    pass
+
+
+def preempt_at(iteration):
+    # callback שמדמה הפסקה של הצומת באמצע הריצה
+    def callback(event):
+        if event.iteration == iteration:
+            raise Preempted()
+    return callback
+
+
+SOLVERS = {
+    "genetic_preferences": lambda cohort, **kwargs: genetic_algorithm_with_preferences(cohort, NUM_GROUPS, 10, 60, 0.3, seed=5, **kwargs),
+    "genetic_generational": lambda cohort, **kwargs: genetic_algorithm_with_preferences(cohort, NUM_GROUPS, 10, 60, 0.3, seed=5, mode="generational", **kwargs),
+    "abc_preferences": lambda cohort, **kwargs: abc_algorithm_with_prefrences(cohort, NUM_GROUPS, 60, limit=2, seed=5, **kwargs),
+}
+
+
+def ids(groups):
+    return [[student.id for student in group] for group in groups]
+
+
+@pytest.mark.parametrize("solver", SOLVERS)
+def test_resume_after_preemption_is_identical(solver, tmp_path):
+    cohort = Cohort(load_students("students(50)_criteria(2).json"))
+    solve = SOLVERS[solver]
+    path = str(tmp_path / "run.ckpt")
+    expected = ids(solve(cohort))
+
+    with pytest.raises(Preempted):
+        solve(cohort, checkpoint=Checkpointer(path, interval=10), progress=preempt_at(25))
+    assert os.listdir(tmp_path) == ["run.ckpt"]
+
+    checkpoint = Checkpointer(path, interval=10)
+    assert ids(solve(cohort, checkpoint=checkpoint)) == expected
+    # הריצה המשיכה מדור 20: נשמרו רק דורות 30, 40, 50 ו-60
+    assert checkpoint.saves == 4
+
+    # ריצה חוזרת אחרי הסיום מחזירה את אותה תוצאה בלי לרוץ שוב
+    rerun = Checkpointer(path, interval=10)
+    assert ids(solve(cohort, checkpoint=rerun)) == expected
+    assert rerun.saves == 0
+
+
+def test_checkpoint_of_a_different_run_is_rejected(tmp_path):
+    students = load_students("students(50)_criteria(2).json")
+    path = str(tmp_path / "run.ckpt")
+    genetic_algorithm_with_preferences(Cohort(students), NUM_GROUPS, 10, 5, 0.3, seed=1, checkpoint=Checkpointer(path))
+
+    with pytest.raises(ValueError):
+        genetic_algorithm_with_preferences(Cohort(students[1:]), NUM_GROUPS, 10, 5, 0.3, seed=1, checkpoint=Checkpointer(path))
+    with pytest.raises(ValueError):
+        abc_algorithm_with_prefrences(Cohort(students), NUM_GROUPS, 5, seed=1, checkpoint=Checkpointer(path))
+    # resume=False מתחיל מחדש ודורס את נקודת השמירה
+    genetic_algorithm_with_preferences(Cohort(students[1:]), NUM_GROUPS, 10, 5, 0.3, seed=1, checkpoint=Checkpointer(path, resume=False))
+
+    with pytest.raises(ValueError):
+        abc_algorithm_with_prefrences(Cohort(students), NUM_GROUPS, 5, workers=2, checkpoint=Checkpointer(str(tmp_path / "abc.ckpt")))
+
+
+def test_stopped_run_does_not_continue_after_resume(tmp_path):
+    cohort = Cohort(load_students("students(50)_criteria(2).json"))
+    path = str(tmp_path / "run.ckpt")
+    stopping = StoppingCriteria(patience=3)
+    expected = ids(abc_algorithm_with_prefrences(cohort, NUM_GROUPS, 1000, seed=2, stopping=stopping, checkpoint=Checkpointer(path)))
+
+    resumed_stopping = StoppingCriteria(patience=3)
+    assert ids(abc_algorithm_with_prefrences(cohort, NUM_GROUPS, 1000, seed=2, stopping=resumed_stopping, checkpoint=Checkpointer(path))) == expected
+    assert resumed_stopping.reason == "patience" and resumed_stopping.iterations == stopping.iterations
+
+
+def test_swap_evaluator_state_round_trip():
+    cohort = Cohort(load_students("students(50)_criteria(2).json"))
+    rng = random.Random(0)
+    solution = SwapEvaluator(cohort, initialize_groups(cohort, NUM_GROUPS, rng), NUM_GROUPS, with_preferences=True)
+    for _ in range(200):
+        solution.apply_swap(rng.randrange(cohort.size), rng.randrange(cohort.size))
+
+    restored = SwapEvaluator.from_state(cohort, NUM_GROUPS, True, solution.get_state())
+    assert restored.assignment == solution.assignment
+    assert restored.members == solution.members and restored.positions == solution.positions
+    assert (restored.sums, restored.squares, restored.diversities) == (solution.sums, solution.squares, solution.diversities)
+    assert (restored.fitness, restored.key, restored.satisfied, restored.hits) == (solution.fitness, solution.key, solution.satisfied, solution.hits)
+
+
+def test_checkpoint_is_rejected_after_preferences_change(tmp_path):
+    students = load_students("students(50)_criteria(2).json")
+    path = str(tmp_path / "run.ckpt")
+    genetic_algorithm_with_preferences(Cohort(students), NUM_GROUPS, 10, 5, 0.3, seed=1, checkpoint=Checkpointer(path))
+
+    # אותם מזהים וציונים, העדפה אחת שונה
+    students[0].preferences = [students[1].id]
+    with pytest.raises(ValueError):
+        genetic_algorithm_with_preferences(Cohort(students), NUM_GROUPS, 10, 5, 0.3, seed=1, checkpoint=Checkpointer(path))
@@ -0,0 +1,78 @@
+import json
+import random
+from multiprocessing import active_children, shared_memory
+from pathlib import Path
+
+import pytest
+
+from utils.student import Student
+from utils.cohort import Cohort, assignment_diversity
+from Genetic import StandardGenetic, PreferencesGenetic
+from ABC import StandardABC, PrefrencesABC, ParallelColony
+from utils.sharedCohort import SharedCohort
+
+SAMPLES = Path(__file__).resolve().parent.parent / "samples"
+
+
+def load_students(name: str):
+    with open(SAMPLES / name) as file:
+        return [Student(data) for data in json.load(file)]
+
+
+@pytest.mark.parametrize("sample", ["students(10)_criteria(3).json", "students(50)_criteria(2).json", "students(200)_criteria(5).json"])
+@pytest.mark.parametrize("num_groups", [2, 3, 7])
+def test_assignment_diversity_matches_calculate_diversity(sample, num_groups):
+    random.seed(0)
+    students = load_students(sample)
+    cohort = Cohort(students)
+    assignment = PreferencesGenetic.initialize_groups(cohort, num_groups)
+    groups = cohort.to_groups(assignment, num_groups)
+
+    assert assignment_diversity(cohort, assignment, num_groups) == pytest.approx(StandardGenetic.calculate_diversity(groups))
+    assert assignment_diversity(cohort, assignment, num_groups, with_preferences=True) == pytest.approx(PreferencesGenetic.calculate_diversity(groups))
+    assert list(cohort.from_groups(groups)) == list(assignment)
+
+
+@pytest.mark.parametrize("solve", [
+    lambda students: StandardGenetic.genetic_algorithm(students, 3, 5, 20, 0.3),
+    lambda students: PreferencesGenetic.genetic_algorithm_with_preferences(students, 3, 5, 20, 0.3),
+    lambda students: StandardABC.abc_algorithm(students, 3, 10, 3),
+    lambda students: PrefrencesABC.abc_algorithm_with_prefrences(students, 3, 10, 3),
+])
+def test_solvers_return_full_partition(solve):
+    students = load_students("students(15)_criteria(1).json")
+    groups = solve(students)
+
+    assert len(groups) == 3
+    assert sorted(student.id for group in groups for student in group) == sorted(student.id for student in students)
+
+
+@pytest.mark.parametrize("solve", [
+    lambda students: StandardABC.abc_algorithm(students, 3, 10, 3, colony_size=8, workers=2),
+    lambda students: PrefrencesABC.abc_algorithm_with_prefrences(students, 3, 10, 3, colony_size=8, workers=2),
+])
+def test_parallel_abc_returns_full_partition(solve):
+    students = load_students("students(50)_criteria(2).json")
+    groups = solve(students)
+
+    assert len(groups) == 3
+    assert sorted(student.id for group in groups for student in group) == sorted(student.id for student in students)
+
+
+def test_parallel_colony_cleans_up_when_setup_fails(monkeypatch):
+    created = []
+
+    class RecordingSharedCohort(SharedCohort):
+        def __init__(self, cohort):
+            super().__init__(cohort)
+            created.append(self.handle.name)
+
+    monkeypatch.setattr(ParallelColony, "SharedCohort", RecordingSharedCohort)
+    cohort = Cohort(load_students("students(15)_criteria(1).json"))
+    # התהליכים נופלים בייבוא המודול, ולכן איסוף הציונים הראשון נכשל
+    with pytest.raises(EOFError):
+        ParallelColony.ParallelColony(cohort, 3, 4, 3, "no_such_module", True, 2)
+
+    assert not active_children()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=created[0])
@@ -0,0 +1,55 @@
+import pickle
+import shutil
+
+import pytest
+
+from utils.cohort import assignment_diversity
+from utils.cohortCache import cache_path, load_cached_cohort, open_cohort_cache, source_digest
+from utils.cohortLoader import load_cohort
+from Genetic import PreferencesGenetic
+from Genetic.IslandGenetic import island_genetic_algorithm
+from test_cohort import SAMPLES
+
+
+@pytest.fixture
+def sample(tmp_path):
+    path = tmp_path / "students.json"
+    shutil.copy(SAMPLES / "students(50)_criteria(2).json", path)
+    return str(path)
+
+
+def test_cached_cohort_matches_loaded_cohort(sample):
+    expected = load_cohort(sample)
+    cohort = load_cached_cohort(sample)
+
+    assert list(cohort.ids) == list(expected.ids)
+    assert list(cohort.scores) == list(expected.scores)
+    assert list(cohort.names) == list(expected.names)
+    assert cohort.preferences == expected.preferences
+    assert cohort.criteria_names == expected.criteria_names
+
+    assignment = PreferencesGenetic.initialize_groups(expected, 3)
+    assert assignment_diversity(cohort, assignment, 3, True) == assignment_diversity(expected, assignment, 3, True)
+    assert cohort.students[7].criteria == expected.students[7].criteria
+
+    # מחזור ממופה עובר בין תהליכים כנתיב לקובץ
+    copy = pickle.loads(pickle.dumps(cohort))
+    assert list(copy.scores) == list(cohort.scores)
+
+
+def test_stale_cache_is_rebuilt(sample):
+    load_cached_cohort(sample)
+    with open(sample) as file:
+        text = file.read()
+    with open(sample, "w") as file:
+        file.write(text.replace('"id": 50', '"id": 51', 1))
+
+    with pytest.raises(ValueError, match="Stale"):
+        open_cohort_cache(cache_path(sample), source_digest(sample))
+    assert 51 in load_cached_cohort(sample).index_of
+
+
+def test_island_workers_reopen_cached_cohort(sample):
+    cohort = load_cached_cohort(sample)
+    groups = island_genetic_algorithm(cohort, 3, 5, 4, 0.3, num_islands=2, migration_interval=2, workers=2, seed=3)
+    assert sorted(student.id for group in groups for student in group) == sorted(cohort.ids)
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from utils import cohortLoader
+from utils.cohort import Cohort, assignment_diversity
+from utils.cohortLoader import load_cohort
+from Genetic import PreferencesGenetic
+from test_cohort import SAMPLES, load_students
+
+
+@pytest.mark.parametrize("sample", ["students(10)_criteria(3).json", "students(200)_criteria(5).json"])
+def test_streamed_cohort_matches_student_cohort(sample, monkeypatch):
+    # קטעים קטנים מכריחים רשומות שנחתכות בין קריאות
+    monkeypatch.setattr(cohortLoader, "CHUNK_SIZE", 7)
+    students = load_students(sample)
+    expected = Cohort(students)
+    cohort = load_cohort(SAMPLES / sample)
+
+    assert list(cohort.ids) == list(expected.ids)
+    assert list(cohort.scores) == pytest.approx(list(expected.scores))
+    assert cohort.preferences == expected.preferences
+
+    assignment = PreferencesGenetic.initialize_groups(expected, 3)
+    assert assignment_diversity(cohort, assignment, 3, True) == pytest.approx(assignment_diversity(expected, assignment, 3, True))
+
+    rebuilt = cohort.students
+    assert [student.id for student in rebuilt] == [student.id for student in students]
+    assert [student.get_score() for student in rebuilt] == pytest.approx([student.get_score() for student in students])
+
+
+def test_json_lines_and_solver_accepts_cohort(tmp_path):
+    with open(SAMPLES / "students(50)_criteria(2).json") as file:
+        records = json.load(file)
+    path = tmp_path / "students.jsonl"
+    path.write_text("\n".join(json.dumps(record) for record in records) + "\n")
+
+    cohort = load_cohort(path)
+    assert len(cohort) == 50
+
+    groups = PreferencesGenetic.genetic_algorithm_with_preferences(cohort, 3, 5, 10, 0.3, seed=1)
+    assert sorted(student.id for group in groups for student in group) == sorted(record["id"] for record in records)
+
+
+@pytest.mark.parametrize("records, message", [
+    ([{"id": 1}, {"id": 1}], "Record 2: duplicate id"),
+    ([{"id": "a"}], "Record 1: id must be an integer"),
+    ([{"id": 1, "preferences": "2"}], "Record 1: preferences"),
+    ([{"id": 1, "criteria": [{"name": "A", "type": "0-5", "value": 1}]}], "unknown criteria type"),
+    ([{"id": 1, "criteria": [{"name": "A", "type": "0-1", "value": 1}]}, {"id": 2, "criteria": []}], "Record 2: criteria do not match"),
+])
+def test_invalid_records_are_rejected(tmp_path, records, message):
+    path = tmp_path / "students.json"
+    path.write_text(json.dumps(records))
+    with pytest.raises(ValueError, match=message):
+        load_cohort(path)
@@ -0,0 +1,52 @@
+import random
+from array import array
+
+from utils.cohort import Cohort
+from utils.fitnessCache import FitnessCache, assignment_key
+from utils.swapEvaluator import SwapEvaluator
+from Genetic import PreferencesGenetic
+from ABC import StandardABC
+from test_cohort import load_students
+
+
+def test_key_ignores_group_order():
+    assignment = array("i", [0, 1, 2, 0, 1, 2, 0])
+    relabeled = array("i", [2, 0, 1, 2, 0, 1, 2])
+    different = array("i", [1, 0, 2, 0, 1, 2, 0])
+    assert assignment_key(assignment, 3) == assignment_key(relabeled, 3)
+    assert assignment_key(assignment, 3) != assignment_key(different, 3)
+
+
+def test_swap_evaluator_key_tracks_swaps():
+    rng = random.Random(4)
+    cohort = Cohort(load_students("students(50)_criteria(2).json"))
+    solution = SwapEvaluator(cohort, PreferencesGenetic.initialize_groups(cohort, 4, rng), 4, with_preferences=True)
+    for _ in range(100):
+        a, b = rng.sample(range(cohort.size), 2)
+        expected = solution.swap_key(a, b)
+        solution.apply_swap(a, b)
+        assert solution.key == expected == assignment_key(solution.assignment, 4)
+
+
+def test_lru_eviction_and_counters():
+    cache = FitnessCache(max_size=2)
+    cache.put(1, 1.0)
+    cache.put(2, 2.0)
+    assert cache.get(1) == 1.0
+    cache.put(3, 3.0)
+    assert cache.get(2) is None
+    assert cache.get(1) == 1.0 and cache.get(3) == 3.0
+    assert (cache.hits, cache.misses, len(cache)) == (3, 1, 2)
+
+
+def test_solvers_reuse_cached_fitness():
+    students = load_students("students(15)_criteria(1).json")
+    cache = FitnessCache()
+    PreferencesGenetic.genetic_algorithm_with_preferences(students, 3, 5, 50, 0.3, seed=2, fitness_cache=cache)
+    # בלי מוטציה הילד זהה להורה הראשון, ולכן רוב ההערכות הן פגיעות
+    assert cache.hits > 0
+    assert cache.hits + cache.misses == 5 + 50
+
+    cache = FitnessCache()
+    StandardABC.abc_algorithm(students, 3, 20, 3, seed=2, fitness_cache=cache)
+    assert cache.hits + cache.misses > 0
@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+from utils.fitnessCache import FitnessCache
+from Genetic import PreferencesGenetic, StandardGenetic
+from Genetic.GenerationalGenetic import next_generation, rank_selection, tournament_selection
+from test_cohort import load_students
+
+
+@pytest.mark.parametrize("select", [
+    lambda scores, rng: tournament_selection(scores, 2000, rng),
+    lambda scores, rng: rank_selection(scores, 2000, rng),
+])
+def test_selection_prefers_fitter_solutions(select):
+    scores = [-5.0, 1.0, 3.0, 10.0]
+    chosen = select(scores, random.Random(0))
+    counts = [chosen.count(index) for index in range(len(scores))]
+    assert counts == sorted(counts)
+
+
+def test_next_generation_keeps_elite_and_evaluates_once():
+    population = [f"p{index}" for index in range(6)]
+    scores = [1.0, 5.0, 2.0, 4.0, 0.0, 3.0]
+    calls = []
+
+    def evaluate(children):
+        calls.append(len(children))
+        return [0.5] * len(children)
+
+    new_population, new_scores = next_generation(
+        population, scores, 3, 0.0, lambda parent1, parent2, num_groups, rng: parent1 + "'", lambda child, rate, num_groups, rng: child,
+        evaluate, random.Random(1), elitism=2
+    )
+    assert new_population[:2] == ["p1", "p3"] and new_scores[:2] == [5.0, 4.0]
+    assert len(new_population) == len(new_scores) == 6
+    assert calls == [4]
+
+
+@pytest.mark.parametrize("selection_method", ["tournament", "rank"])
+def test_generational_mode_returns_full_partition(selection_method):
+    students = load_students("students(50)_criteria(2).json")
+    for solve in (StandardGenetic.genetic_algorithm, PreferencesGenetic.genetic_algorithm_with_preferences):
+        cache = FitnessCache()
+        groups = solve(students, 3, 8, 10, 0.5, seed=0, fitness_cache=cache, crossover_operator="group", mutation_operator="swap",
+                       mode="generational", selection_method=selection_method, elitism=2)
+        assert sorted(student.id for group in groups for student in group) == sorted(student.id for student in students)
+        assert cache.hits + cache.misses == 8 + 10 * (8 - 2)
+
+    with pytest.raises(ValueError):
+        StandardGenetic.genetic_algorithm(students, 3, 8, 1, 0.5, mode="batch")
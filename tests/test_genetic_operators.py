@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+from utils.cohort import Cohort, group_members, group_sizes
+from Genetic import PreferencesGenetic, StandardGenetic
+from Genetic.GeneticOperators import group_crossover, multi_swap_mutation, swap_mutation
+from test_cohort import load_students
+
+
+@pytest.mark.parametrize("num_groups", [2, 3, 7])
+def test_group_crossover_keeps_parent_sizes(num_groups):
+    rng = random.Random(num_groups)
+    cohort = Cohort(load_students("students(50)_criteria(2).json"))
+    for _ in range(20):
+        parent1 = PreferencesGenetic.initialize_groups(cohort, num_groups, rng)
+        parent2 = StandardGenetic.initialize_groups(cohort, num_groups, rng)
+        child = group_crossover(parent1, parent2, num_groups, rng)
+
+        assert group_sizes(child, num_groups) == group_sizes(parent1, num_groups)
+        # לפחות קבוצה אחת עברה מהורה 2 (עד כדי תיקון הגודל)
+        assert any(set(group_members(child, group)) <= set(group_members(parent2, group)) for group in range(num_groups))
+
+
+@pytest.mark.parametrize("mutation", [swap_mutation, multi_swap_mutation])
+def test_swap_mutations_keep_sizes(mutation):
+    rng = random.Random(1)
+    cohort = Cohort(load_students("students(50)_criteria(2).json"))
+    assignment = StandardGenetic.initialize_groups(cohort, 3, rng)
+    sizes = group_sizes(assignment, 3)
+    original = assignment[:]
+
+    mutation(assignment, 1.0, 3, rng)
+    assert group_sizes(assignment, 3) == sizes
+    assert assignment != original
+
+
+@pytest.mark.parametrize("crossover_operator, mutation_operator", [("group", "swap"), ("group", "multi_swap"), ("classic", "swap")])
+def test_genetic_algorithms_accept_operators(crossover_operator, mutation_operator):
+    students = load_students("students(50)_criteria(2).json")
+    for solve in (StandardGenetic.genetic_algorithm, PreferencesGenetic.genetic_algorithm_with_preferences):
+        groups = solve(students, 3, 6, 30, 0.5, seed=0, crossover_operator=crossover_operator, mutation_operator=mutation_operator)
+        assert sorted(student.id for group in groups for student in group) == sorted(student.id for student in students)
+
+    with pytest.raises(ValueError):
+        StandardGenetic.genetic_algorithm(students, 3, 6, 1, 0.5, crossover_operator="uniform")
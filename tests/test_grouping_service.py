@@ -0,0 +1,168 @@
+import asyncio
+import json
+import time
+
+from utils import groupingService
+from utils.cohort import Cohort
+from utils.groupingService import GroupingService, STATUS_CANCELLED, STATUS_CANCELLING, STATUS_DONE, STATUS_EXPIRED, STATUS_FAILED, validate_request
+from utils.stopping import StoppingCriteria
+from test_cohort import SAMPLES
+
+
+def load_records(name: str):
+    with open(SAMPLES / name) as file:
+        return json.load(file)
+
+
+def make_request(**overrides):
+    request = {"students": load_records("students(50)_criteria(2).json"), "num_groups": 4, "algorithm": "genetic_preferences",
+               "parameters": {"population_size": 10, "generations": 30, "seed": 1}}
+    request.update(overrides)
+    return request
+
+
+# בקשה שרצה עד שעוצרים אותה
+ENDLESS = {"population_size": 10, "generations": None, "stopping": {"time_budget": 60}, "seed": 1}
+
+
+async def http_request(address, method: str, path: str, payload=None):
+    reader, writer = await asyncio.open_connection(*address)
+    body = b"" if payload is None else (payload if isinstance(payload, bytes) else json.dumps(payload).encode())
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+def test_solve_returns_all_students():
+    async def scenario():
+        async with GroupingService() as service:
+            return await service.solve(make_request())
+
+    job = asyncio.run(scenario())
+    assert job["status"] == STATUS_DONE
+    assert job["result"]["stop_reason"] == "iterations"
+    assert sorted(student for group in job["result"]["groups"] for student in group) == list(range(1, 51))
+
+
+def test_deadline_returns_best_so_far_and_expires_queued_jobs():
+    async def scenario():
+        async with GroupingService() as service:
+            running = service.submit(make_request(parameters=ENDLESS, deadline=0.5))
+            queued = service.submit(make_request(deadline=0.1))
+            await service.wait(running.id)
+            await service.wait(queued.id)
+            return running, queued
+
+    running, queued = asyncio.run(scenario())
+    assert running.status == STATUS_DONE
+    assert running.result["stop_reason"] == "time_budget"
+    assert sum(len(group) for group in running.result["groups"]) == 50
+    assert queued.status == STATUS_EXPIRED and queued.result is None
+
+
+def test_cancel_running_and_queued_jobs():
+    async def scenario():
+        async with GroupingService() as service:
+            running = service.submit(make_request(parameters=ENDLESS))
+            queued = service.submit(make_request())
+            while running.status != "running":
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.2)
+            service.cancel(queued.id)
+            service.cancel(running.id)
+            await service.wait(running.id)
+            return running, queued
+
+    running, queued = asyncio.run(scenario())
+    assert running.status == STATUS_CANCELLED
+    assert running.result["stop_reason"] == "cancelled"
+    assert sum(len(group) for group in running.result["groups"]) == 50
+    assert queued.status == STATUS_CANCELLED and queued.result is None
+
+
+def test_failed_job_reports_error():
+    async def scenario():
+        async with GroupingService() as service:
+            return await service.solve(make_request(parameters={"mode": "unknown"}))
+
+    job = asyncio.run(scenario())
+    assert job["status"] == STATUS_FAILED and job["error"].startswith("ValueError")
+
+
+def test_http_routes():
+    async def scenario():
+        service = GroupingService(workers=2)
+        await service.start(port=0)
+        try:
+            address = service.address
+            solved = await http_request(address, "POST", "/solve", make_request(algorithm="abc_preferences", parameters={"num_iterations": 5}))
+            status, job = await http_request(address, "POST", "/jobs", make_request(parameters=ENDLESS))
+            cancelled = await http_request(address, "DELETE", f"/jobs/{job['id']}")
+            await service.wait(job["id"])
+            finished = await http_request(address, "GET", f"/jobs/{job['id']}")
+            errors = [
+                await http_request(address, "POST", "/solve", b"{not json"),
+                await http_request(address, "POST", "/solve", make_request(algorithm="unknown")),
+                await http_request(address, "GET", "/jobs/missing"),
+                await http_request(address, "GET", "/solve"),
+            ]
+            return solved, status, cancelled, finished, errors
+        finally:
+            await service.close()
+
+    solved, status, cancelled, finished, errors = asyncio.run(scenario())
+    assert solved[0] == 200 and solved[1]["status"] == STATUS_DONE
+    assert status == 202
+    assert cancelled[0] == 200
+    assert finished[1]["status"] == STATUS_CANCELLED
+    assert [code for code, _ in errors] == [400, 400, 404, 405]
+
+
+def test_stopping_cancelled_hook():
+    flags = [False]
+    stopping = StoppingCriteria(cancelled=lambda: flags[0])
+    assert stopping.update(1.0) is None
+    flags[0] = True
+    assert stopping.update(2.0) == "cancelled"
+
+
+def test_deadline_covers_building_the_cohort(monkeypatch):
+    # בניית המחזור לוקחת יותר מכל התקציב, ולכן האלגוריתם נעצר אחרי הדור הראשון
+    def slow_cohort(students):
+        time.sleep(0.3)
+        return Cohort(students)
+    monkeypatch.setattr(groupingService, "Cohort", slow_cohort)
+
+    result = groupingService._solve_request(validate_request(make_request(parameters=ENDLESS)), 0, 0.2, time.time())
+    assert result["stop_reason"] == "time_budget"
+    assert result["elapsed"] < 0.45
+
+    # גם הזמן שעבר מאז השליחה מנוכה מהתקציב
+    monkeypatch.setattr(groupingService, "Cohort", Cohort)
+    result = groupingService._solve_request(validate_request(make_request(parameters=ENDLESS)), 0, 0.5, time.time() - 1.0)
+    assert result["stop_reason"] == "time_budget"
+    assert result["elapsed"] < 0.25
+
+
+def test_cancelling_job_is_not_pruned_before_it_returns(monkeypatch):
+    monkeypatch.setattr(groupingService, "MAX_FINISHED_JOBS", 0)
+
+    async def scenario():
+        async with GroupingService() as service:
+            running = service.submit(make_request(parameters=ENDLESS))
+            while running.status != "running":
+                await asyncio.sleep(0.01)
+            service.cancel(running.id)
+            cancelling = running.status
+            # ביטול של בקשה שבתור מסיים אותה ומפעיל את המחיקה של בקשות גמורות
+            service.cancel(service.submit(make_request()).id)
+            still_listed = running.id in service.jobs
+            await service.wait(running.id)
+            return running, cancelling, still_listed
+
+    running, cancelling, still_listed = asyncio.run(scenario())
+    assert cancelling == STATUS_CANCELLING and still_listed
+    assert running.status == STATUS_CANCELLED and running.result["stop_reason"] == "cancelled"
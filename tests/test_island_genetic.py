@@ -0,0 +1,15 @@
+import pytest
+
+from Genetic.IslandGenetic import island_genetic_algorithm
+from test_cohort import load_students
+
+
+@pytest.mark.parametrize("topology", ["ring", "full"])
+def test_island_model_is_reproducible_across_worker_counts(topology):
+    students = load_students("students(15)_criteria(1).json")
+
+    serial = island_genetic_algorithm(students, 3, 5, 25, 0.3, num_islands=3, migration_interval=5, topology=topology, workers=1, seed=7)
+    parallel = island_genetic_algorithm(students, 3, 5, 25, 0.3, num_islands=3, migration_interval=5, topology=topology, workers=3, seed=7)
+
+    assert [[s.id for s in group] for group in serial] == [[s.id for s in group] for group in parallel]
+    assert sorted(s.id for group in serial for s in group) == sorted(s.id for s in students)
@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from utils.cohort import Cohort, assignment_diversity
+from utils.localSearch import LocalSearch, SwapNeighbourhood, polish_groups
+from utils.swapEvaluator import SwapEvaluator
+from Genetic import StandardGenetic, PreferencesGenetic
+from ABC import PrefrencesABC
+from test_cohort import load_students
+
+
+def is_swap_local_optimum(solution: SwapEvaluator) -> bool:
+    size = len(solution.assignment)
+    return all(solution.swap_fitness(a, b) <= solution.fitness + 1e-9 for a in range(size) for b in range(a + 1, size))
+
+
+def test_moments_match_exact_swap_fitness():
+    rng = random.Random(3)
+    cohort = Cohort(load_students("students(50)_criteria(2).json"))
+    solution = SwapEvaluator(cohort, PreferencesGenetic.initialize_groups(cohort, 5, rng), 5, with_preferences=True)
+    moments = solution.diversity_moments()
+    for _ in range(200):
+        a, b = rng.sample(range(cohort.size), 2)
+        assert solution.swap_fitness_from_moments(a, b, moments) == pytest.approx(solution.swap_fitness(a, b))
+
+
+@pytest.mark.parametrize("with_preferences", [False, True])
+def test_vectorized_neighbourhood_matches_exact_swaps(with_preferences):
+    cohort = Cohort(load_students("students(50)_criteria(2).json"))
+    solution = SwapEvaluator(cohort, PreferencesGenetic.initialize_groups(cohort, 4, random.Random(5)), 4, with_preferences)
+    neighbourhood = SwapNeighbourhood(solution)
+    moments = solution.diversity_moments()
+    gains = neighbourhood.move_gains() if with_preferences else None
+    checked = 0
+    for block in neighbourhood.blocks:
+        values, rows, columns = neighbourhood.block_values(block, moments, gains)
+        for row, a in enumerate(rows):
+            for column, b in enumerate(columns):
+                assert values[row, column] == pytest.approx(solution.swap_fitness(int(a), int(b)))
+                checked += 1
+    assert checked == sum(len(solution.members[g1]) * len(solution.members[g2]) for g1 in range(4) for g2 in range(g1 + 1, 4))
+
+
+@pytest.mark.parametrize("strategy", ["best", "first"])
+@pytest.mark.parametrize("with_preferences", [False, True])
+def test_hill_climbing_reaches_local_optimum(strategy, with_preferences):
+    cohort = Cohort(load_students("students(50)_criteria(2).json"))
+    start = StandardGenetic.initialize_groups(cohort, 4, random.Random(1))
+    solution = SwapEvaluator(cohort, start, 4, with_preferences)
+    initial = solution.fitness
+
+    LocalSearch(strategy).improve(solution)
+    assert solution.fitness > initial
+    assert is_swap_local_optimum(solution)
+    assert solution.fitness == pytest.approx(assignment_diversity(cohort, solution.assignment, 4, with_preferences))
+    # גדלי הקבוצות נשמרים
+    assert sorted(len(group) for group in solution.members) == sorted(start.count(g) for g in range(4))
+
+
+def test_polishing_is_deterministic_and_tabu_keeps_best():
+    cohort = Cohort(load_students("students(50)_criteria(2).json"))
+    start = StandardGenetic.initialize_groups(cohort, 4, random.Random(2))
+    first = LocalSearch("best").polish(cohort, start, 4)
+    assert LocalSearch("best").polish(cohort, start, 4) == first
+
+    tabu = LocalSearch(tabu_tenure=5, max_moves=60)
+    assignment, fitness = tabu.polish(cohort, start, 4)
+    assert fitness >= first[1] - 1e-9
+    assert fitness == pytest.approx(assignment_diversity(cohort, assignment, 4))
+
+
+def test_polish_solver_output_and_memetic_step():
+    students = load_students("students(15)_criteria(1).json")
+    groups = PrefrencesABC.abc_algorithm_with_prefrences(students, 3, 5, seed=1)
+    polished = polish_groups(students, groups, with_preferences=True)
+    cohort = Cohort(students)
+    assert sorted(s.id for group in polished for s in group) == sorted(s.id for s in students)
+    assert assignment_diversity(cohort, cohort.from_groups(polished), 3, True) >= assignment_diversity(cohort, cohort.from_groups(groups), 3, True)
+
+    local_search = LocalSearch("first", max_moves=3)
+    groups = StandardGenetic.genetic_algorithm(students, 3, 6, 10, 0.5, seed=1, local_search=local_search, mode="generational")
+    assert local_search.moves > 0
+    assert sum(len(group) for group in groups) == len(students)
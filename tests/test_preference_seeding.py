@@ -0,0 +1,38 @@
+import random
+
+from utils.student import Student
+from utils.cohort import Cohort, group_sizes, preference_hits
+from utils.preferenceSeeding import PreferenceSeeder, preference_blocks, seeder_for
+from test_cohort import load_students
+
+
+def make_student(student_id: int, preferences: list) -> Student:
+    return Student({"id": student_id, "name": f"Student_{student_id}", "preferences": preferences,
+                    "criteria": [{"name": "grade", "type": "0-100", "value": float(student_id)}]})
+
+
+def test_groupings_are_balanced_and_reproducible():
+    cohort = Cohort(load_students("students(200)_criteria(5).json"))
+    seeder = seeder_for(cohort, 7)
+    assert seeder_for(cohort, 7) is seeder
+
+    population = seeder.population(20, random.Random(3))
+    for assignment in population:
+        assert sorted(group_sizes(assignment, 7)) == [28] * 3 + [29] * 4
+    assert len({assignment.tobytes() for assignment in population}) == 20
+    assert population == seeder.population(20, random.Random(3))
+
+
+def test_blocks_respect_size_limit():
+    cohort = Cohort(load_students("students(200)_criteria(5).json"))
+    block_of, sizes = preference_blocks(cohort, 5)
+    assert sizes.max() <= 5 and sizes.sum() == cohort.size
+    assert all(sizes[block] == (block_of == block).sum() for block in range(len(sizes)))
+
+
+def test_mutual_pairs_are_always_together():
+    # 0<->1, 2<->3, ... וגדלי קבוצות זוגיים: אף זוג לא נחתך בגבול בין קבוצות
+    students = [make_student(i, [i ^ 1, (i + 5) % 24]) for i in range(24)]
+    cohort = Cohort(students)
+    for assignment in PreferenceSeeder(cohort, 3).sample(50, random.Random(1)):
+        assert preference_hits(cohort, assignment) == 24
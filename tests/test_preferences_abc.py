@@ -0,0 +1,36 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.cohort import Cohort
+from ABC.PrefrencesABC import PreferencesABCSolver, abc_algorithm_with_prefrences
+from test_cohort import load_students
+
+
+def group_ids(groups):
+    return [sorted(student.id for student in group) for group in groups]
+
+
+def test_runs_do_not_leak_previous_results():
+    small = load_students("students(15)_criteria(1).json")
+    large = load_students("students(50)_criteria(2).json")
+    # ריצה על מחזור גדול עם ציון גבוה לא משפיעה על הריצה הבאה
+    abc_algorithm_with_prefrences(large, 3, 10, seed=1)
+    groups = abc_algorithm_with_prefrences(small, 3, 10, seed=2)
+    assert sorted(s.id for group in groups for s in group) == sorted(s.id for s in small)
+    assert group_ids(groups) == group_ids(abc_algorithm_with_prefrences(small, 3, 10, seed=2))
+
+
+def test_zero_iterations_returns_best_initial_solution():
+    students = load_students("students(15)_criteria(1).json")
+    groups = PreferencesABCSolver(3, num_iterations=0).solve(students, seed=1)
+    assert sum(len(group) for group in groups) == len(students)
+
+
+def test_solver_is_reentrant_across_threads():
+    cohorts = [Cohort(load_students(name)) for name in ("students(15)_criteria(1).json", "students(50)_criteria(2).json")]
+    solver = PreferencesABCSolver(3, num_iterations=15, colony_size=4)
+    jobs = [(cohort, seed) for cohort in cohorts for seed in range(3)]
+    expected = [group_ids(solver.solve(cohort, seed)) for cohort, seed in jobs]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda job: group_ids(solver.solve(*job)), jobs))
+    assert results == expected
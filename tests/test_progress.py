@@ -0,0 +1,37 @@
+import pytest
+
+from utils.progress import ProgressEvent, print_progress
+from utils.stopping import StoppingCriteria
+from Genetic import StandardGenetic, PreferencesGenetic
+from ABC import StandardABC, PrefrencesABC
+from test_cohort import load_students
+
+SOLVERS = [
+    lambda students, **kwargs: StandardGenetic.genetic_algorithm(students, 3, 5, 20, 0.3, seed=1, **kwargs),
+    lambda students, **kwargs: PreferencesGenetic.genetic_algorithm_with_preferences(students, 3, 5, 20, 0.3, seed=1, mode="generational", **kwargs),
+    lambda students, **kwargs: StandardABC.abc_algorithm(students, 3, 20, 3, seed=1, **kwargs),
+    lambda students, **kwargs: PrefrencesABC.abc_algorithm_with_prefrences(students, 3, 20, 3, seed=1, **kwargs),
+]
+
+
+@pytest.mark.parametrize("solver", SOLVERS)
+def test_solvers_are_silent_by_default_and_report_events(solver, capsys):
+    students = load_students("students(15)_criteria(1).json")
+    solver(students)
+    assert capsys.readouterr().out == ""
+
+    events = []
+    solver(students, progress=events.append, progress_interval=5)
+    assert [event.iteration for event in events] == [5, 10, 15, 20]
+    assert all(event.mean_fitness <= event.best_fitness for event in events)
+    assert [event.evaluations for event in events] == sorted(event.evaluations for event in events)
+
+
+def test_early_stop_is_always_reported(capsys):
+    students = load_students("students(15)_criteria(1).json")
+    events = []
+    StandardABC.abc_algorithm(students, 3, 20, seed=1, stopping=StoppingCriteria(max_evaluations=20), progress=events.append, progress_interval=100)
+    assert [event.iteration for event in events] == [3]
+
+    print_progress(ProgressEvent(7, 1.5, 1.0, 10, 0.1))
+    assert capsys.readouterr().out == "Iteration 7, Best Fitness: 1.5\n"
@@ -0,0 +1,34 @@
+import random
+
+import pytest
+
+from Genetic import StandardGenetic, PreferencesGenetic
+from ABC import StandardABC, PrefrencesABC
+from test_cohort import load_students
+
+SOLVERS = [
+    lambda students, **kwargs: StandardGenetic.genetic_algorithm(students, 3, 5, 30, 0.5, **kwargs),
+    lambda students, **kwargs: PreferencesGenetic.genetic_algorithm_with_preferences(students, 3, 5, 30, 0.5, **kwargs),
+    lambda students, **kwargs: StandardABC.abc_algorithm(students, 3, 15, 3, **kwargs),
+    lambda students, **kwargs: PrefrencesABC.abc_algorithm_with_prefrences(students, 3, 15, 3, **kwargs),
+    lambda students, **kwargs: StandardABC.abc_algorithm(students, 3, 15, 3, colony_size=6, workers=2, **kwargs),
+]
+
+
+def grouping_ids(groups):
+    return [[student.id for student in group] for group in groups]
+
+
+@pytest.mark.parametrize("solve", SOLVERS)
+def test_same_seed_gives_same_grouping(solve):
+    students = load_students("students(50)_criteria(2).json")
+    order = [student.id for student in students]
+    global_state = random.getstate()
+
+    first = solve(students, seed=123)
+    second = solve(students, seed=random.Random(123))
+
+    assert grouping_ids(first) == grouping_ids(second)
+    # הזרע לא נוגע במחולל הגלובלי ולא בסדר רשימת התלמידים של הקורא
+    assert random.getstate() == global_state
+    assert [student.id for student in students] == order
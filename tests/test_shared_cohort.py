@@ -0,0 +1,99 @@
+import pickle
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from utils.cohort import Cohort, assignment_diversity
+from utils.sharedCohort import SharedCohort, attach_cohort, criteria_matrix
+from Genetic import PreferencesGenetic
+from Genetic.IslandGenetic import island_genetic_algorithm
+from ABC.PrefrencesABC import abc_algorithm_with_prefrences
+from utils.parallelExperiments import run_parallel_experiment
+from test_cohort import load_students
+
+
+def test_attached_cohort_is_a_read_only_view():
+    students = load_students("students(50)_criteria(2).json")
+    expected = Cohort(students)
+
+    with SharedCohort(expected) as shared:
+        cohort = attach_cohort(pickle.loads(pickle.dumps(shared.handle)))
+        assert isinstance(cohort.scores, np.ndarray)
+        assert list(cohort.scores) == list(expected.scores)
+        assert cohort.preferences == expected.preferences
+        assert criteria_matrix(cohort)[3].tolist() == [item["value"] for item in students[3].criteria]
+        with pytest.raises(ValueError):
+            cohort.scores[0] = 0.0
+
+        assignment = PreferencesGenetic.initialize_groups(expected, 3)
+        assert assignment_diversity(cohort, assignment, 3, True) == pytest.approx(assignment_diversity(expected, assignment, 3, True))
+        assert [student.id for student in cohort.students] == [student.id for student in students]
+
+    # המקטע משוחרר ביציאה מהבלוק
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=shared.handle.name)
+
+
+def mixed_schema_students():
+    # לחצי מהתלמידים רק הקריטריון הראשון, ולכן אין סכמה משותפת
+    students = load_students("students(50)_criteria(2).json")
+    for student in students[::2]:
+        student.criteria = student.criteria[:1]
+    return students
+
+
+def test_mixed_schema_keeps_scores_in_shared_memory():
+    students = mixed_schema_students()
+    expected = Cohort(students)
+    assert expected.criteria_values is None
+
+    with SharedCohort(expected) as shared:
+        cohort = attach_cohort(shared.handle)
+        assert list(cohort.scores) == list(expected.scores)
+        assert [student.get_score() for student in cohort.students] == [student.get_score() for student in students]
+
+
+def test_parallel_experiment_with_mixed_schema_matches_serial(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "experiments").mkdir()
+    students = mixed_schema_students()
+    points = [(10, 10, 5, 0.3), (20, 20, 5, 0.3)]
+
+    serial = run_parallel_experiment(students, 4, points, "fitness", "Population", "serial", runs=2, workers=1)
+    parallel = run_parallel_experiment(students, 4, points, "fitness", "Population", "parallel", runs=2, workers=2)
+    assert parallel == serial
+
+
+def string_id_students():
+    # מזהים כמחרוזות, כולל העדפה למזהה שלא קיים במחזור
+    students = load_students("students(50)_criteria(2).json")
+    for student in students:
+        student.id = f"s{student.id}"
+        student.preferences = [f"s{preference}" for preference in student.preferences]
+    students[0].preferences = students[0].preferences + ["missing"]
+    return students
+
+
+def test_string_ids_in_shared_memory():
+    students = string_id_students()
+    expected = Cohort(students)
+
+    with SharedCohort(expected) as shared:
+        cohort = attach_cohort(shared.handle)
+        assert list(cohort.ids) == list(expected.ids)
+        assert cohort.preferences == expected.preferences
+        assert [student.preferences for student in cohort.students] == [student.preferences for student in students]
+
+    students[1].id = 1.5
+    with pytest.raises(ValueError):
+        SharedCohort(Cohort(students))
+
+
+def test_parallel_solvers_with_string_ids():
+    cohort = Cohort(string_id_students())
+    ids = sorted(cohort.ids)
+    colony_groups = abc_algorithm_with_prefrences(cohort, 4, 2, workers=2, seed=1)
+    island_groups = island_genetic_algorithm(cohort, 4, 10, 5, 0.3, num_islands=2, workers=2, seed=1)
+    for groups in (colony_groups, island_groups):
+        assert sorted(student.id for group in groups for student in group) == ids
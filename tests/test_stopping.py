@@ -0,0 +1,102 @@
+import time
+
+import pytest
+
+from utils.cohort import as_cohort
+from utils.stopping import (STOP_ITERATIONS, STOP_MAX_EVALUATIONS, STOP_PATIENCE, STOP_TARGET, STOP_TIME_BUDGET,
+                            StoppingCriteria, iteration_range)
+from Genetic import StandardGenetic, PreferencesGenetic
+from ABC import StandardABC, PrefrencesABC
+from test_cohort import load_students
+
+
+def test_patience_counts_iterations_without_improvement():
+    stopping = StoppingCriteria(patience=2, min_delta=0.5)
+    assert stopping.update(1.0) is None
+    assert stopping.update(1.2) is None  # שיפור קטן מ-min_delta
+    assert stopping.update(1.4) == STOP_PATIENCE
+    assert stopping.best_fitness == 1.4
+
+
+def test_target_and_max_evaluations():
+    stopping = StoppingCriteria(target_fitness=5.0)
+    assert stopping.update(4.0) is None
+    assert stopping.update(5.0) == STOP_TARGET
+
+    stopping = StoppingCriteria(max_evaluations=10)
+    stopping.add_evaluations(4)
+    assert stopping.update(0.0, 5) is None
+    assert stopping.update(0.0, 5) == STOP_MAX_EVALUATIONS
+
+
+def test_unbounded_run_requires_iterations():
+    with pytest.raises(ValueError):
+        iteration_range(None, StoppingCriteria(target_fitness=1.0))
+    with pytest.raises(ValueError):
+        StandardGenetic.genetic_algorithm(load_students("students(15)_criteria(1).json"), 3, 5, None, 0.3, seed=1)
+
+
+def test_solvers_stop_early():
+    students = load_students("students(15)_criteria(1).json")
+
+    stopping = StoppingCriteria(max_evaluations=30)
+    PreferencesGenetic.genetic_algorithm_with_preferences(students, 3, 5, None, 0.3, seed=1, stopping=stopping)
+    assert stopping.reason == STOP_MAX_EVALUATIONS
+    assert stopping.evaluations == 30
+
+    stopping = StoppingCriteria(time_budget=0.0)
+    StandardABC.abc_algorithm(students, 3, None, seed=1, stopping=stopping)
+    assert (stopping.reason, stopping.iterations) == (STOP_TIME_BUDGET, 1)
+
+    stopping = StoppingCriteria(patience=3)
+    groups = PrefrencesABC.abc_algorithm_with_prefrences(students, 3, 1000, seed=1, stopping=stopping)
+    assert stopping.reason == STOP_PATIENCE and stopping.iterations < 1000
+    assert sum(len(group) for group in groups) == len(students)
+
+
+def test_reason_is_iterations_when_no_criterion_fires():
+    stopping = StoppingCriteria(patience=1000)
+    StandardGenetic.genetic_algorithm(load_students("students(15)_criteria(1).json"), 3, 5, 10, 0.3, seed=1, stopping=stopping)
+    assert (stopping.reason, stopping.iterations, stopping.evaluations) == (STOP_ITERATIONS, 10, 15)
+
+
+REASON_SOLVERS = {
+    "genetic": lambda students, **kwargs: StandardGenetic.genetic_algorithm(students, 3, 5, None, 0.3, seed=1, **kwargs),
+    "genetic_preferences": lambda students, **kwargs: PreferencesGenetic.genetic_algorithm_with_preferences(students, 3, 5, None, 0.3, seed=1, **kwargs),
+    "abc": lambda students, **kwargs: StandardABC.abc_algorithm(students, 3, None, seed=1, **kwargs),
+    "abc_preferences": lambda students, **kwargs: PrefrencesABC.abc_algorithm_with_prefrences(students, 3, None, seed=1, **kwargs),
+    "abc_parallel": lambda students, **kwargs: StandardABC.abc_algorithm(students, 3, None, workers=2, seed=1, **kwargs),
+    "abc_preferences_parallel": lambda students, **kwargs: PrefrencesABC.abc_algorithm_with_prefrences(students, 3, None, workers=2, seed=1, **kwargs),
+}
+
+
+@pytest.mark.parametrize("solver", REASON_SOLVERS)
+def test_solvers_return_the_stop_reason(solver):
+    students = load_students("students(15)_criteria(1).json")
+    groups, reason = REASON_SOLVERS[solver](students, stopping=StoppingCriteria(patience=3), return_reason=True)
+    assert reason == STOP_PATIENCE
+    assert sum(len(group) for group in groups) == len(students)
+
+    # בלי return_reason מוחזרות רק הקבוצות
+    groups = REASON_SOLVERS[solver](students, stopping=StoppingCriteria(patience=3))
+    assert sum(len(group) for group in groups) == len(students)
+
+
+def test_reason_without_a_stopping_object():
+    students = load_students("students(15)_criteria(1).json")
+    _, reason = StandardGenetic.genetic_algorithm(students, 3, 5, 10, 0.3, seed=1, return_reason=True)
+    assert reason == STOP_ITERATIONS
+
+
+@pytest.mark.parametrize("solver", REASON_SOLVERS)
+def test_time_budget_includes_setup(solver, monkeypatch):
+    # ההמרה למחזור איטית מהתקציב כולו, ולכן הריצה נעצרת אחרי האיטרציה הראשונה
+    def slow_as_cohort(students):
+        time.sleep(0.2)
+        return as_cohort(students)
+    for module in (StandardGenetic, PreferencesGenetic, StandardABC, PrefrencesABC):
+        monkeypatch.setattr(module, "as_cohort", slow_as_cohort)
+
+    stopping = StoppingCriteria(time_budget=0.1)
+    _, reason = REASON_SOLVERS[solver](load_students("students(15)_criteria(1).json"), stopping=stopping, return_reason=True)
+    assert (reason, stopping.iterations) == (STOP_TIME_BUDGET, 1)
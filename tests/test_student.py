@@ -0,0 +1,30 @@
+import pytest
+
+from utils.student import Student
+
+
+def test_score_is_cached_and_invalidated():
+    student = Student({
+        "id": 1,
+        "name": "Student_1",
+        "preferences": [2],
+        "criteria": [
+            {"name": "A", "type": "0-1", "value": 0.5},
+            {"name": "B", "type": "0-10", "value": 7},
+            {"name": "C", "type": "0-100", "value": 42.5},
+        ],
+    })
+    assert student.criteria_vector == (50.0, 70.0, 42.5)
+    assert student.get_score() == pytest.approx(162.5)
+
+    # שינוי במקום מחייב חישוב מחדש מפורש
+    student.criteria[0]["value"] = 1
+    assert student.get_score() == pytest.approx(162.5)
+    student.invalidate_score()
+    assert student.get_score() == pytest.approx(212.5)
+
+    student.criteria = [{"name": "A", "type": "0-10", "value": 3}]
+    assert student.get_score() == pytest.approx(30.0)
+
+    with pytest.raises(AttributeError):
+        student.nickname = "x"
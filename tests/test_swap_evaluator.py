@@ -0,0 +1,28 @@
+import random
+
+import pytest
+
+from utils.cohort import Cohort, assignment_diversity
+from utils.swapEvaluator import SwapEvaluator
+from Genetic import PreferencesGenetic
+from test_cohort import load_students
+
+
+@pytest.mark.parametrize("with_preferences", [False, True])
+@pytest.mark.parametrize("num_groups", [2, 3, 6])
+def test_swap_fitness_matches_full_evaluation(with_preferences, num_groups):
+    random.seed(1)
+    cohort = Cohort(load_students("students(50)_criteria(2).json"))
+    evaluator = SwapEvaluator(cohort, PreferencesGenetic.initialize_groups(cohort, num_groups), num_groups, with_preferences)
+
+    for _ in range(300):
+        a, b = random.sample(range(cohort.size), 2)
+        predicted = evaluator.swap_fitness(a, b)
+        applied = evaluator.apply_swap(a, b)
+
+        assert predicted == applied
+        assert applied == pytest.approx(assignment_diversity(cohort, evaluator.assignment, num_groups, with_preferences), abs=1e-9)
+
+    hits = list(evaluator.hits)
+    evaluator.rebuild()
+    assert list(evaluator.hits) == hits
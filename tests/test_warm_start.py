@@ -0,0 +1,104 @@
+import random
+
+import pytest
+
+from utils.cohort import Cohort, assignment_diversity, group_sizes
+from utils.warmStart import WarmStart
+from Genetic.StandardGenetic import genetic_algorithm
+from Genetic.PreferencesGenetic import genetic_algorithm_with_preferences
+from Genetic.IslandGenetic import island_genetic_algorithm
+from ABC.StandardABC import abc_algorithm
+from ABC.PrefrencesABC import abc_algorithm_with_prefrences
+from test_cohort import load_students
+
+NUM_GROUPS = 4
+
+
+@pytest.fixture(scope="module")
+def roster_change():
+    # השבוע שעבר: 48 התלמידים הראשונים. השבוע: שניים עזבו ושניים הצטרפו
+    students = load_students("students(50)_criteria(2).json")
+    previous_groups = genetic_algorithm_with_preferences(students[:48], NUM_GROUPS, 20, 1000, 0.3, seed=1)
+    return students, previous_groups, Cohort(students[2:])
+
+
+@pytest.fixture(scope="module")
+def standard_previous_groups():
+    # החלוקה של השבוע שעבר לפי הציון בלי העדפות, לאלגוריתמים הרגילים
+    return genetic_algorithm(load_students("students(50)_criteria(2).json")[:48], NUM_GROUPS, 20, 1000, 0.3, seed=1)
+
+
+def is_balanced(assignment, size, num_groups):
+    return sorted(group_sizes(assignment, num_groups)) == sorted(size // num_groups + (group < size % num_groups) for group in range(num_groups))
+
+
+def test_repair_keeps_previous_groups_and_balances(roster_change):
+    students, previous_groups, cohort = roster_change
+    warm_start = WarmStart(cohort, previous_groups, NUM_GROUPS)
+
+    assert sorted(warm_start.removed) == [students[0].id, students[1].id]
+    assert warm_start.added == [students[48].id, students[49].id]
+    assert is_balanced(warm_start.assignment, cohort.size, NUM_GROUPS)
+
+    # מי שנשאר נשאר בקבוצה שלו, חוץ מהעברות מעטות לאיזון
+    previous = {student.id: group_index for group_index, group in enumerate(previous_groups) for student in group}
+    moved = sum(1 for index, student_id in enumerate(cohort.ids) if student_id in previous and previous[student_id] != warm_start.assignment[index])
+    assert moved <= 2
+
+
+def test_repair_with_ids_and_a_different_number_of_groups(roster_change):
+    _, previous_groups, cohort = roster_change
+    ids = [[student.id for student in group] for group in previous_groups]
+    assert is_balanced(WarmStart(cohort, ids, NUM_GROUPS + 1).assignment, cohort.size, NUM_GROUPS + 1)
+    assert is_balanced(WarmStart(cohort, ids, NUM_GROUPS - 1).assignment, cohort.size, NUM_GROUPS - 1)
+    assert is_balanced(WarmStart(cohort, [], NUM_GROUPS).assignment, cohort.size, NUM_GROUPS)
+
+    with pytest.raises(ValueError):
+        WarmStart(cohort, [ids[0], ids[0]], NUM_GROUPS)
+
+
+def test_population_is_the_repaired_grouping_and_balanced_perturbations(roster_change):
+    _, previous_groups, cohort = roster_change
+    warm_start = WarmStart(cohort, previous_groups, NUM_GROUPS)
+    population = warm_start.population(10, random.Random(0))
+
+    assert population[0] == warm_start.assignment
+    assert any(assignment != warm_start.assignment for assignment in population[1:])
+    assert all(is_balanced(assignment, cohort.size, NUM_GROUPS) for assignment in population)
+
+
+SOLVERS = {
+    "genetic": (lambda cohort, **kwargs: genetic_algorithm(cohort, NUM_GROUPS, 10, 20, 0.3, seed=3, **kwargs), False),
+    "genetic_preferences": (lambda cohort, **kwargs: genetic_algorithm_with_preferences(cohort, NUM_GROUPS, 10, 20, 0.3, seed=3, **kwargs), True),
+    "island": (lambda cohort, **kwargs: island_genetic_algorithm(cohort, NUM_GROUPS, 10, 20, 0.3, num_islands=2, workers=1, seed=3, **kwargs), True),
+    "abc": (lambda cohort, **kwargs: abc_algorithm(cohort, NUM_GROUPS, 5, seed=3, **kwargs), False),
+    "abc_preferences": (lambda cohort, **kwargs: abc_algorithm_with_prefrences(cohort, NUM_GROUPS, 5, seed=3, **kwargs), True),
+}
+
+
+@pytest.mark.parametrize("solver", SOLVERS)
+def test_warm_start_beats_a_cold_start_with_the_same_budget(solver, roster_change, standard_previous_groups):
+    _, previous_groups, cohort = roster_change
+    solve, with_preferences = SOLVERS[solver]
+    if not with_preferences:
+        previous_groups = standard_previous_groups
+
+    warm_groups = solve(cohort, initial_groups=previous_groups)
+    cold_groups = solve(cohort)
+    assert sum(len(group) for group in warm_groups) == cohort.size
+
+    def fitness(groups):
+        return assignment_diversity(cohort, cohort.from_groups(groups), NUM_GROUPS, with_preferences)
+
+    assert fitness(warm_groups) > fitness(cold_groups)
+    if solver in ("genetic", "genetic_preferences", "island", "abc_preferences"):
+        # הפתרון הטוב ביותר נשמר, ולכן התוצאה לא גרועה מהחלוקה המתוקנת
+        repaired = WarmStart(cohort, previous_groups, NUM_GROUPS).assignment
+        assert fitness(warm_groups) >= assignment_diversity(cohort, repaired, NUM_GROUPS, with_preferences) - 1e-9
+
+
+def test_parallel_colony_starts_from_the_warm_start(roster_change):
+    _, previous_groups, cohort = roster_change
+    groups = abc_algorithm_with_prefrences(cohort, NUM_GROUPS, 2, workers=2, seed=3, initial_groups=previous_groups)
+    repaired = WarmStart(cohort, previous_groups, NUM_GROUPS).assignment
+    assert assignment_diversity(cohort, cohort.from_groups(groups), NUM_GROUPS, True) >= assignment_diversity(cohort, repaired, NUM_GROUPS, True) - 1e-9
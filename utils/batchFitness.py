@@ -0,0 +1,90 @@
+import numpy as np
+from array import array
+from typing import List, Sequence, Union
+from utils.cohort import Cohort
+
+# מספר התאים המקסימלי (פתרונות × תלמידים) שמעובדים בבת אחת, כדי להגביל את הזיכרון של המטריצות הזמניות
+MAX_CHUNK_CELLS = 1 << 22
+
+
+def population_matrix(population: Union[Sequence[array], np.ndarray]) -> np.ndarray:
+    """
+    ממיר אוכלוסייה (רשימת וקטורי שיוך) למטריצה דו-ממדית של פתרונות × תלמידים.
+    """
+    if isinstance(population, np.ndarray):
+        return np.atleast_2d(population)
+    if len(population) == 0:
+        return np.empty((0, 0), dtype=np.intc)
+    return np.stack([np.frombuffer(assignment, dtype=np.intc) if isinstance(assignment, array) else np.asarray(assignment, dtype=np.intc) for assignment in population])
+
+
+def evaluate_population(cohort: Cohort, population: Union[Sequence[array], np.ndarray], num_groups: int, with_preferences: bool = False) -> List[float]:
+    """
+    מחשב את ציון הגיוון של כל הפתרונות באוכלוסייה בבת אחת.
+    סכומי הקבוצות מחושבים בסכימה לפי מקטעים (bincount) על כל המטריצה, וניקוד ההעדפות במכפלה של מטריצת השיוך
+    ברשימת קשתות ההעדפה. התוצאה זהה (עד כדי שגיאת עיגול) ל-assignment_diversity / calculate_diversity של כל פתרון.
+
+    :param population: רשימת וקטורי שיוך או מטריצה בגודל פתרונות × תלמידים.
+    :param with_preferences: האם להוסיף נקודה לכל תלמיד שנמצא עם לפחות אחת מהעדפותיו.
+    :return: רשימת הציונים לפי סדר הפתרונות.
+    """
+    matrix = population_matrix(population)
+    if matrix.shape[0] == 0:
+        return []
+
+    scores = np.frombuffer(cohort.scores, dtype=np.float64)
+    rows_per_chunk = max(1, MAX_CHUNK_CELLS // max(1, cohort.size))
+    results = []
+    for start in range(0, matrix.shape[0], rows_per_chunk):
+        chunk = matrix[start:start + rows_per_chunk]
+        fitness = _chunk_diversity(scores, chunk, num_groups)
+        if with_preferences:
+            fitness += _chunk_preference_hits(cohort, chunk)
+        results.extend(fitness.tolist())
+    return results
+
+
+def _chunk_diversity(scores: np.ndarray, chunk: np.ndarray, num_groups: int) -> np.ndarray:
+    """
+    ממוצע הגיוון פחות השונות בין הקבוצות, לכל שורה במטריצה.
+    """
+    num_rows, size = chunk.shape
+    # מפתח ייחודי לכל זוג (פתרון, קבוצה) כדי שכל הסכומים יחושבו ב-bincount אחד
+    keys = (chunk.astype(np.int64) + (np.arange(num_rows, dtype=np.int64) * num_groups)[:, None]).ravel()
+    length = num_rows * num_groups
+
+    counts = np.bincount(keys, minlength=length).reshape(num_rows, num_groups)
+    sums = np.bincount(keys, weights=np.tile(scores, num_rows), minlength=length).reshape(num_rows, num_groups)
+    means = sums / np.maximum(counts, 1)
+
+    # מעבר שני: סכום ריבועי הסטיות מהממוצע של כל קבוצה
+    deviations = scores[None, :] - np.take_along_axis(means, chunk.astype(np.int64), axis=1)
+    squared = np.bincount(keys, weights=(deviations * deviations).ravel(), minlength=length).reshape(num_rows, num_groups)
+    diversities = np.where(counts > 1, np.sqrt(squared / np.maximum(counts - 1, 1)), 0.0)
+
+    mean_diversity = diversities.sum(axis=1) / num_groups
+    if num_groups > 1:
+        diversity_variance = diversities.std(axis=1, ddof=1)
+    else:
+        diversity_variance = np.zeros(num_rows)
+    return mean_diversity - diversity_variance
+
+
+def _chunk_preference_hits(cohort: Cohort, chunk: np.ndarray) -> np.ndarray:
+    """
+    סופר לכל שורה כמה תלמידים נמצאים בקבוצה עם לפחות אחת מהעדפותיהם.
+    """
+    offsets, targets = cohort.preference_csr()
+    offsets = np.frombuffer(offsets, dtype=np.intc)
+    targets = np.frombuffer(targets, dtype=np.intc)
+    if len(targets) == 0:
+        return np.zeros(chunk.shape[0])
+
+    # לכל קשת העדפה (תלמיד -> מועדף): האם שניהם באותה קבוצה
+    sources = np.repeat(np.arange(cohort.size), np.diff(offsets))
+    same_group = chunk[:, sources] == chunk[:, targets]
+
+    # תלמיד מרוצה אם לפחות אחת מהקשתות שלו מתקיימת (OR על המקטע של כל תלמיד עם העדפות)
+    starts = offsets[:-1][np.diff(offsets) > 0]
+    satisfied = np.logical_or.reduceat(same_group, starts, axis=1)
+    return satisfied.sum(axis=1).astype(np.float64)
@@ -0,0 +1,106 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Union
+from Genetic.StandardGenetic import genetic_algorithm
+from Genetic.PreferencesGenetic import genetic_algorithm_with_preferences
+from ABC.StandardABC import abc_algorithm
+from ABC.PrefrencesABC import abc_algorithm_with_prefrences
+from utils.cohort import Cohort, as_cohort, assignment_diversity
+from utils.student import Student
+
+# האלגוריתמים שאפשר להריץ באצווה, והאם הציון שלהם כולל את ניקוד ההעדפות
+SOLVERS = {
+    "genetic": (genetic_algorithm, False),
+    "genetic_preferences": (genetic_algorithm_with_preferences, True),
+    "abc": (abc_algorithm, False),
+    "abc_preferences": (abc_algorithm_with_prefrences, True),
+}
+# פרמטרים חובה של האלגוריתמים הגנטיים, עם הערכים של main.py כברירת מחדל
+GENETIC_DEFAULTS = {"population_size": 5, "generations": 50, "mutation_rate": 0.3}
+
+
+class SolveJob(NamedTuple):
+    """
+    מחזור אחד לחלוקה באצווה.
+    """
+    students: Union[List[Student], Cohort]
+    num_groups: int
+    solver: str = "genetic_preferences"
+    # פרמטרים נוספים לאלגוריתם, למשל {"population_size": 20, "generations": 500, "mutation_rate": 0.3}
+    options: Optional[dict] = None
+    # שם לזיהוי התוצאה (למשל שם הכיתה)
+    name: Optional[str] = None
+
+
+class SolveResult(NamedTuple):
+    """
+    התוצאה של מחזור אחד. אם האלגוריתם נכשל, groups הוא None ו-error מכיל את השגיאה.
+    """
+    index: int                                  # המיקום של המחזור ברשימת המשימות
+    name: Optional[str]
+    groups: Optional[List[List[Student]]]
+    fitness: Optional[float]                    # הציון של החלוקה (עם העדפות, אם האלגוריתם מתחשב בהן)
+    elapsed: float                              # זמן הריצה של האלגוריתם, בשניות
+    error: Optional[str] = None
+
+
+def _run_job(index: int, job: SolveJob, seed) -> SolveResult:
+    """
+    מריץ משימה אחת (בתהליך עבודה או בתהליך הנוכחי).
+    """
+    solve, with_preferences = SOLVERS[job.solver]
+    options = dict(job.options or {})
+    if job.solver.startswith("genetic"):
+        options = {**GENETIC_DEFAULTS, **options}
+    if seed is not None:
+        options.setdefault("seed", seed)
+
+    start_time = time.perf_counter()
+    try:
+        cohort = as_cohort(job.students)
+        groups = solve(cohort, job.num_groups, **options)
+        elapsed_time = time.perf_counter() - start_time
+        fitness = assignment_diversity(cohort, cohort.from_groups(groups), job.num_groups, with_preferences)
+    except Exception as error:
+        return SolveResult(index, job.name, None, None, time.perf_counter() - start_time, f"{type(error).__name__}: {error}")
+    return SolveResult(index, job.name, groups, fitness, elapsed_time)
+
+
+def solve_batch(jobs: Sequence[SolveJob], workers: Optional[int] = None, seed: Optional[int] = None) -> Iterator[SolveResult]:
+    """
+    פותר הרבה מחזורים בלתי תלויים במאגר תהליכים ומחזיר את התוצאות אחת-אחת, לפי סדר הסיום.
+    המשימות נשלחות מהמחזור הגדול לקטן, כך שהמשימות הארוכות מתחילות ראשונות והקטנות ממלאות את הזמן שנשאר.
+    שגיאה במשימה אחת לא עוצרת את האצווה: היא מוחזרת ב-error של התוצאה שלה.
+
+    :param jobs: המשימות. options חייבים להיות ניתנים ל-pickle (למשל בלי callback של progress) כשיש יותר מתהליך אחד.
+    :param workers: מספר התהליכים (ברירת מחדל: מספר המעבדים, 1 = הרצה סדרתית בתהליך הנוכחי).
+    :param seed: זרע בסיס. כל משימה בלי seed משלה מקבלת זרע שנגזר ממנו ומהמיקום שלה,
+        ולכן התוצאות לא תלויות במספר התהליכים ובסדר הסיום.
+    :return: איטרטור של SolveResult. עצירת האיטרציה באמצע מבטלת את המשימות שעוד לא התחילו.
+    """
+    for job in jobs:
+        if job.solver not in SOLVERS:
+            raise ValueError(f"Unknown solver: {job.solver}")
+
+    # הגדולים קודם (Longest Processing Time first)
+    order = sorted(range(len(jobs)), key=lambda index: len(jobs[index].students), reverse=True)
+    seeds = [f"{seed}:{index}" if seed is not None else None for index in range(len(jobs))]
+    workers = min(workers or os.cpu_count() or 1, max(1, len(jobs)))
+    if workers == 1:
+        return (_run_job(index, jobs[index], seeds[index]) for index in order)
+    return _solve_in_pool(jobs, order, seeds, workers)
+
+
+def _solve_in_pool(jobs: Sequence[SolveJob], order: List[int], seeds: list, workers: int) -> Iterator[SolveResult]:
+    """
+    מריץ את המשימות במאגר תהליכים ומחזיר כל תוצאה ברגע שהיא מסתיימת.
+    """
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        # התור של המאגר שומר על סדר השליחה, ולכן המשימות מתחילות לפי הגודל
+        futures = [executor.submit(_run_job, index, jobs[index], seeds[index]) for index in order]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
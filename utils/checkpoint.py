@@ -0,0 +1,107 @@
+import hashlib
+import os
+import pickle
+import time
+from array import array
+from typing import Optional
+from utils.cohort import Cohort
+
+# מזהה הקובץ וגרסת הפורמט. כל שינוי במבנה המצב מחייב להעלות את הגרסה
+MAGIC = b"GRPCKPT"
+VERSION = 1
+# כל כמה דורות / איטרציות נכתבת נקודת שמירה כברירת מחדל
+DEFAULT_CHECKPOINT_INTERVAL = 100
+
+
+def run_fingerprint(algorithm: str, cohort: Cohort, num_groups: int, **parameters) -> str:
+    """
+    טביעת אצבע של ריצה: האלגוריתם, המחזור (מזהים, ציונים והעדפות), מספר הקבוצות והפרמטרים שמשפיעים על המצב.
+    הקריטריונים משפיעים על הכושר רק דרך הציונים, ולכן הם נכללים דרכם.
+    נקודת שמירה ממשיכה רק ריצה עם אותה טביעת אצבע. מספר הדורות ותנאי העצירה לא נכללים,
+    כך שאפשר להמשיך ריצה עם יותר דורות.
+    """
+    digest = hashlib.sha256()
+    digest.update(repr((algorithm, num_groups, sorted(parameters.items()))).encode())
+    digest.update(repr(_python_values(cohort.ids)).encode())
+    digest.update(array("d", cohort.scores).tobytes())
+    digest.update(array("q", cohort.preference_offsets).tobytes())
+    digest.update(repr(_python_values(cohort.preference_ids)).encode())
+    return digest.hexdigest()
+
+
+def _python_values(values) -> list:
+    """
+    המזהים כרשימה של ערכי פייתון, כך שמחזור עם views של NumPy מקבל את אותה טביעת אצבע.
+    """
+    return [value.item() if hasattr(value, "item") else value for value in values]
+
+
+class Checkpointer:
+    """
+    נקודות שמירה לריצות ארוכות: המצב של האלגוריתם (וקטורי השיוך, הציונים, מצב המחולל האקראי, מונה הדורות וכו')
+    נכתב לקובץ כל interval דורות (או כל time_interval שניות), ובסוף הריצה.
+    הכתיבה היא לקובץ זמני שמוחלף בסוף אחרי fsync, כך שהפסקה באמצע כתיבה משאירה את נקודת השמירה הקודמת שלמה.
+    ריצה עם אותו Checkpointer (אותו נתיב) ממשיכה מנקודת השמירה האחרונה ומגיעה לאותה תוצאה בדיוק כמו ריצה בלי הפסקה.
+    הקובץ הוא pickle, ולכן יש לטעון רק נקודות שמירה שהריצה עצמה כתבה.
+    """
+    def __init__(self, path: str, interval: Optional[int] = DEFAULT_CHECKPOINT_INTERVAL, time_interval: Optional[float] = None, resume: bool = True):
+        """
+        :param path: הנתיב של קובץ נקודת השמירה.
+        :param interval: כל כמה דורות / איטרציות לשמור (None = לא לפי דורות).
+        :param time_interval: כל כמה שניות לשמור (None = לא לפי זמן).
+        :param resume: האם להמשיך מנקודת שמירה קיימת (False = להתחיל מחדש ולדרוס אותה).
+        """
+        self.path = path
+        self.interval = interval
+        self.time_interval = time_interval
+        self.resume = resume
+        self.saves = 0
+        self._last_save = time.perf_counter()
+
+    def load(self, fingerprint: str) -> Optional[dict]:
+        """
+        טוען את המצב מנקודת השמירה.
+        :return: המצב, או None אם אין נקודת שמירה (או ש-resume כבוי).
+        :raises ValueError: אם הקובץ אינו נקודת שמירה בגרסה הנוכחית, או שהוא של ריצה אחרת.
+        """
+        self._last_save = time.perf_counter()
+        if not self.resume or not os.path.exists(self.path):
+            return None
+        with open(self.path, "rb") as file:
+            try:
+                magic, version, stored_fingerprint, state = pickle.load(file)
+            except Exception:
+                raise ValueError(f"Not a checkpoint: {self.path}")
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a checkpoint (version {VERSION}): {self.path}")
+        if stored_fingerprint != fingerprint:
+            raise ValueError(f"Checkpoint belongs to a different run: {self.path}")
+        return state
+
+    def due(self, iteration: int, iterations: Optional[int], stopped: bool) -> bool:
+        """
+        האם לשמור אחרי הדור הזה: כל interval דורות, כשעבר time_interval, ובדור האחרון של הריצה.
+        :param iteration: מספר הדור (מ-0, כמו בלולאה).
+        :param iterations: מספר הדורות של הריצה (None = עד תנאי העצירה).
+        :param stopped: האם הריצה נעצרת אחרי הדור הזה.
+        """
+        return (stopped or iteration + 1 == iterations
+                or (self.interval is not None and (iteration + 1) % self.interval == 0)
+                or (self.time_interval is not None and time.perf_counter() - self._last_save >= self.time_interval))
+
+    def save(self, fingerprint: str, state: dict) -> None:
+        """
+        כותב את המצב לקובץ באופן אטומי.
+        """
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary_path, "wb") as file:
+                pickle.dump((MAGIC, VERSION, fingerprint, state), file, protocol=pickle.HIGHEST_PROTOCOL)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary_path, self.path)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+        self.saves += 1
+        self._last_save = time.perf_counter()
@@ -0,0 +1,283 @@
+import math
+from array import array
+from typing import List, Sequence, Tuple
+from utils.student import Student
+
+# קוד הטיפוס של וקטור השיוך: מספר קבוצה (int) לכל תלמיד
+ASSIGNMENT_TYPECODE = "i"
+# ערך לתלמיד שעוד לא שויך לקבוצה
+UNASSIGNED = -1
+# קוד הטיפוס של מזהי התלמידים
+STUDENT_ID_TYPECODE = "q"
+
+
+def _python_value(value):
+    """
+    ממיר סקלר של NumPy לטיפוס של פייתון, ומשאיר ערכים אחרים (int, str) כמו שהם.
+    """
+    return value.item() if hasattr(value, "item") else value
+
+
+class Cohort:
+    """
+    ייצוג קומפקטי של מחזור תלמידים עבור האלגוריתמים.
+    הציונים וההעדפות מחושבים פעם אחת למערכים רציפים, ופתרון הוא וקטור שיוך באורך N
+    שבו assignment[i] הוא מספר הקבוצה של התלמיד במקום ה-i.
+    """
+    def __init__(self, students: List[Student]):
+        """
+        :param students: רשימת אובייקטי סטודנטים (List[Student]).
+        """
+        self._students = list(students)
+        self.names = [student.name for student in self._students]
+        self.criteria_names = ()
+        self.criteria_types = ()
+        self.criteria_values = None
+        self._student_criteria = None
+        self._reopen = None
+
+        # אם לכל התלמידים אותם קריטריונים, נשמרים גם הערכים הגולמיים כמטריצה (למשל לזיכרון משותף)
+        schema = [(criteria.get("name"), criteria.get("type")) for criteria in self._students[0].criteria] if self._students else []
+        if schema and all([(criteria.get("name"), criteria.get("type")) for criteria in student.criteria] == schema for student in self._students):
+            self.criteria_names = tuple(name for name, _ in schema)
+            self.criteria_types = tuple(criteria_type for _, criteria_type in schema)
+            self.criteria_values = array("d", (float(criteria.get("value", 0)) for student in self._students for criteria in student.criteria))
+
+        # המזהים נשמרים כרשימה, כי אובייקטי סטודנטים לא מחייבים מזהים מספריים
+        offsets = array(ASSIGNMENT_TYPECODE, [0])
+        preference_ids = []
+        for student in self._students:
+            preference_ids.extend(student.preferences)
+            offsets.append(len(preference_ids))
+
+        self._build(
+            [student.id for student in self._students],
+            array("d", (student.get_score() for student in self._students)),
+            offsets,
+            preference_ids
+        )
+
+    @classmethod
+    def from_arrays(cls, ids: Sequence[int], names: Sequence[str], scores: Sequence[float], preference_offsets: Sequence[int], preference_ids: Sequence[int],
+                    criteria_names: Sequence[str] = (), criteria_types: Sequence[str] = (), criteria_values: Sequence[float] = None,
+                    student_criteria: Sequence[List[dict]] = None) -> "Cohort":
+        """
+        בונה מחזור ישירות ממערכים, בלי ליצור אובייקט Student לכל תלמיד (למשל בטעינה מזרם או מקובץ בינארי).
+        אובייקטי הסטודנטים נבנים מחדש רק כשמבקשים אותם (למשל ב-to_groups).
+
+        :param preference_offsets: מערך באורך N+1, ההעדפות (לפי מזהה) של התלמיד i הן preference_ids[offsets[i]:offsets[i + 1]].
+        :param criteria_names: שמות הקריטריונים, משותפים לכל התלמידים.
+        :param criteria_types: סוגי הקריטריונים ("0-1", "0-10", "0-100").
+        :param criteria_values: הערכים הגולמיים של הקריטריונים, שורה לכל תלמיד (N × M ברצף).
+        :param student_criteria: הקריטריונים של כל תלמיד בנפרד, כשאין סכמה משותפת (criteria_values הוא None).
+        """
+        cohort = cls.__new__(cls)
+        cohort._students = None
+        cohort.names = names
+        cohort.criteria_names = tuple(criteria_names)
+        cohort.criteria_types = tuple(criteria_types)
+        cohort.criteria_values = criteria_values
+        cohort._student_criteria = student_criteria
+        cohort._reopen = None
+        cohort._build(ids, scores, preference_offsets, preference_ids)
+        return cohort
+
+    def _build(self, ids: Sequence[int], scores: Sequence[float], preference_offsets: Sequence[int], preference_ids: Sequence[int]) -> None:
+        """
+        בונה את כל המבנים הנגזרים מהמערכים הבסיסיים.
+        """
+        self.size = len(ids)
+        self.ids = ids
+        self.index_of = {student_id: index for index, student_id in enumerate(ids)}
+
+        # וקטור הציונים של כל התלמידים
+        self.scores = scores
+
+        # ההעדפות המקוריות (לפי מזהה) בפורמט CSR
+        self.preference_offsets = preference_offsets
+        self.preference_ids = preference_ids
+
+        # מטריצת העדפות: לכל תלמיד, המיקומים של התלמידים שהוא מעדיף (העדפות למזהים לא קיימים לא יכולות להתקיים ולכן מושמטות)
+        index_of = self.index_of
+        self.preferences = tuple(
+            tuple(index_of[preference] for preference in preference_ids[preference_offsets[index]:preference_offsets[index + 1]] if preference in index_of)
+            for index in range(self.size)
+        )
+
+        # רשימות ההעדפה ההפוכות: לכל תלמיד, המיקומים של התלמידים שמעדיפים אותו
+        preferred_by = [[] for _ in range(self.size)]
+        for index, preferences in enumerate(self.preferences):
+            for preference in preferences:
+                preferred_by[preference].append(index)
+        self.preferred_by = tuple(tuple(indices) for indices in preferred_by)
+
+        # הציונים מוזזים בממוצע הכללי, לחישובי סכום ריבועים יציבים יותר
+        offset = sum(self.scores) / self.size if self.size else 0.0
+        self.centered_scores = array("d", (score - offset for score in self.scores))
+
+        self._preference_csr = None
+
+    @property
+    def students(self) -> List[Student]:
+        """
+        אובייקטי הסטודנטים של המחזור. במחזור שנבנה ממערכים הם נבנים מחדש בפעם הראשונה שמבקשים אותם.
+        """
+        if self._students is None:
+            self._students = [self.student(index) for index in range(self.size)]
+        return self._students
+
+    def student(self, index: int) -> Student:
+        """
+        מחזיר את אובייקט הסטודנט במקום index.
+        """
+        if self._students is not None:
+            return self._students[index]
+
+        num_criteria = len(self.criteria_names)
+        values = self.criteria_values[index * num_criteria:(index + 1) * num_criteria] if num_criteria else ()
+        # המערכים יכולים להיות views של NumPy, ולכן הערכים מומרים לטיפוסים של פייתון (המזהים יכולים להיות גם מחרוזות)
+        return Student({
+            "id": _python_value(self.ids[index]),
+            "name": self.names[index],
+            "preferences": [_python_value(preference) for preference in self.preference_ids[self.preference_offsets[index]:self.preference_offsets[index + 1]]],
+            "criteria": [dict(criteria) for criteria in self._student_criteria[index]] if self._student_criteria is not None else [
+                {"name": name, "type": criteria_type, "value": float(value)}
+                for name, criteria_type, value in zip(self.criteria_names, self.criteria_types, values)
+            ]
+        })
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __reduce_ex__(self, protocol):
+        # מחזור שנפתח מקובץ ממופה נשלח לתהליכים אחרים כנתיב ונפתח שם מחדש, במקום להעתיק את המערכים
+        if self._reopen is not None:
+            return self._reopen
+        return super().__reduce_ex__(protocol)
+
+    def preference_csr(self) -> Tuple[array, array]:
+        """
+        מחזיר את מטריצת ההעדפות בפורמט CSR: offsets באורך N+1 ו-targets עם כל ההעדפות ברצף,
+        כך שההעדפות של התלמיד i הן targets[offsets[i]:offsets[i + 1]]. מחושב פעם אחת ונשמר.
+        """
+        if self._preference_csr is None:
+            offsets = array(ASSIGNMENT_TYPECODE, [0])
+            targets = array(ASSIGNMENT_TYPECODE)
+            for preferences in self.preferences:
+                targets.extend(preferences)
+                offsets.append(len(targets))
+            self._preference_csr = (offsets, targets)
+        return self._preference_csr
+
+    def new_assignment(self) -> array:
+        """
+        יוצר וקטור שיוך ריק (כל התלמידים לא משויכים).
+        """
+        return array(ASSIGNMENT_TYPECODE, [UNASSIGNED]) * self.size
+
+    def from_groups(self, groups: List[List[Student]]) -> array:
+        """
+        ממיר חלוקה לקבוצות (רשימת רשימות של סטודנטים) לוקטור שיוך.
+        """
+        assignment = self.new_assignment()
+        for group_index, group in enumerate(groups):
+            for student in group:
+                assignment[self.index_of[student.id]] = group_index
+        return assignment
+
+    def to_groups(self, assignment: Sequence[int], num_groups: int) -> List[List[Student]]:
+        """
+        ממיר וקטור שיוך חזרה לחלוקה לקבוצות של אובייקטי סטודנטים.
+        """
+        groups = [[] for _ in range(num_groups)]
+        for index, group_index in enumerate(assignment):
+            if group_index != UNASSIGNED:
+                groups[group_index].append(self.students[index])
+        return groups
+
+
+def as_cohort(students) -> Cohort:
+    """
+    מקבל רשימת סטודנטים או מחזור קיים ומחזיר מחזור (בלי לבנות מחדש מחזור קיים).
+    """
+    if isinstance(students, Cohort):
+        return students
+    return Cohort(students)
+
+
+def group_sizes(assignment: Sequence[int], num_groups: int) -> List[int]:
+    """
+    מחזיר את גודל כל קבוצה בוקטור השיוך.
+    """
+    sizes = [0] * num_groups
+    for group_index in assignment:
+        if group_index != UNASSIGNED:
+            sizes[group_index] += 1
+    return sizes
+
+
+def group_members(assignment: Sequence[int], group_index: int) -> List[int]:
+    """
+    מחזיר את המיקומים של התלמידים בקבוצה מסוימת.
+    """
+    return [index for index, group in enumerate(assignment) if group == group_index]
+
+
+def sample_stdev(values: Sequence[float]) -> float:
+    """
+    סטיית תקן מדגמית (כמו statistics.stdev), מחזירה 0 עבור פחות משני נתונים.
+    """
+    count = len(values)
+    if count < 2:
+        return 0.0
+    mean = sum(values) / count
+    return math.sqrt(sum((value - mean) ** 2 for value in values) / (count - 1))
+
+
+def preference_hits(cohort: Cohort, assignment: Sequence[int]) -> int:
+    """
+    סופר כמה תלמידים נמצאים בקבוצה עם לפחות אחת מההעדפות שלהם.
+    """
+    hits = 0
+    for index, preferences in enumerate(cohort.preferences):
+        group_index = assignment[index]
+        for preference in preferences:
+            if assignment[preference] == group_index:
+                hits += 1
+                break
+    return hits
+
+
+def assignment_diversity(cohort: Cohort, assignment: Sequence[int], num_groups: int, with_preferences: bool = False) -> float:
+    """
+    מחשב את ציון הגיוון של וקטור שיוך, זהה ל-calculate_diversity של החלוקה המתאימה לקבוצות,
+    אבל ישירות מתוך המערכים של המחזור וללא מעבר על אובייקטי הסטודנטים.
+
+    :param with_preferences: האם להוסיף נקודה לכל תלמיד שנמצא עם לפחות אחת מהעדפותיו.
+    """
+    scores = cohort.scores
+    sums = [0.0] * num_groups
+    counts = [0] * num_groups
+    for index, group_index in enumerate(assignment):
+        sums[group_index] += scores[index]
+        counts[group_index] += 1
+
+    # מעבר שני: סכום ריבועי הסטיות מהממוצע של כל קבוצה
+    means = [sums[g] / counts[g] if counts[g] else 0.0 for g in range(num_groups)]
+    squared_deviations = [0.0] * num_groups
+    for index, group_index in enumerate(assignment):
+        deviation = scores[index] - means[group_index]
+        squared_deviations[group_index] += deviation * deviation
+
+    group_diversities = [
+        math.sqrt(squared_deviations[g] / (counts[g] - 1)) if counts[g] > 1 else 0.0
+        for g in range(num_groups)
+    ]
+
+    # ממוצע הגיוון בקבוצות פחות השונות בין הגיוונים (עונש על חוסר אחידות)
+    mean_diversity = sum(group_diversities) / num_groups
+    total_score = mean_diversity - sample_stdev(group_diversities)
+
+    if with_preferences:
+        total_score += preference_hits(cohort, assignment)
+    return total_score
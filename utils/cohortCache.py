@@ -0,0 +1,110 @@
+import hashlib
+import mmap
+import os
+import struct
+from array import array
+from typing import Optional
+from utils.cohort import Cohort
+from utils.cohortLayout import CohortCounts, layout, pack_cohort, unpack_cohort
+from utils.cohortLoader import load_cohort
+
+# מזהה הקובץ וגרסת הפורמט. כל שינוי במבנה מחייב להעלות את הגרסה, וקבצים ישנים ייבנו מחדש
+MAGIC = b"GRPCOHRT"
+VERSION = 1
+# סיומת קובץ המטמון, שנשמר ליד קובץ הגייסון
+CACHE_SUFFIX = ".cohort"
+
+# כותרת: מזהה, גרסה, גיבוב המקור (sha256), מספר תלמידים, מספר קריטריונים, מספר העדפות, גודל טבלת השמות, גודל הסכמה
+_HEADER = struct.Struct("<8sI32sQQQQQ")
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+def source_digest(file_name: str) -> bytes:
+    """
+    גיבוב sha256 של תוכן קובץ המקור, לזיהוי מטמון שכבר לא מתאים לקובץ.
+    """
+    digest = hashlib.sha256()
+    with open(file_name, "rb") as file:
+        for chunk in iter(lambda: file.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def cache_path(file_name: str) -> str:
+    """
+    הנתיב של קובץ המטמון עבור קובץ גייסון.
+    """
+    return f"{file_name}{CACHE_SUFFIX}"
+
+
+def write_cohort_cache(cohort: Cohort, path: str, digest: bytes) -> None:
+    """
+    כותב את המערכים של המחזור לקובץ בינארי: כותרת, ציונים, ערכי קריטריונים, העדפות בפורמט CSR, מזהים ושמות.
+    הכתיבה היא לקובץ זמני שמוחלף בסוף, כך שתהליך אחר לעולם לא יראה קובץ חלקי.
+    """
+    counts, data = pack_cohort(cohort)
+    header = _HEADER.pack(MAGIC, VERSION, digest, *counts)
+
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary_path, "wb") as file:
+            file.write(header)
+            position = len(header)
+            for name, _, offset, _ in layout(counts, _HEADER.size)[0]:
+                file.write(b"\0" * (offset - position))
+                file.write(data[name])
+                position = offset + len(data[name])
+        os.replace(temporary_path, path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+
+def open_cohort_cache(path: str, digest: Optional[bytes] = None) -> Cohort:
+    """
+    פותח קובץ מטמון עם mmap ובונה ממנו מחזור. הציונים, ההעדפות, המזהים והשמות הם views ישירים על הקובץ הממופה (בלי העתקה),
+    כך שכמה תהליכים שפותחים את אותו קובץ חולקים עותק פיזי אחד שלו. המחזור נשלח לתהליכי עבודה כנתיב ונפתח שם מחדש.
+
+    :param digest: גיבוב המקור הצפוי. אם הוא לא תואם לגיבוב שבקובץ המטמון, המטמון ישן.
+    :raises ValueError: אם הקובץ אינו קובץ מטמון בגרסה הנוכחית או שהמטמון ישן.
+    """
+    with open(path, "rb") as file:
+        mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(mapping) < _HEADER.size:
+        raise ValueError(f"Not a cohort cache: {path}")
+    magic, version, stored_digest, *counts = _HEADER.unpack_from(mapping)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Not a cohort cache (version {VERSION}): {path}")
+    if digest is not None and digest != stored_digest:
+        raise ValueError(f"Stale cohort cache: {path}")
+    counts = CohortCounts(*counts)
+    if layout(counts, _HEADER.size)[1] > len(mapping):
+        raise ValueError(f"Truncated cohort cache: {path}")
+
+    buffer = memoryview(mapping)
+
+    def view(typecode: str, offset: int, length: int) -> memoryview:
+        return buffer[offset:offset + length * array(typecode).itemsize].cast(typecode)
+
+    cohort = unpack_cohort(counts, view, _HEADER.size)
+    # ה-views מחזיקים את המיפוי פתוח כל עוד המחזור קיים
+    cohort._mapping = mapping
+    cohort._reopen = (open_cohort_cache, (os.path.abspath(path), stored_digest))
+    return cohort
+
+
+def load_cached_cohort(file_name: str) -> Cohort:
+    """
+    טוען מחזור מקובץ גייסון דרך המטמון הבינארי: אם קיים מטמון עם אותו גיבוב תוכן הוא נפתח ישירות,
+    אחרת הקובץ נטען בזרם (load_cohort), נכתב למטמון ונפתח ממנו.
+    """
+    digest = source_digest(file_name)
+    path = cache_path(file_name)
+    try:
+        return open_cohort_cache(path, digest)
+    except (FileNotFoundError, ValueError):
+        pass
+
+    write_cohort_cache(load_cohort(file_name), path, digest)
+    return open_cohort_cache(path, digest)
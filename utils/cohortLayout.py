@@ -0,0 +1,173 @@
+import json
+import numbers
+from array import array
+from collections.abc import Sequence
+from typing import Callable, Dict, List, NamedTuple, Tuple
+from utils.cohort import ASSIGNMENT_TYPECODE, STUDENT_ID_TYPECODE, Cohort
+
+# כל מקטע מתחיל בכתובת שמתחלקת ב-8, כדי שאפשר יהיה לקרוא אותו ישירות כמערך
+ALIGNMENT = 8
+
+# המקטעים של מחזור בזיכרון רציף, לפי הסדר: (שם, קוד טיפוס)
+SECTIONS = (
+    ("scores", "d"),
+    ("criteria_values", "d"),
+    ("preference_offsets", ASSIGNMENT_TYPECODE),
+    ("preference_ids", STUDENT_ID_TYPECODE),
+    ("ids", STUDENT_ID_TYPECODE),
+    ("name_offsets", "q"),
+    ("names", "B"),
+    ("schema", "B"),
+)
+
+
+class CohortCounts(NamedTuple):
+    """
+    הגדלים שקובעים את הפריסה של המקטעים.
+    """
+    size: int
+    num_criteria: int
+    num_preferences: int
+    names_length: int
+    schema_length: int
+
+
+class NameTable(Sequence):
+    """
+    טבלת שמות מתוך זיכרון רציף (אורכים וגוש UTF-8): השמות מפוענחים רק כשניגשים אליהם.
+    """
+    def __init__(self, offsets, blob):
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return bytes(self._blob[self._offsets[index]:self._offsets[index + 1]]).decode("utf-8")
+
+
+def section_lengths(counts: CohortCounts) -> Tuple[int, ...]:
+    """
+    מספר האיברים בכל מקטע, לפי הסדר של SECTIONS.
+    """
+    return (
+        counts.size,
+        counts.size * counts.num_criteria,
+        counts.size + 1,
+        counts.num_preferences,
+        counts.size,
+        counts.size + 1,
+        counts.names_length,
+        counts.schema_length,
+    )
+
+
+def layout(counts: CohortCounts, start: int = 0) -> Tuple[List[Tuple[str, str, int, int]], int]:
+    """
+    מחשב את מיקום כל מקטע: רשימה של (שם, קוד טיפוס, כתובת התחלה, מספר איברים) והגודל הכולל.
+    """
+    sections = []
+    position = start
+    for (name, typecode), length in zip(SECTIONS, section_lengths(counts)):
+        position += -position % ALIGNMENT
+        sections.append((name, typecode, position, length))
+        position += length * array(typecode).itemsize
+    return sections, position
+
+
+def _id_table(cohort: Cohort) -> Tuple[list, List[int], List[int]]:
+    """
+    טבלת מזהים למחזור עם מזהים שאינם מספרים שלמים (למשל מחרוזות): המזהים של התלמידים ואחריהם מזהים
+    שמופיעים רק בהעדפות. במקטעים נשמרים המיקומים בטבלה, והטבלה עצמה נשמרת בסכמה.
+    :return: הטבלה, המיקומים של המזהים והמיקומים של ההעדפות.
+    :raises ValueError: אם יש מזהה שאינו מספר שלם או מחרוזת.
+    """
+    table = list(cohort.ids)
+    position = {student_id: index for index, student_id in enumerate(table)}
+    preference_positions = []
+    for preference in cohort.preference_ids:
+        if preference not in position:
+            position[preference] = len(table)
+            table.append(preference)
+        preference_positions.append(position[preference])
+    for student_id in table:
+        if not isinstance(student_id, (numbers.Integral, str)) or isinstance(student_id, bool):
+            raise ValueError(f"Student ids must be integers or strings to share a cohort between processes, got {student_id!r}")
+    return [int(student_id) if isinstance(student_id, numbers.Integral) else student_id for student_id in table], list(range(cohort.size)), preference_positions
+
+
+def pack_cohort(cohort: Cohort) -> Tuple[CohortCounts, Dict[str, bytes]]:
+    """
+    ממיר את המערכים של המחזור לבתים, מקטע לכל מערך.
+    מזהים שהם מספרים שלמים נשמרים ישירות במקטעים. אחרת נשמרת טבלת מזהים בסכמה והמקטעים מחזיקים מיקומים בה.
+    אם לתלמידים אין סכמת קריטריונים משותפת (criteria_values הוא None), הקריטריונים של כל תלמיד נשמרים בסכמה,
+    כדי שהסטודנטים שנבנים מחדש בתהליכי העבודה יקבלו את אותם ציונים.
+    """
+    num_criteria = len(cohort.criteria_names)
+    names = [(name if name is not None else "").encode("utf-8") for name in cohort.names]
+    name_offsets = array("q", [0])
+    for name in names:
+        name_offsets.append(name_offsets[-1] + len(name))
+
+    schema = {"names": list(cohort.criteria_names), "types": list(cohort.criteria_types)}
+    if cohort.criteria_values is None:
+        student_criteria = [list(cohort.student(index).criteria) for index in range(cohort.size)]
+        if any(student_criteria):
+            schema["student_criteria"] = student_criteria
+    ids, preference_ids = cohort.ids, cohort.preference_ids
+    if not all(isinstance(value, numbers.Integral) for value in ids) or not all(isinstance(value, numbers.Integral) for value in preference_ids):
+        schema["id_table"], ids, preference_ids = _id_table(cohort)
+    schema = json.dumps(schema).encode("utf-8")
+
+    data = {
+        "scores": array("d", cohort.scores).tobytes(),
+        "criteria_values": array("d", cohort.criteria_values if num_criteria else ()).tobytes(),
+        "preference_offsets": array(ASSIGNMENT_TYPECODE, cohort.preference_offsets).tobytes(),
+        "preference_ids": array(STUDENT_ID_TYPECODE, preference_ids).tobytes(),
+        "ids": array(STUDENT_ID_TYPECODE, ids).tobytes(),
+        "name_offsets": name_offsets.tobytes(),
+        "names": b"".join(names),
+        "schema": schema,
+    }
+    counts = CohortCounts(cohort.size, num_criteria, len(cohort.preference_ids), name_offsets[-1], len(schema))
+    return counts, data
+
+
+def write_sections(buffer, counts: CohortCounts, data: Dict[str, bytes], start: int = 0) -> None:
+    """
+    מעתיק את המקטעים לחוצץ שכבר הוקצה בגודל המתאים (למשל זיכרון משותף).
+    """
+    for name, _, offset, _ in layout(counts, start)[0]:
+        buffer[offset:offset + len(data[name])] = data[name]
+
+
+def unpack_cohort(counts: CohortCounts, view: Callable[[str, int, int], object], start: int = 0) -> Cohort:
+    """
+    בונה מחזור מהמקטעים בלי להעתיק אותם.
+    :param view: פונקציה שמקבלת (קוד טיפוס, כתובת, מספר איברים) ומחזירה view על המקטע.
+    :param start: הכתובת שבה מתחיל המקטע הראשון (למשל אחרי כותרת).
+    """
+    sections = {name: view(typecode, offset, length) for name, typecode, offset, length in layout(counts, start)[0]}
+    schema = json.loads(bytes(sections["schema"]).decode("utf-8"))
+    ids, preference_ids = sections["ids"], sections["preference_ids"]
+    if "id_table" in schema:
+        # המקטעים מחזיקים מיקומים בטבלת המזהים
+        table = schema["id_table"]
+        ids = table[:counts.size]
+        preference_ids = [table[position] for position in preference_ids]
+    return Cohort.from_arrays(
+        ids,
+        NameTable(sections["name_offsets"], sections["names"]),
+        sections["scores"],
+        sections["preference_offsets"],
+        preference_ids,
+        schema["names"],
+        schema["types"],
+        sections["criteria_values"] if counts.num_criteria else None,
+        schema.get("student_criteria")
+    )
@@ -0,0 +1,164 @@
+import json
+from array import array
+from typing import Iterator, List, Optional, TextIO
+from utils.cohort import ASSIGNMENT_TYPECODE, STUDENT_ID_TYPECODE, Cohort
+from utils.student import CRITERIA_SCALES
+
+# גודל הקטע שנקרא מהקובץ בכל פעם
+CHUNK_SIZE = 1 << 16
+
+_decoder = json.JSONDecoder()
+
+
+def _iter_json_array(file: TextIO, buffer: str) -> Iterator[dict]:
+    """
+    מפרק מערך JSON ברמה העליונה רשומה אחרי רשומה, תוך קריאה של הקובץ בקטעים.
+    :param buffer: מה שכבר נקרא מהקובץ, מתחיל מיד אחרי ה-[ הפותח.
+    """
+    position = 0
+    expect_value = True
+    while True:
+        # דילוג על רווחים ופסיקים בין הרשומות
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n":
+                position += 1
+            if position < len(buffer):
+                break
+            chunk = file.read(CHUNK_SIZE)
+            if not chunk:
+                raise ValueError("Unexpected end of file inside JSON array")
+            buffer = buffer[position:] + chunk
+            position = 0
+
+        character = buffer[position]
+        if character == "]":
+            return
+        if character == ",":
+            if expect_value:
+                raise ValueError("Unexpected ',' in JSON array")
+            position += 1
+            expect_value = True
+            continue
+        if not expect_value:
+            raise ValueError("Missing ',' between records in JSON array")
+
+        # פענוח רשומה אחת. אם היא נחתכה באמצע הקטע, קוראים עוד ומנסים שוב
+        while True:
+            try:
+                record, end = _decoder.raw_decode(buffer, position)
+                break
+            except json.JSONDecodeError:
+                chunk = file.read(CHUNK_SIZE)
+                if not chunk:
+                    raise
+                buffer = buffer[position:] + chunk
+                position = 0
+
+        yield record
+        position = end
+        expect_value = False
+
+        # שחרור החלק שכבר פוענח כדי שהזיכרון יישאר בגודל של קטע אחד
+        if position > CHUNK_SIZE:
+            buffer = buffer[position:]
+            position = 0
+
+
+def iter_student_records(file_name: str) -> Iterator[dict]:
+    """
+    מחזיר את רשומות התלמידים מקובץ אחת אחרי השנייה, בלי לטעון את כל הקובץ לזיכרון.
+    תומך גם במערך JSON (כמו בקבצי samples) וגם ב-JSON Lines (רשומה בכל שורה).
+    """
+    with open(file_name, "r") as file:
+        buffer = ""
+        while True:
+            chunk = file.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            buffer = (buffer + chunk).lstrip()
+            if buffer:
+                break
+
+        if buffer[0] == "[":
+            yield from _iter_json_array(file, buffer[1:])
+            return
+
+        # JSON Lines: משלימים את השורה הראשונה ואז ממשיכים שורה אחרי שורה
+        first_line = buffer + file.readline() if not buffer.endswith("\n") else buffer
+        for line in first_line.splitlines():
+            if line.strip():
+                yield json.loads(line)
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def load_cohort(file_name: str) -> Cohort:
+    """
+    טוען מחזור מקובץ JSON או JSON Lines בזרם: כל רשומה נבדקת ומועתקת ישירות למערכים הקומפקטיים
+    (מזהים, ציונים, ערכי קריטריונים, העדפות) ונזרקת, בלי ליצור אובייקט Student לכל תלמיד.
+    כל התלמידים חייבים לחלוק את אותם קריטריונים (שם וסוג), כמו בקבצים שנוצרים ב-generate_students_json.
+
+    :raises ValueError: אם רשומה לא תקינה, עם מספר הרשומה.
+    """
+    ids = array(STUDENT_ID_TYPECODE)
+    names: List[str] = []
+    scores = array("d")
+    criteria_values = array("d")
+    preference_offsets = array(ASSIGNMENT_TYPECODE, [0])
+    preference_ids = array(STUDENT_ID_TYPECODE)
+    seen_ids = set()
+    criteria_names: Optional[tuple] = None
+    criteria_types: Optional[tuple] = None
+    scales: tuple = ()
+
+    for number, record in enumerate(iter_student_records(file_name), 1):
+        if not isinstance(record, dict):
+            raise ValueError(f"Record {number}: expected an object")
+
+        student_id = record.get("id")
+        if not isinstance(student_id, int) or isinstance(student_id, bool):
+            raise ValueError(f"Record {number}: id must be an integer")
+        if student_id in seen_ids:
+            raise ValueError(f"Record {number}: duplicate id {student_id}")
+        seen_ids.add(student_id)
+
+        preferences = record.get("preferences", [])
+        if not isinstance(preferences, list) or not all(isinstance(preference, int) for preference in preferences):
+            raise ValueError(f"Record {number}: preferences must be a list of ids")
+
+        criteria = record.get("criteria", [])
+        if not isinstance(criteria, list) or not all(isinstance(item, dict) for item in criteria):
+            raise ValueError(f"Record {number}: criteria must be a list of objects")
+
+        # הקריטריונים של הרשומה הראשונה קובעים את המבנה לכל הקובץ
+        if criteria_names is None:
+            criteria_names = tuple(item.get("name") for item in criteria)
+            criteria_types = tuple(item.get("type") for item in criteria)
+            for criteria_type in criteria_types:
+                if criteria_type not in CRITERIA_SCALES:
+                    raise ValueError(f"Record {number}: unknown criteria type {criteria_type}")
+            scales = tuple(CRITERIA_SCALES[criteria_type] for criteria_type in criteria_types)
+        elif len(criteria) != len(criteria_names) or any(
+            item.get("name") != name or item.get("type") != criteria_type
+            for item, name, criteria_type in zip(criteria, criteria_names, criteria_types)
+        ):
+            raise ValueError(f"Record {number}: criteria do not match the first record")
+
+        # ציון כולל באותו סדר חישוב כמו Student.get_score
+        total_score = 0.0
+        for item, scale in zip(criteria, scales):
+            try:
+                value = float(item.get("value", 0))
+            except (TypeError, ValueError):
+                raise ValueError(f"Record {number}: criteria value must be a number")
+            criteria_values.append(value)
+            total_score += value * scale
+
+        ids.append(student_id)
+        names.append(record.get("name"))
+        scores.append(total_score)
+        preference_ids.extend(preferences)
+        preference_offsets.append(len(preference_ids))
+
+    return Cohort.from_arrays(ids, names, scores, preference_offsets, preference_ids, criteria_names or (), criteria_types or (), criteria_values)
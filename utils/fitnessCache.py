@@ -0,0 +1,135 @@
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, List, Optional, Sequence, Tuple
+
+# גודל ברירת המחדל של המטמון (מספר הפתרונות השמורים)
+DEFAULT_CACHE_SIZE = 1 << 14
+
+_MASK = (1 << 64) - 1
+
+
+def mix(value: int) -> int:
+    """
+    ערבול של מספר 64 ביט (הסיום של splitmix64). mix(0) == 0, כך שקבוצה ריקה לא משנה את המפתח.
+    """
+    value &= _MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK
+    return value ^ (value >> 31)
+
+
+@lru_cache(maxsize=None)
+def student_keys(size: int) -> tuple:
+    """
+    מפתח אקראי קבוע (64 ביט) לכל מיקום של תלמיד.
+    """
+    return tuple(mix(index + 0x9E3779B97F4A7C15) for index in range(size))
+
+
+def combine_group_keys(group_keys: Sequence[int]) -> int:
+    """
+    מפתח הפתרון מתוך המפתחות של הקבוצות (סכום מפתחות החברים בכל קבוצה).
+    הסכום על הקבוצות לא תלוי בסדר שלהן, ולכן שני פתרונות שנבדלים רק במספור הקבוצות מקבלים אותו מפתח.
+    """
+    return sum(mix(key) for key in group_keys) & _MASK
+
+
+def assignment_key(assignment: Sequence[int], num_groups: int) -> int:
+    """
+    מפתח קנוני של וקטור שיוך שלא תלוי במספור הקבוצות: כל קבוצה מיוצגת כקבוצת החברים שלה.
+    """
+    keys = student_keys(len(assignment))
+    group_keys = [0] * num_groups
+    for index, group_index in enumerate(assignment):
+        group_keys[group_index] += keys[index]
+    return combine_group_keys(group_keys)
+
+
+class FitnessCache:
+    """
+    מטמון של ציוני כושר לפי המפתח הקנוני של הפתרון, עם פינוי LRU ומוני פגיעות והחטאות.
+    מטמון אחד שייך לריצה אחת (מחזור אחד, מספר קבוצות אחד ופונקציית כושר אחת).
+    """
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE):
+        """
+        :param max_size: מספר הפתרונות המקסימלי במטמון. כשהוא מתמלא, הפתרון שלא נעשה בו שימוש הכי הרבה זמן נמחק.
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[int, float]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        החלק מהבקשות שנענו מהמטמון.
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, key: int) -> Optional[float]:
+        """
+        מחזיר את הציון השמור (או None) ומעדכן את המונים.
+        """
+        fitness = self._entries.get(key)
+        if fitness is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return fitness
+
+    def put(self, key: int, fitness: float) -> None:
+        """
+        שומר ציון, ומפנה את הפתרון הישן ביותר אם המטמון מלא.
+        """
+        self._entries[key] = fitness
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def get_state(self) -> Tuple[array, array, int, int]:
+        """
+        התוכן של המטמון לנקודת שמירה: המפתחות והציונים לפי סדר ה-LRU, ומוני הפגיעות וההחטאות.
+        """
+        return array("Q", self._entries.keys()), array("d", self._entries.values()), self.hits, self.misses
+
+    def set_state(self, state: Tuple[array, array, int, int]) -> None:
+        """
+        משחזר את המטמון מ-get_state.
+        """
+        keys, values, self.hits, self.misses = state
+        self._entries = OrderedDict(zip(keys, values))
+
+    def evaluate(self, key: int, compute: Callable[[], float]) -> float:
+        """
+        מחזיר את הציון מהמטמון, או מחשב אותו עם compute ושומר.
+        """
+        fitness = self.get(key)
+        if fitness is None:
+            fitness = compute()
+            self.put(key, fitness)
+        return fitness
+
+    def evaluate_population(self, population: Sequence[Sequence[int]], num_groups: int, compute: Callable[[list], List[float]]) -> List[float]:
+        """
+        מחזיר את הציונים של כל האוכלוסייה, כשרק הפתרונות שלא במטמון (ובלי כפילויות) מחושבים, בקריאה אחת ל-compute.
+        """
+        keys = [assignment_key(assignment, num_groups) for assignment in population]
+        scores = [self.get(key) for key in keys]
+
+        missing = {}
+        for index, (key, fitness) in enumerate(zip(keys, scores)):
+            if fitness is None:
+                missing.setdefault(key, index)
+        computed = dict(zip(missing, compute([population[index] for index in missing.values()]))) if missing else {}
+        for key, fitness in computed.items():
+            self.put(key, fitness)
+
+        return [fitness if fitness is not None else computed[key] for key, fitness in zip(keys, scores)]
@@ -0,0 +1,11 @@
+from typing import List
+from utils.student import Student
+
+# קבוצות המזהים של החברים בכל קבוצה, לבדיקת העדפות בחיתוך קבוצות ב-calculate_diversity
+# במקום סריקה של רשימות המזהים בכל קבוצה.
+
+def group_member_ids(groups: List[List[Student]]) -> List[set]:
+    """
+    בונה פעם אחת את קבוצת המזהים של כל קבוצה, לבדיקת העדפות בחיתוך קבוצות.
+    """
+    return [{student.id for student in group} for group in groups]
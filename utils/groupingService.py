@@ -0,0 +1,393 @@
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import RawArray
+from typing import Dict, Optional, Tuple
+from utils.batchSolve import GENETIC_DEFAULTS, SOLVERS
+from utils.cohort import Cohort, assignment_diversity
+from utils.stopping import StoppingCriteria
+from utils.student import Student
+
+# מצבי בקשה
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_CANCELLING = "cancelling"        # בוטלה בזמן ריצה, ממתינה שהתהליך יחזיר את החלוקה הטובה ביותר
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+STATUS_EXPIRED = "expired"              # הזמן של הבקשה נגמר לפני שהתחילה לרוץ
+FINISHED_STATUSES = (STATUS_DONE, STATUS_FAILED, STATUS_CANCELLED, STATUS_EXPIRED)
+
+# כמה בקשות שהסתיימו נשמרות לשאילתות, והגודל המקסימלי של גוף בקשת HTTP
+MAX_FINISHED_JOBS = 1000
+MAX_BODY_SIZE = 64 * 1024 * 1024
+HTTP_REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large"}
+
+# דגלי הביטול של התהליכים: תא לכל מקום ריצה במאגר (מוגדר בכל תהליך עבודה ב-_init_worker)
+_cancel_flags = None
+
+
+def _init_worker(cancel_flags) -> None:
+    """
+    מאתחל תהליך עבודה עם דגלי הביטול המשותפים.
+    """
+    global _cancel_flags
+    _cancel_flags = cancel_flags
+
+
+def _ready() -> bool:
+    """
+    משימה ריקה להפעלת תהליכי העבודה.
+    """
+    return True
+
+
+def _solve_request(request: dict, slot: int, time_budget: Optional[float], dispatched_at: float) -> dict:
+    """
+    פותר בקשה אחת בתהליך עבודה. האלגוריתם בודק את דגל הביטול של המקום ואת תקציב הזמן אחרי כל דור,
+    ולכן ביטול או דדליין עוצרים אותו ומחזירים את החלוקה הטובה ביותר עד אותו רגע.
+    הדדליין נמדד מרגע השליחה: הזמן של העברת הבקשה לתהליך ושל בניית המחזור מנוכה מהתקציב שהאלגוריתם מקבל.
+
+    :param slot: מקום הריצה במאגר, האינדקס של דגל הביטול של הבקשה.
+    :param time_budget: הזמן שנשאר עד הדדליין של הבקשה ברגע השליחה, בשניות (None = בלי דדליין).
+    :param dispatched_at: רגע השליחה (time.time), כדי לנכות את הזמן עד שהבקשה הגיעה לתהליך.
+    :return: הקבוצות (רשימות של מזהי תלמידים), הציון, סיבת העצירה וזמן הריצה.
+    """
+    start_time = time.perf_counter()
+    if time_budget is not None:
+        time_budget -= max(0.0, time.time() - dispatched_at)
+    solver = request["algorithm"]
+    solve, with_preferences = SOLVERS[solver]
+    options = dict(request["parameters"])
+    if solver.startswith("genetic"):
+        options = {**GENETIC_DEFAULTS, **options}
+
+    cohort = Cohort([Student(record) for record in request["students"]])
+
+    # תנאי העצירה של הבקשה, בתוספת הזמן שנשאר עד הדדליין והביטול.
+    # האלגוריתם מפעיל את השעון בכניסה, כך שגם האוכלוסייה / המושבה ההתחלתית נספרת בתקציב
+    stopping_options = dict(options.pop("stopping", None) or {})
+    if time_budget is not None:
+        remaining = max(0.0, time_budget - (time.perf_counter() - start_time))
+        requested_budget = stopping_options.get("time_budget")
+        stopping_options["time_budget"] = remaining if requested_budget is None else min(requested_budget, remaining)
+    stopping = StoppingCriteria(**stopping_options, cancelled=lambda: _cancel_flags is not None and _cancel_flags[slot] != 0)
+    groups = solve(cohort, request["num_groups"], stopping=stopping, **options)
+    return {
+        "groups": [[student.id for student in group] for group in groups],
+        "fitness": assignment_diversity(cohort, cohort.from_groups(groups), request["num_groups"], with_preferences),
+        "stop_reason": stopping.reason,
+        "elapsed": time.perf_counter() - start_time,
+    }
+
+
+def validate_request(request) -> dict:
+    """
+    בודק את המבנה של בקשת חלוקה ומשלים ברירות מחדל. התלמידים עצמם נבדקים בתהליך העבודה.
+    בקשה היא אובייקט JSON:
+        {"students": [...], "num_groups": 3, "algorithm": "genetic_preferences",
+         "parameters": {"population_size": 20, "generations": null, "stopping": {"patience": 50}}, "deadline": 5.0}
+
+    :raises ValueError: אם הבקשה לא תקינה.
+    """
+    if not isinstance(request, dict):
+        raise ValueError("Request must be an object")
+    students = request.get("students")
+    if not isinstance(students, list) or not students or not all(isinstance(record, dict) for record in students):
+        raise ValueError("students must be a non-empty list of objects")
+    num_groups = request.get("num_groups")
+    if not isinstance(num_groups, int) or isinstance(num_groups, bool) or not 0 < num_groups <= len(students):
+        raise ValueError("num_groups must be an integer between 1 and the number of students")
+    algorithm = request.get("algorithm", "genetic_preferences")
+    if algorithm not in SOLVERS:
+        raise ValueError(f"Unknown algorithm: {algorithm}")
+    parameters = request.get("parameters") or {}
+    if not isinstance(parameters, dict) or not isinstance(parameters.get("stopping") or {}, dict):
+        raise ValueError("parameters and parameters.stopping must be objects")
+    # callback לא עובר בין תהליכים, והשירות הוא שמנהל את העצירה
+    for name in ("progress", "fitness_cache"):
+        if name in parameters:
+            raise ValueError(f"Parameter {name} is not supported by the service")
+    deadline = request.get("deadline")
+    if deadline is not None and (not isinstance(deadline, (int, float)) or isinstance(deadline, bool) or deadline <= 0):
+        raise ValueError("deadline must be a positive number of seconds")
+    return {"students": students, "num_groups": num_groups, "algorithm": algorithm, "parameters": parameters, "deadline": deadline}
+
+
+class GroupingJob:
+    """
+    בקשת חלוקה בשירות: המצב שלה, והתוצאה או השגיאה כשהיא מסתיימת.
+    """
+    def __init__(self, request: dict, expires_at: Optional[float]):
+        self.id = uuid.uuid4().hex
+        self.request = request
+        self.expires_at = expires_at            # זמן הדדליין בשעון של לולאת האירועים
+        self.status = STATUS_QUEUED
+        self.slot: Optional[int] = None
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.finished = asyncio.Event()
+
+    def describe(self) -> dict:
+        """
+        המצב של הבקשה כאובייקט JSON.
+        """
+        description = {"id": self.id, "status": self.status}
+        if self.result is not None:
+            description["result"] = self.result
+        if self.error is not None:
+            description["error"] = self.error
+        return description
+
+
+class GroupingService:
+    """
+    שירות חלוקה מקומי מבוסס asyncio: מקבל בקשות חלוקה, שומר אותן בתור ומריץ אותן במאגר תהליכים,
+    כך שלולאת האירועים לעולם לא נחסמת על חישוב הכושר, והתהליכים (עם המודולים שכבר נטענו) משמשים את כל הבקשות.
+    לכל מקום ריצה במאגר יש משימת שליחה אחת שלוקחת בקשה מהתור, ודגל ביטול משותף שהאלגוריתם בודק אחרי כל דור.
+    ביטול בקשה שרצה, או הגעה לדדליין שלה, מחזירים את החלוקה הטובה ביותר שנמצאה עד אז.
+    """
+    def __init__(self, workers: int = 1, default_deadline: Optional[float] = None):
+        """
+        :param workers: מספר התהליכים, וגם מספר הבקשות שרצות במקביל.
+        :param default_deadline: דדליין בשניות לבקשות בלי deadline משלהן (None = בלי הגבלה).
+        """
+        self.workers = max(1, workers)
+        self.default_deadline = default_deadline
+        self.jobs: Dict[str, GroupingJob] = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._cancel_flags = None
+        self._dispatchers = []
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: Optional[str] = "127.0.0.1", port: Optional[int] = None) -> None:
+        """
+        מפעיל את מאגר התהליכים ואת משימות השליחה, ואם ניתן פורט - גם שרת HTTP מקומי.
+        :param port: פורט להאזנה (0 = פורט פנוי כלשהו, ראו address). None = בלי שרת, רק submit / wait מתוך התהליך.
+        """
+        self._cancel_flags = RawArray("b", self.workers)
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self._cancel_flags,))
+        # התהליכים נוצרים עכשיו, לפני פתיחת השרת: תהליך שנוצר ב-fork אחרי קבלת חיבור יורש את ה-socket שלו,
+        # והחיבור לא נסגר אצל הלקוח עד שהתהליך מסתיים
+        await asyncio.get_running_loop().run_in_executor(self._pool, _ready)
+        self._queue = asyncio.Queue()
+        self._dispatchers = [asyncio.create_task(self._dispatch(slot)) for slot in range(self.workers)]
+        if port is not None:
+            self._server = await asyncio.start_server(self._handle_connection, host, port)
+
+    @property
+    def address(self) -> Optional[Tuple[str, int]]:
+        """
+        הכתובת שהשרת מאזין לה.
+        """
+        if self._server is None:
+            return None
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self) -> None:
+        """
+        עוצר את השרת, מבטל את כל הבקשות שעוד לא הסתיימו ומחכה לסיום התהליכים.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for job in list(self.jobs.values()):
+            self.cancel(job.id)
+        for dispatcher in self._dispatchers:
+            dispatcher.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        if self._pool is not None:
+            await asyncio.to_thread(self._pool.shutdown, True, cancel_futures=True)
+
+    async def __aenter__(self) -> "GroupingService":
+        await self.start(port=None)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def submit(self, request: dict) -> GroupingJob:
+        """
+        מוסיף בקשת חלוקה לתור.
+        :raises ValueError: אם הבקשה לא תקינה (ראו validate_request).
+        """
+        request = validate_request(request)
+        deadline = request.pop("deadline")
+        if deadline is None:
+            deadline = self.default_deadline
+        job = GroupingJob(request, None if deadline is None else asyncio.get_running_loop().time() + deadline)
+        self.jobs[job.id] = job
+        self._queue.put_nowait(job)
+        return job
+
+    def cancel(self, job_id: str) -> Optional[GroupingJob]:
+        """
+        מבטל בקשה: בקשה שבתור לא תרוץ, ובקשה שרצה נעצרת בסוף הדור הנוכחי עם החלוקה הטובה ביותר עד אז.
+        :return: הבקשה, או None אם אין בקשה כזו.
+        """
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        if job.status == STATUS_QUEUED:
+            self._finish(job, STATUS_CANCELLED)
+        elif job.status == STATUS_RUNNING:
+            job.status = STATUS_CANCELLING
+            self._cancel_flags[job.slot] = 1
+        return job
+
+    async def wait(self, job_id: str) -> Optional[GroupingJob]:
+        """
+        מחכה לסיום הבקשה.
+        :return: הבקשה, או None אם אין בקשה כזו.
+        """
+        job = self.jobs.get(job_id)
+        if job is not None:
+            await job.finished.wait()
+        return job
+
+    async def solve(self, request: dict) -> dict:
+        """
+        שולח בקשה ומחכה לתוצאה שלה.
+        """
+        job = self.submit(request)
+        await job.finished.wait()
+        return job.describe()
+
+    def _finish(self, job: GroupingJob, status: str, result: Optional[dict] = None, error: Optional[str] = None) -> None:
+        """
+        מסמן בקשה כגמורה ומוחק את הבקשות הגמורות הישנות ביותר מעבר ל-MAX_FINISHED_JOBS.
+        רק בקשות שהסתיימו בפועל (finished) נמחקות, ולא בקשה שבוטלה ועדיין רצה.
+        """
+        job.status = status
+        job.result = result
+        job.error = error
+        job.request = None
+        job.finished.set()
+
+        finished = [job_id for job_id, other in self.jobs.items() if other.finished.is_set()]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+    async def _dispatch(self, slot: int) -> None:
+        """
+        לוקח בקשות מהתור ומריץ אותן אחת-אחת במקום slot של המאגר.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            if job.status != STATUS_QUEUED:
+                continue
+            time_budget = None if job.expires_at is None else job.expires_at - loop.time()
+            if time_budget is not None and time_budget <= 0:
+                self._finish(job, STATUS_EXPIRED)
+                continue
+
+            job.status = STATUS_RUNNING
+            job.slot = slot
+            self._cancel_flags[slot] = 0
+            try:
+                result = await loop.run_in_executor(self._pool, _solve_request, job.request, slot, time_budget, time.time())
+            except asyncio.CancelledError:
+                self._finish(job, STATUS_CANCELLED)
+                raise
+            except Exception as error:
+                self._finish(job, STATUS_FAILED, error=f"{type(error).__name__}: {error}")
+            else:
+                # בקשה שבוטלה באמצע מחזירה את החלוקה הטובה ביותר עד הביטול
+                self._finish(job, STATUS_CANCELLED if job.status == STATUS_CANCELLING else STATUS_DONE, result)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        מטפל בבקשת HTTP אחת (החיבור נסגר אחרי התשובה).
+        """
+        try:
+            status, payload = await self._handle_http(reader)
+            body = json.dumps(payload).encode()
+            writer.write(f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\nContent-Type: application/json\r\n"
+                         f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_http(self, reader: asyncio.StreamReader) -> Tuple[int, dict]:
+        """
+        מנתב בקשת HTTP:
+            POST /solve        - שולח בקשה ומחכה לתוצאה
+            POST /jobs         - שולח בקשה ומחזיר את המזהה שלה מיד
+            GET /jobs/<id>     - המצב (והתוצאה) של בקשה
+            DELETE /jobs/<id>  - ביטול בקשה
+        """
+        request_line = (await reader.readline()).decode("latin-1").split()
+        content_length = 0
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-length":
+                content_length = int(value) if value.strip().isdigit() else -1
+        if len(request_line) < 2 or content_length < 0:
+            return 400, {"error": "Malformed HTTP request"}
+        if content_length > MAX_BODY_SIZE:
+            return 413, {"error": f"Request body is larger than {MAX_BODY_SIZE} bytes"}
+        body = await reader.readexactly(content_length)
+        method, path = request_line[0], request_line[1].rstrip("/")
+
+        if path in ("/solve", "/jobs"):
+            if method != "POST":
+                return 405, {"error": "Use POST"}
+            try:
+                job = self.submit(json.loads(body))
+            except ValueError as error:
+                return 400, {"error": str(error)}
+            if path == "/jobs":
+                return 202, job.describe()
+            await job.finished.wait()
+            return 200, job.describe()
+
+        if path.startswith("/jobs/"):
+            job_id = path[len("/jobs/"):]
+            if method == "GET":
+                job = self.jobs.get(job_id)
+            elif method == "DELETE":
+                job = self.cancel(job_id)
+            else:
+                return 405, {"error": "Use GET or DELETE"}
+            if job is None:
+                return 404, {"error": f"Unknown job: {job_id}"}
+            return 200, job.describe()
+
+        return 404, {"error": f"Unknown path: {path}"}
+
+
+async def serve(host: str, port: int, workers: int, default_deadline: Optional[float]) -> None:
+    """
+    מריץ את השירות עד לעצירה (Ctrl+C).
+    """
+    service = GroupingService(workers, default_deadline)
+    await service.start(host, port)
+    print(f"Grouping service listening on http://{service.address[0]}:{service.address[1]}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local grouping service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--deadline", type=float, default=None, help="default deadline in seconds")
+    arguments = parser.parse_args()
+    try:
+        asyncio.run(serve(arguments.host, arguments.port, arguments.workers, arguments.deadline))
+    except KeyboardInterrupt:
+        pass
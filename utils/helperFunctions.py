@@ -1,10 +1,11 @@
 import random
-import csv
 import json
-import time
-from Genetic.PreferencesGenetic import calculate_diversity, genetic_algorithm_with_preferences
+from utils.parallelExperiments import run_parallel_experiment
 from utils.student import Student
-from typing import List
+from utils.cohort import Cohort
+from utils.cohortLoader import load_cohort
+from utils.cohortCache import load_cached_cohort
+from typing import List, Optional
 from tabulate import tabulate
 
 def generate_random_student_list(amount: int, criteria: List[dict]) -> List[Student]:
@@ -73,13 +74,15 @@ def print_students_table(students: List[Student]):
     headers = ["ID", "Preferences", "Score"]
     print(tabulate(table_data, headers, tablefmt="grid"))
 
-def generate_students_json(file_name: str = None, num_students: int = 10, num_criteria: int = random.randint(1, 5)) -> None:
+def generate_students_json(file_name: str = None, num_students: int = 10, num_criteria: int = random.randint(1, 5), json_lines: bool = False) -> None:
     """
-    מגריל קובץ גייסון עם פרטי תלמידים
+    מגריל קובץ גייסון עם פרטי תלמידים.
+    כל תלמיד נכתב בשורה אחת ובלי הזחה, כך שגם קבצים גדולים נשארים קטנים ואפשר לקרוא אותם בזרם (load_cohort).
+
+    :param json_lines: כתיבה בפורמט JSON Lines (סיומת jsonl) במקום מערך JSON.
     """
     if not file_name:
         file_name = f"students({num_students})_criteria({num_criteria})"
-    students = []
 
     criteria_template = [
         {
@@ -89,25 +92,28 @@ def generate_students_json(file_name: str = None, num_students: int = 10, num_cr
         for i in range(num_criteria)
     ]
 
-    for student_id in range(1, num_students + 1):
-        # מגריל העדפות רנדומליות
-        preferences = generate_random_preferences(1, num_students, student_id)
-
-        # מגדיל קריטריונים רנדומלים
-        criteria = generate_criteria_list(criteria_template)
-
-        # יוצר את הגייסון של התלמיד
-        student_data = {
-            "id": student_id,
-            "name": f"Student_{student_id}",
-            "preferences": preferences,
-            "criteria": criteria
-        }
-        students.append(student_data)
-
-    # שמירה לקובץ גייסון
-    with open(f"samples/{file_name}.json", "w") as file:
-        json.dump(students, file, indent=4)
+    extension = "jsonl" if json_lines else "json"
+    with open(f"samples/{file_name}.{extension}", "w") as file:
+        if not json_lines:
+            file.write("[\n")
+        for student_id in range(1, num_students + 1):
+            # מגריל העדפות רנדומליות
+            preferences = generate_random_preferences(1, num_students, student_id)
+
+            # מגדיל קריטריונים רנדומלים
+            criteria = generate_criteria_list(criteria_template)
+
+            # יוצר את הגייסון של התלמיד ושומר אותו מיד לקובץ
+            student_data = {
+                "id": student_id,
+                "name": f"Student_{student_id}",
+                "preferences": preferences,
+                "criteria": criteria
+            }
+            separator = "" if json_lines or student_id == num_students else ","
+            file.write(json.dumps(student_data, separators=(",", ":")) + separator + "\n")
+        if not json_lines:
+            file.write("]\n")
 
     print(f"Generated {num_students} students and saved to {file_name}")
 
@@ -130,136 +136,50 @@ def translate_file_to_students(file_name: str) -> List[Student]:
     except Exception as e:
         print(f"קרתה שגיאה לא יודעה: {e}")
         return []
-    
-def run_generations_experiment(students: List[Student], num_groups: int, population_size: int, mutation_rate: float, output_file: str):
-    generations_to_test = range(10, 501, 10)
-    results = []
-
-    for generations in generations_to_test:
-        print(f"Running {generations} generations...")
-        fitness_scores = []
-        for run in range(1, 11):
-            best_solution = genetic_algorithm_with_preferences(students, num_groups, population_size, generations, mutation_rate)
-            best_fitness = calculate_diversity(best_solution)
-            fitness_scores.append(best_fitness)
-
-        results.append([generations] + fitness_scores)
-
-    with open(f"experiments/{output_file}.csv", mode='w', newline='') as file:
-        fieldnames = ["Generations"] + [f"Run_{i}" for i in range(1, 11)]
-        writer = csv.writer(file)
-        writer.writerow(fieldnames)
-        writer.writerows(results)
-
-    print(f"Experiment completed! Results saved to {output_file}")
-
-def run_timing_experiment(students: List[Student], num_groups: int, population_size: int, mutation_rate: float, output_file: str):
-    generations_to_test = range(10, 501, 10)
-    results = []
-
-    for generations in generations_to_test:
-        print(f"Running {generations} generations...")
-        timing_scores = []
-        for run in range(1, 11):
-            start_time = time.time()
-            genetic_algorithm_with_preferences(students, num_groups, population_size, generations, mutation_rate)
-            elapsed_time = time.time() - start_time
-            timing_scores.append(elapsed_time)
-
-        results.append([generations] + timing_scores)
-
-    with open(f"experiments/{output_file}.csv", mode='w', newline='') as file:
-        fieldnames = ["Generations"] + [f"Run_{i}" for i in range(1, 11)]
-        writer = csv.writer(file)
-        writer.writerow(fieldnames)
-        writer.writerows(results)
-
-    print(f"Timing experiment completed! Results saved to {output_file}")
-
-def run_population_experiment(students: List[Student], num_groups: int, generations_size: int, mutation_rate: float, output_file: str):
-    population_to_test = [5] + list(range(10, 501, 10))
-    results = []
 
-    for population in population_to_test:
-        print(f"Running {population} population...")
-        fitness_scores = []
-        for run in range(1, 11):
-            best_solution = genetic_algorithm_with_preferences(students, num_groups, population, generations_size, mutation_rate)
-            best_fitness = calculate_diversity(best_solution)
-            fitness_scores.append(best_fitness)
-
-        results.append([population] + fitness_scores)
-
-    with open(f"experiments/{output_file}.csv", mode='w', newline='') as file:
-        fieldnames = ["Populations"] + [f"Run_{i}" for i in range(1, 11)]
-        writer = csv.writer(file)
-        writer.writerow(fieldnames)
-        writer.writerows(results)
-
-    print(f"Experiment completed! Results saved to {output_file}")
-
-def run_population_timing_experiment(students: List[Student], num_groups: int, generations_size: int, mutation_rate: float, output_file: str):
-    population_to_test = [5] + list(range(10, 501, 10))
-    results = []
-
-    for population in population_to_test:
-        print(f"Running {population} population...")
-        timing_scores = []
-        for run in range(1, 11):
-            start_time = time.time()
-            genetic_algorithm_with_preferences(students, num_groups, population, generations_size, mutation_rate)
-            elapsed_time = time.time() - start_time
-            timing_scores.append(elapsed_time)
-
-        results.append([population] + timing_scores)
-
-    with open(f"experiments/{output_file}.csv", mode='w', newline='') as file:
-        fieldnames = ["Populations"] + [f"Run_{i}" for i in range(1, 11)]
-        writer = csv.writer(file)
-        writer.writerow(fieldnames)
-        writer.writerows(results)
-
-    print(f"Experiment completed! Results saved to {output_file}")
-
-def run_mutation_experiment(students: List[Student], num_groups: int, generations_size: int, population_size: int, output_file: str):
-    mutation_rate_to_test = list(range(5, 101, 5))
-    results = []
+def translate_file_to_cohort(file_name: str, use_cache: bool = True) -> Optional[Cohort]:
+    """
+    קורא קובץ גייסון (מערך או JSON Lines) בזרם ומחזיר מחזור קומפקטי, בלי ליצור אובייקט לכל תלמיד.
+    את המחזור אפשר להעביר ישירות לכל האלגוריתמים במקום רשימת התלמידים.
 
-    for mutation_rate in mutation_rate_to_test:
-        print(f"Running {mutation_rate}% population...")
-        fitness_scores = []
-        for run in range(1, 11):
-            best_solution = genetic_algorithm_with_preferences(students, num_groups, population_size, generations_size, mutation_rate/100)
-            best_fitness = calculate_diversity(best_solution)
-            fitness_scores.append(best_fitness)
-        results.append([f"{mutation_rate}%"] + fitness_scores)
+    :param use_cache: בפעם הראשונה נכתב ליד הקובץ מטמון בינארי (סיומת cohort), ובפעמים הבאות הוא נפתח עם mmap
+        בלי לפענח את הגייסון מחדש. המטמון נבנה מחדש אוטומטית כשתוכן הקובץ משתנה.
+    :return: המחזור, או None אם הקובץ לא נמצא או לא תקין (השגיאה מודפסת).
+    """
+    try:
+        if use_cache:
+            return load_cached_cohort(file_name)
+        return load_cohort(file_name)
+    except FileNotFoundError:
+        print(f"שגיאה: לא נמצא קובץ עם השם: '{file_name}'")
+        return None
+    except (json.JSONDecodeError, ValueError) as e:
+        print(f"שגיאה: נכשל בתרגום הקובץ: '{file_name}'. {e}")
+        return None
+    except Exception as e:
+        print(f"קרתה שגיאה לא יודעה: {e}")
+        return None
 
-    with open(f"experiments/{output_file}.csv", mode='w', newline='') as file:
-        fieldnames = ["Mutation Rate"] + [f"Run_{i}" for i in range(1, 11)]
-        writer = csv.writer(file)
-        writer.writerow(fieldnames)
-        writer.writerows(results)
+def run_generations_experiment(students: List[Student], num_groups: int, population_size: int, mutation_rate: float, output_file: str, workers: int = None, seed: int = 0):
+    points = [(generations, population_size, generations, mutation_rate) for generations in range(10, 501, 10)]
+    run_parallel_experiment(students, num_groups, points, "fitness", "Generations", output_file, workers=workers, seed=seed)
 
-    print(f"Experiment completed! Results saved to {output_file}")
+def run_timing_experiment(students: List[Student], num_groups: int, population_size: int, mutation_rate: float, output_file: str, workers: int = 1, seed: int = 0):
+    points = [(generations, population_size, generations, mutation_rate) for generations in range(10, 501, 10)]
+    run_parallel_experiment(students, num_groups, points, "time", "Generations", output_file, workers=workers, seed=seed)
 
-def run_mutation_timing_experiment(students: List[Student], num_groups: int, generations_size: int, population_size: int, output_file: str):
-    mutation_rate_to_test = list(range(5, 101, 5))
-    results = []
+def run_population_experiment(students: List[Student], num_groups: int, generations_size: int, mutation_rate: float, output_file: str, workers: int = None, seed: int = 0):
+    points = [(population, population, generations_size, mutation_rate) for population in [5] + list(range(10, 501, 10))]
+    run_parallel_experiment(students, num_groups, points, "fitness", "Populations", output_file, workers=workers, seed=seed)
 
-    for mutation_rate in mutation_rate_to_test:
-        print(f"Running {mutation_rate}% population...")
-        timing_scores = []
-        for run in range(1, 11):
-            start_time = time.time()
-            genetic_algorithm_with_preferences(students, num_groups, population_size, generations_size, mutation_rate/100)
-            elapsed_time = time.time() - start_time
-            timing_scores.append(elapsed_time)
-        results.append([f"{mutation_rate}%"] + timing_scores)
+def run_population_timing_experiment(students: List[Student], num_groups: int, generations_size: int, mutation_rate: float, output_file: str, workers: int = 1, seed: int = 0):
+    points = [(population, population, generations_size, mutation_rate) for population in [5] + list(range(10, 501, 10))]
+    run_parallel_experiment(students, num_groups, points, "time", "Populations", output_file, workers=workers, seed=seed)
 
-    with open(f"experiments/{output_file}.csv", mode='w', newline='') as file:
-        fieldnames = ["Mutation Rate"] + [f"Run_{i}" for i in range(1, 11)]
-        writer = csv.writer(file)
-        writer.writerow(fieldnames)
-        writer.writerows(results)
+def run_mutation_experiment(students: List[Student], num_groups: int, generations_size: int, population_size: int, output_file: str, workers: int = None, seed: int = 0):
+    points = [(f"{mutation_rate}%", population_size, generations_size, mutation_rate/100) for mutation_rate in range(5, 101, 5)]
+    run_parallel_experiment(students, num_groups, points, "fitness", "Mutation Rate", output_file, workers=workers, seed=seed)
 
-    print(f"Experiment completed! Results saved to {output_file}")
\ No newline at end of file
+def run_mutation_timing_experiment(students: List[Student], num_groups: int, generations_size: int, population_size: int, output_file: str, workers: int = 1, seed: int = 0):
+    points = [(f"{mutation_rate}%", population_size, generations_size, mutation_rate/100) for mutation_rate in range(5, 101, 5)]
+    run_parallel_experiment(students, num_groups, points, "time", "Mutation Rate", output_file, workers=workers, seed=seed)
@@ -0,0 +1,298 @@
+import math
+import numpy as np
+from array import array
+from typing import Callable, Dict, List, Optional, Tuple
+from utils.student import Student
+from utils.cohort import Cohort, as_cohort
+from utils.swapEvaluator import SwapEvaluator
+from utils.stopping import StoppingCriteria
+
+LOCAL_SEARCH_STRATEGIES = ("best", "first")
+# שיפור קטן מזה נחשב שגיאת עיגול ולא שיפור
+IMPROVEMENT_TOLERANCE = 1e-9
+# בחיפוש טאבו: כמה צעדים ברצף בלי שיפור של הפתרון הטוב ביותר עד לעצירה (כשלא הועברו תנאי עצירה)
+DEFAULT_TABU_PATIENCE = 20
+# מספר ההחלפות המקסימלי שמוערכות בבת אחת (גודל בלוק בסריקת השכונה)
+BLOCK_CELLS = 1 << 16
+
+Mutation = Callable[[array, float, int, object], array]
+# בלוק בשכונה: זוג קבוצות וטווח שורות מהקבוצה הראשונה
+Block = Tuple[int, int, int, int]
+
+
+def related_students(cohort: Cohort) -> Tuple[Tuple[int, ...], ...]:
+    """
+    לכל תלמיד, התלמידים שההשפעה של החלפה איתם על ניקוד ההעדפות לא מתפרקת לסכום של שתי העברות בודדות:
+    מי שהוא מעדיף, מי שמעדיף אותו, ומי שמועדף יחד איתו על ידי תלמיד שלישי.
+    """
+    related = [set(preferences) for preferences in cohort.preferences]
+    for index, preferred_by in enumerate(cohort.preferred_by):
+        related[index].update(preferred_by)
+    for preferences in cohort.preferences:
+        for preference in preferences:
+            related[preference].update(preferences)
+    for index, students in enumerate(related):
+        students.discard(index)
+    return tuple(tuple(sorted(students)) for students in related)
+
+
+def _group_diversities(total: np.ndarray, squares: np.ndarray, count: int) -> np.ndarray:
+    """
+    סטיית תקן מדגמית של קבוצה מתוך הסכום וסכום הריבועים, לכל תא במטריצה.
+    """
+    if count < 2:
+        return np.zeros_like(total)
+    variance = (squares - total * total / count) / (count - 1)
+    return np.sqrt(np.maximum(variance, 0.0))
+
+
+class SwapNeighbourhood:
+    """
+    הערכה וקטורית של כל ההחלפות של פתרון (SwapEvaluator), בבלוקים של זוג קבוצות × טווח תלמידים.
+    הגיוון החדש של שתי הקבוצות מחושב מהסכומים הרצים לכל תא במטריצה. ניקוד ההעדפות הוא סכום של רווח ההעברה
+    של כל תלמיד לקבוצה של השני (מטריצת N × G שמחושבת פעם אחת לכל צעד), חוץ מזוגות קשורים (ראו related_students)
+    שמוערכים אחד-אחד ב-swap_fitness_from_moments.
+    """
+    def __init__(self, solution: SwapEvaluator, related: Optional[Tuple[Tuple[int, ...], ...]] = None):
+        """
+        :param related: הזוגות הקשורים של המחזור, אם כבר חושבו.
+        """
+        self.solution = solution
+        cohort = solution.cohort
+        self._scores = np.asarray(cohort.centered_scores, dtype=np.float64)
+        self.related = None
+        if solution.with_preferences:
+            self.related = related if related is not None else related_students(cohort)
+            offsets, targets = cohort.preference_csr()
+            sources = np.repeat(np.arange(cohort.size), np.diff(np.asarray(offsets, dtype=np.intp)))
+            targets = np.asarray(targets, dtype=np.intp)
+            own = sources == targets
+            self._self_counts = np.bincount(sources[own], minlength=cohort.size)
+            # קשתות ההעדפה בין תלמידים שונים, עם מספר החזרות של כל קשת
+            codes, self._multiplicity = np.unique(sources[~own] * cohort.size + targets[~own], return_counts=True)
+            self._sources = codes // cohort.size
+            self._targets = codes % cohort.size
+
+        # הבלוקים לא משתנים בין צעדים, כי החלפה לא משנה את גדלי הקבוצות
+        self.blocks: List[Block] = []
+        members = solution.members
+        for group1 in range(solution.num_groups):
+            for group2 in range(group1 + 1, solution.num_groups):
+                size1 = len(members[group1])
+                size2 = len(members[group2])
+                if not size1 or not size2:
+                    continue
+                rows = max(1, BLOCK_CELLS // size2)
+                for start in range(0, size1, rows):
+                    self.blocks.append((group1, group2, start, min(size1, start + rows)))
+
+    def move_gains(self) -> np.ndarray:
+        """
+        מטריצת N × G: השינוי במספר התלמידים המרוצים אם התלמיד עובר לבד לקבוצה g.
+        """
+        solution = self.solution
+        size = len(solution.assignment)
+        assignment = np.frombuffer(solution.assignment, dtype=np.intc)
+        hits = np.frombuffer(solution.hits, dtype=np.intc)
+        sources = self._sources
+        targets = self._targets
+
+        # התלמיד עצמו: כמה מההעדפות שלו יהיו בקבוצה החדשה
+        counts = np.zeros((size, solution.num_groups), dtype=np.intp)
+        np.add.at(counts, (sources, assignment[targets]), self._multiplicity)
+        counts += self._self_counts[:, None]
+        gains = (counts > 0).astype(np.intp) - (hits > 0)[:, None]
+
+        # מי שמעדיף אותו: מפסיד אם זו הייתה הפגיעה היחידה שלו, ומרוויח בקבוצה החדשה אם לא היו לו פגיעות
+        same_group = assignment[sources] == assignment[targets]
+        losing = same_group & (hits[sources] == self._multiplicity)
+        gains -= np.bincount(targets[losing], minlength=size)[:, None]
+        gaining = ~same_group & (hits[sources] == 0)
+        np.add.at(gains, (targets[gaining], assignment[sources[gaining]]), 1)
+        return gains
+
+    def block_values(self, block: Block, moments: Tuple[float, float], gains: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        הציון אחרי כל החלפה בבלוק.
+        :return: מטריצת הציונים, התלמידים של השורות והתלמידים של העמודות.
+        """
+        solution = self.solution
+        group1, group2, start, stop = block
+        rows = np.asarray(solution.members[group1][start:stop], dtype=np.intp)
+        columns = np.asarray(solution.members[group2], dtype=np.intp)
+        scores1 = self._scores[rows][:, None]
+        scores2 = self._scores[columns][None, :]
+        difference = scores2 - scores1
+        square_difference = scores2 * scores2 - scores1 * scores1
+        diversity1 = _group_diversities(solution.sums[group1] + difference, solution.squares[group1] + square_difference, len(solution.members[group1]))
+        diversity2 = _group_diversities(solution.sums[group2] - difference, solution.squares[group2] - square_difference, len(columns))
+
+        old1 = solution.diversities[group1]
+        old2 = solution.diversities[group2]
+        num_groups = solution.num_groups
+        total = (moments[0] - old1 - old2) + diversity1 + diversity2
+        values = total / num_groups
+        if num_groups > 1:
+            squares = (moments[1] - old1 * old1 - old2 * old2) + diversity1 * diversity1 + diversity2 * diversity2
+            values -= np.sqrt(np.maximum((squares - total * total / num_groups) / (num_groups - 1), 0.0))
+
+        if gains is not None:
+            values += solution.satisfied + gains[rows, group2][:, None] + gains[columns, group1][None, :]
+            assignment = solution.assignment
+            positions = solution.positions
+            for row, a in enumerate(solution.members[group1][start:stop]):
+                for b in self.related[a]:
+                    if assignment[b] == group2:
+                        values[row, positions[b]] = solution.swap_fitness_from_moments(a, b, moments)
+        return values, rows, columns
+
+
+class LocalSearch:
+    """
+    ליטוש פתרון בחיפוש מקומי בשכונת ההחלפות: בכל צעד מוערכות ההחלפות בין שני תלמידים מקבוצות שונות
+    (וקטורית, ראו SwapNeighbourhood), ומבוצעת ההחלפה המשפרת ביותר ("best") או ההחלפה הטובה ביותר בבלוק
+    הראשון שיש בו שיפור ("first", סריקה מעגלית), עד שאין החלפה משפרת.
+
+    עם tabu_tenure > 0 זה חיפוש טאבו: תלמיד שהוחלף לא זז שוב במשך tabu_tenure צעדים, ובכל צעד מבוצעת ההחלפה
+    הטובה ביותר שמותרת גם אם היא מרעה, כדי לצאת ממקסימום מקומי. החלפה אסורה מותרת אם היא משפרת את הטוב ביותר.
+    בסוף מוחזר הפתרון הטוב ביותר שנמצא. החיפוש דטרמיניסטי: מאותו פתרון מתקבלת אותה תוצאה.
+    """
+    def __init__(self, strategy: str = "best", tabu_tenure: int = 0, max_moves: Optional[int] = None, stopping: Optional[StoppingCriteria] = None):
+        """
+        :param strategy: "best" (ההחלפה הטובה ביותר בכל צעד) או "first" (עוצרים בבלוק הראשון שיש בו שיפור).
+        :param tabu_tenure: מספר הצעדים שבהם תלמיד שהוחלף נעול (0 - בלי טאבו).
+        :param max_moves: מספר ההחלפות המקסימלי בכל ליטוש (ברירת מחדל: בלי הגבלה).
+        :param stopping: תנאי עצירה לכל ליטוש, נבדקים אחרי כל צעד (ברירת מחדל בטאבו: סבלנות DEFAULT_TABU_PATIENCE).
+        """
+        if strategy not in LOCAL_SEARCH_STRATEGIES:
+            raise ValueError(f"Unknown local search strategy: {strategy}")
+        if tabu_tenure > 0 and stopping is None and max_moves is None:
+            stopping = StoppingCriteria(patience=DEFAULT_TABU_PATIENCE)
+        self.strategy = strategy
+        self.tabu_tenure = tabu_tenure
+        self.max_moves = max_moves
+        self.stopping = stopping
+        # מונים מצטברים על כל הליטושים
+        self.moves = 0
+        self.evaluations = 0
+        # הזוגות הקשורים של המחזור האחרון, כדי לא לחשב אותם מחדש בכל ליטוש (למשל בצעד הממטי)
+        self._related: Dict[int, Tuple[Cohort, tuple]] = {}
+
+    def _neighbourhood(self, solution: SwapEvaluator) -> SwapNeighbourhood:
+        related = None
+        if solution.with_preferences:
+            cached = self._related.get(id(solution.cohort))
+            if cached is not None and cached[0] is solution.cohort:
+                related = cached[1]
+            else:
+                related = related_students(solution.cohort)
+                self._related = {id(solution.cohort): (solution.cohort, related)}
+        return SwapNeighbourhood(solution, related)
+
+    def improve(self, solution: SwapEvaluator) -> SwapEvaluator:
+        """
+        מלטש את הפתרון במקום ומחזיר אותו.
+        """
+        stopping = self.stopping
+        if stopping is not None:
+            stopping.start()
+        neighbourhood = self._neighbourhood(solution)
+        tabu = self.tabu_tenure > 0
+        locked_until = np.zeros(len(solution.assignment), dtype=np.intp) if tabu else None
+        best_fitness = solution.fitness
+        best_assignment = solution.assignment[:] if tabu else None
+        moves = 0
+        start = 0
+
+        while self.max_moves is None or moves < self.max_moves:
+            move, evaluated, start = self._find_move(neighbourhood, locked_until, moves, best_fitness, start)
+            self.evaluations += evaluated
+            if move is None:
+                break
+
+            a, b = move
+            previous = solution.fitness
+            fitness = solution.apply_swap(a, b)
+            if not tabu and fitness <= previous + IMPROVEMENT_TOLERANCE:
+                # ההערכה הווקטורית הראתה שיפור שהוא רק שגיאת עיגול: מבטלים את ההחלפה ועוצרים
+                solution.apply_swap(a, b)
+                break
+            moves += 1
+            if tabu:
+                locked_until[a] = locked_until[b] = moves + self.tabu_tenure
+            if fitness > best_fitness:
+                best_fitness = fitness
+                if tabu:
+                    best_assignment = solution.assignment[:]
+            if stopping is not None and stopping.update(best_fitness, evaluated):
+                break
+
+        if stopping is not None:
+            stopping.finish()
+        self.moves += moves
+        if tabu and solution.fitness < best_fitness:
+            solution.assignment[:] = best_assignment
+            solution.rebuild()
+        return solution
+
+    def _find_move(self, neighbourhood: SwapNeighbourhood, locked_until: Optional[np.ndarray], moves: int, best_fitness: float,
+                   start: int) -> Tuple[Optional[Tuple[int, int]], int, int]:
+        """
+        מחפש את ההחלפה הבאה.
+        בלי טאבו מוחזרת רק החלפה משפרת, ועם טאבו ההחלפה הטובה ביותר שמותרת.
+        :return: ההחלפה (או None), מספר ההחלפות שהוערכו והבלוק שממנו תתחיל הסריקה הבאה.
+        """
+        solution = neighbourhood.solution
+        blocks = neighbourhood.blocks
+        moments = solution.diversity_moments()
+        gains = neighbourhood.move_gains() if solution.with_preferences else None
+        first = self.strategy == "first" and locked_until is None
+        best_value = -math.inf if locked_until is not None else solution.fitness + IMPROVEMENT_TOLERANCE
+        best_move = None
+        evaluated = 0
+
+        for offset in range(len(blocks)):
+            block_index = (start + offset) % len(blocks) if first else offset
+            values, rows, columns = neighbourhood.block_values(blocks[block_index], moments, gains)
+            evaluated += values.size
+            if locked_until is not None:
+                locked = (locked_until[rows] > moves)[:, None] | (locked_until[columns] > moves)[None, :]
+                values = np.where(locked & (values <= best_fitness + IMPROVEMENT_TOLERANCE), -math.inf, values)
+            row, column = np.unravel_index(np.argmax(values), values.shape)
+            if values[row, column] > best_value:
+                best_value = values[row, column]
+                best_move = (int(rows[row]), int(columns[column]))
+                if first:
+                    return best_move, evaluated, block_index
+        return best_move, evaluated, start
+
+    def polish(self, cohort: Cohort, assignment: array, num_groups: int, with_preferences: bool = False) -> Tuple[array, float]:
+        """
+        מלטש וקטור שיוך.
+        :return: וקטור השיוך החדש והציון שלו.
+        """
+        solution = self.improve(SwapEvaluator(cohort, assignment, num_groups, with_preferences))
+        return solution.assignment, solution.fitness
+
+    def memetic(self, mutation: Mutation, cohort: Cohort, with_preferences: bool = False) -> Mutation:
+        """
+        עוטף פונקציית מוטציה כך שכל ילד מלוטש אחרי המוטציה (אלגוריתם ממטי).
+        """
+        def mutate_and_polish(assignment: array, mutation_rate: float, num_groups: int, rng) -> array:
+            return self.polish(cohort, mutation(assignment, mutation_rate, num_groups, rng), num_groups, with_preferences)[0]
+        return mutate_and_polish
+
+
+def polish_groups(students, groups: List[List[Student]], with_preferences: bool = False, local_search: Optional[LocalSearch] = None) -> List[List[Student]]:
+    """
+    מלטש את החלוקה הסופית של כל אחד מהאלגוריתמים.
+    :param students: רשימת הסטודנטים או המחזור שעליו רצו האלגוריתמים.
+    :param groups: החלוקה לקבוצות שהאלגוריתם החזיר.
+    :param with_preferences: האם לכלול את ניקוד ההעדפות בציון (כמו באלגוריתמים עם העדפות).
+    :param local_search: הגדרות החיפוש (ברירת מחדל: "best" בלי טאבו).
+    """
+    cohort = as_cohort(students)
+    num_groups = len(groups)
+    local_search = local_search or LocalSearch()
+    assignment, _ = local_search.polish(cohort, cohort.from_groups(groups), num_groups, with_preferences)
+    return cohort.to_groups(assignment, num_groups)
@@ -0,0 +1,100 @@
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple, Union
+from Genetic.PreferencesGenetic import calculate_diversity, genetic_algorithm_with_preferences
+from utils.cohort import Cohort, as_cohort
+from utils.sharedCohort import SharedCohort, SharedCohortHandle, attach_cohort
+from utils.student import Student
+
+# נקודת ניסוי: (התווית בעמודה הראשונה, גודל אוכלוסייה, מספר דורות, סיכוי מוטציה)
+ExperimentPoint = Tuple[object, int, int, float]
+
+# המחזור של תהליך העבודה, מתחבר פעם אחת לכל תהליך ולא לכל תא
+_WORKER_COHORT: Optional[Cohort] = None
+_WORKER_NUM_GROUPS: int = 0
+
+
+def _init_worker(cohort: Union[Cohort, SharedCohortHandle, None], num_groups: int) -> None:
+    """
+    מאתחל תהליך עבודה עם המחזור (או מזהה של מחזור בזיכרון משותף) ומספר הקבוצות.
+    """
+    global _WORKER_COHORT, _WORKER_NUM_GROUPS
+    _WORKER_COHORT = attach_cohort(cohort) if cohort is not None else None
+    _WORKER_NUM_GROUPS = num_groups
+
+
+def cell_seed(seed: int, point_index: int, run: int) -> str:
+    """
+    זרע דטרמיניסטי לתא בניסוי, תלוי רק בזרע הבסיס, מספר הנקודה ומספר ההרצה (ולא בסדר הביצוע).
+    """
+    return f"{seed}:{point_index}:{run}"
+
+
+def _run_cell(cell: Tuple[int, int, ExperimentPoint, str, int]) -> float:
+    """
+    מריץ תא אחד בניסוי (נקודה והרצה) ומחזיר את הכושר של הפתרון הטוב ביותר או את זמן הריצה.
+    """
+    point_index, run, point, measure, seed = cell
+    _, population_size, generations, mutation_rate = point
+
+    start_time = time.perf_counter()
+    best_solution = genetic_algorithm_with_preferences(_WORKER_COHORT, _WORKER_NUM_GROUPS, population_size, generations, mutation_rate, seed=cell_seed(seed, point_index, run))
+    elapsed_time = time.perf_counter() - start_time
+
+    if measure == "time":
+        return elapsed_time
+    return calculate_diversity(best_solution)
+
+
+def run_parallel_experiment(students: Union[List[Student], Cohort], num_groups: int, points: Sequence[ExperimentPoint], measure: str, header: str, output_file: str, runs: int = 10, workers: Optional[int] = None, seed: int = 0) -> List[list]:
+    """
+    מריץ את כל התאים (נקודה × הרצה) של ניסוי במאגר תהליכים וכותב את התוצאות לקובץ CSV בתיקיית experiments,
+    באותו מבנה של הניסויים הסדרתיים: עמודת הפרמטר ואחריה Run_1 עד Run_N.
+
+    :param points: רשימת נקודות הניסוי (תווית, גודל אוכלוסייה, מספר דורות, סיכוי מוטציה).
+    :param measure: "fitness" לכושר הפתרון הטוב ביותר או "time" לזמן הריצה בשניות.
+    :param header: שם העמודה הראשונה בקובץ.
+    :param workers: מספר התהליכים (ברירת מחדל: מספר המעבדים, 1 = הרצה סדרתית בתהליך הנוכחי).
+        שימו לב שבמדידת זמנים תהליכים מקבילים מתחרים על המעבד ועל הזיכרון.
+    :param seed: זרע הבסיס, כל תא מקבל זרע משלו שנגזר ממנו ולכן התוצאות זהות בכל מספר תהליכים.
+    :return: שורות התוצאות שנכתבו לקובץ.
+    """
+    if measure not in ("fitness", "time"):
+        raise ValueError(f"Unknown measure: {measure}")
+
+    cells = [
+        (point_index, run, point, measure, seed)
+        for point_index, point in enumerate(points)
+        for run in range(1, runs + 1)
+    ]
+    workers = workers or os.cpu_count() or 1
+    # המחזור נבנה פעם אחת לכל הניסוי ולא בכל תא
+    cohort = as_cohort(students)
+
+    if workers == 1:
+        _init_worker(cohort, num_groups)
+        try:
+            values = [_run_cell(cell) for cell in cells]
+        finally:
+            _init_worker(None, 0)
+    else:
+        # התהליכים מתחברים למחזור בזיכרון משותף במקום לקבל עותק שלו
+        with SharedCohort(cohort) as shared, ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(shared.handle, num_groups)) as executor:
+            # map מחזיר את התוצאות לפי סדר התאים, גם אם הן מסתיימות בסדר אחר
+            values = list(executor.map(_run_cell, cells))
+
+    results = [
+        [point[0]] + values[point_index * runs:(point_index + 1) * runs]
+        for point_index, point in enumerate(points)
+    ]
+
+    with open(f"experiments/{output_file}.csv", mode='w', newline='') as file:
+        fieldnames = [header] + [f"Run_{i}" for i in range(1, runs + 1)]
+        writer = csv.writer(file)
+        writer.writerow(fieldnames)
+        writer.writerows(results)
+
+    print(f"Experiment completed! Results saved to {output_file}")
+    return results
@@ -0,0 +1,138 @@
+import random
+import weakref
+import numpy as np
+from array import array
+from typing import List, Optional, Tuple
+from utils.cohort import ASSIGNMENT_TYPECODE, Cohort
+
+# הגודל המקסימלי של גוש תלמידים שנשארים יחד בחלוקה ההתחלתית: בערך רבע מגודל הקבוצה, בין 3 ל-16.
+# גושים גדולים יותר מרצים יותר תלמידים, וגושים קטנים משאירים יותר מקום לאקראיות בין החלוקות
+MIN_BLOCK_SIZE = 3
+MAX_BLOCK_SIZE = 16
+
+# מחולל חלוקות לכל מחזור ומספר קבוצות, כדי שהגושים ייבנו פעם אחת לכל מחזור
+_SEEDERS = weakref.WeakKeyDictionary()
+
+
+def preference_blocks(cohort: Cohort, max_block_size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    מחלק את התלמידים לגושים קטנים לפי גרף ההעדפות, ב-union-find עם הגבלת גודל:
+    קודם מאחדים זוגות של העדפה הדדית (שני התלמידים מרוצים), ואחר כך כל תלמיד שעוד לא מרוצה
+    מצטרף לגוש של ההעדפה הראשונה שלו שיש בו מקום.
+    :return: מספר הגוש של כל תלמיד והגודל של כל גוש.
+    """
+    size = cohort.size
+    parent = list(range(size))
+    block_size = [1] * size
+
+    def find(index: int) -> int:
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    def union(first: int, second: int) -> bool:
+        root1 = find(first)
+        root2 = find(second)
+        if root1 == root2:
+            return True
+        if block_size[root1] + block_size[root2] > max_block_size:
+            return False
+        if block_size[root1] < block_size[root2]:
+            root1, root2 = root2, root1
+        parent[root2] = root1
+        block_size[root1] += block_size[root2]
+        return True
+
+    preferences = cohort.preferences
+    satisfied = bytearray(size)
+    # 1) העדפות הדדיות (העדפה של תלמיד לעצמו תמיד מתקיימת)
+    for index, preferred in enumerate(preferences):
+        for preference in preferred:
+            if preference == index:
+                satisfied[index] = 1
+            elif preference > index and index in preferences[preference] and union(index, preference):
+                satisfied[index] = satisfied[preference] = 1
+
+    # 2) העדפות חד-כיווניות של מי שעוד לא מרוצה
+    for index, preferred in enumerate(preferences):
+        if not satisfied[index]:
+            for preference in preferred:
+                if union(index, preference):
+                    satisfied[index] = 1
+                    break
+
+    roots = np.fromiter((find(index) for index in range(size)), dtype=np.intp, count=size)
+    _, block_of, sizes = np.unique(roots, return_inverse=True, return_counts=True)
+    return block_of.astype(np.intp), sizes
+
+
+class PreferenceSeeder:
+    """
+    מחולל חלוקות התחלתיות מהירות לאלגוריתמים עם העדפות.
+    הגושים (preference_blocks) נבנים פעם אחת למחזור, וכל חלוקה היא סידור אקראי של הגושים בשורה אחת
+    שנחתכת לקבוצות בגדלים מאוזנים (N // G או אחד יותר). רק גוש שנחתך בגבול בין קבוצות יכול לאבד העדפה.
+    כל החלוקות נוצרות יחד בחישוב וקטורי, בלי לולאה על התלמידים.
+    """
+    def __init__(self, cohort: Cohort, num_groups: int, max_block_size: Optional[int] = None):
+        """
+        :param max_block_size: הגודל המקסימלי של גוש (ברירת מחדל: רבע מגודל הקבוצה, בין MIN_BLOCK_SIZE ל-MAX_BLOCK_SIZE).
+        """
+        self.size = cohort.size
+        self.num_groups = num_groups
+        max_group_size = -(-cohort.size // num_groups)
+        if max_block_size is None:
+            max_block_size = min(MAX_BLOCK_SIZE, max(MIN_BLOCK_SIZE, max_group_size // 4))
+        self.block_of, self.block_sizes = preference_blocks(cohort, max(1, min(max_block_size, max_group_size)))
+
+        # המיקום של כל תלמיד בתוך הגוש שלו
+        order = np.argsort(self.block_of, kind="stable")
+        starts = np.cumsum(self.block_sizes) - self.block_sizes
+        self.rank_in_block = np.empty(self.size, dtype=np.intc)
+        self.rank_in_block[order] = np.arange(self.size) - np.repeat(starts, self.block_sizes)
+
+        # הקבוצה של כל מיקום בשורה: הקבוצות הראשונות גדולות באחד כשהחלוקה לא שווה
+        group_sizes = np.full(num_groups, self.size // num_groups, dtype=np.intp)
+        group_sizes[:self.size % num_groups] += 1
+        self.group_of_position = np.repeat(np.arange(num_groups, dtype=np.intc), group_sizes)
+
+    def sample(self, count: int, rng: random.Random = random) -> np.ndarray:
+        """
+        יוצר count חלוקות.
+        :param rng: המחולל של האלגוריתם, ממנו נגזר זרע למחולל של NumPy (כך שאותו זרע נותן אותן חלוקות).
+        :return: מטריצה של count × N מספרי קבוצות.
+        """
+        generator = np.random.default_rng(rng.getrandbits(64))
+        num_blocks = len(self.block_sizes)
+        permutations = generator.permuted(np.tile(np.arange(num_blocks), (count, 1)), axis=1)
+        sizes = self.block_sizes[permutations]
+        starts = (np.cumsum(sizes, axis=1) - sizes).astype(np.intc)
+        # המיקום בשורה שבו מתחיל כל גוש, לפי מספר הגוש
+        block_starts = np.empty_like(starts)
+        np.put_along_axis(block_starts, permutations, starts, axis=1)
+        positions = block_starts[:, self.block_of] + self.rank_in_block
+        return self.group_of_position[positions]
+
+    def population(self, count: int, rng: random.Random = random) -> List[array]:
+        """
+        יוצר count חלוקות כוקטורי שיוך.
+        """
+        population = []
+        for row in self.sample(count, rng):
+            assignment = array(ASSIGNMENT_TYPECODE)
+            assignment.frombytes(row.tobytes())
+            population.append(assignment)
+        return population
+
+
+def seeder_for(cohort: Cohort, num_groups: int) -> PreferenceSeeder:
+    """
+    מחזיר את מחולל החלוקות של המחזור (נבנה בפעם הראשונה ונשמר כל עוד המחזור קיים).
+    """
+    seeders = _SEEDERS.get(cohort)
+    if seeders is None:
+        seeders = _SEEDERS.setdefault(cohort, {})
+    seeder = seeders.get(num_groups)
+    if seeder is None:
+        seeder = seeders[num_groups] = PreferenceSeeder(cohort, num_groups)
+    return seeder
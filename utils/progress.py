@@ -0,0 +1,48 @@
+from typing import Callable, NamedTuple, Optional, Sequence
+from utils.stopping import StoppingCriteria
+
+
+class ProgressEvent(NamedTuple):
+    """
+    דיווח התקדמות של אלגוריתם אחרי דור / איטרציה.
+    """
+    iteration: int          # מספר הדור / האיטרציה (מ-1)
+    best_fitness: float     # הציון הטוב ביותר עד עכשיו
+    mean_fitness: float     # הציון הממוצע באוכלוסייה / במושבה
+    evaluations: int        # מספר הערכות הכושר מתחילת הריצה
+    elapsed: float          # הזמן שעבר מתחילת הריצה, בשניות
+
+
+ProgressCallback = Callable[[ProgressEvent], None]
+
+
+def print_progress(event: ProgressEvent) -> None:
+    """
+    callback שמדפיס שורה לכל דיווח, כמו ההדפסות המקוריות של האלגוריתמים.
+    """
+    print(f"Iteration {event.iteration}, Best Fitness: {event.best_fitness}")
+
+
+class ProgressReporter:
+    """
+    שולח ProgressEvent ל-callback כל interval דורות, ותמיד בדור שבו הריצה נעצרת מוקדם.
+    בלי callback (ברירת המחדל) לא נוצר שום אירוע ולא מחושב הממוצע, כך שהעלות היא בדיקה אחת לדור.
+    """
+    def __init__(self, callback: Optional[ProgressCallback] = None, interval: int = 1):
+        """
+        :param callback: הפונקציה שמקבלת את האירועים (למשל print_progress, או שליחה למערכת מדדים).
+        :param interval: כל כמה דורות לדווח.
+        """
+        self.callback = callback
+        self.interval = max(1, interval)
+
+    def update(self, iteration: int, best_fitness: float, scores: Sequence[float], stopping: StoppingCriteria, stopped: bool = False) -> None:
+        """
+        נקרא אחרי כל דור, אחרי stopping.update.
+        :param iteration: מספר הדור (מ-0, כמו בלולאה).
+        :param scores: הציונים של האוכלוסייה / המושבה, לחישוב הממוצע.
+        :param stopped: האם הריצה נעצרת אחרי הדור הזה.
+        """
+        if self.callback is None or ((iteration + 1) % self.interval and not stopped):
+            return
+        self.callback(ProgressEvent(iteration + 1, best_fitness, sum(scores) / len(scores), stopping.evaluations, stopping.elapsed))
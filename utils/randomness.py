@@ -0,0 +1,24 @@
+import random
+from typing import List, Union
+
+# זרע לאלגוריתמים: מספר / מחרוזת, אובייקט Random קיים, או None למחולל הגלובלי של המודול random
+Seed = Union[None, int, str, random.Random]
+
+
+def make_rng(seed: Seed = None):
+    """
+    מחזיר מחולל מספרים אקראיים לפי הזרע.
+    None מחזיר את המודול random עצמו (המחולל הגלובלי), כך שקריאה בלי זרע מתנהגת כמו קודם.
+    """
+    if seed is None:
+        return random
+    if isinstance(seed, random.Random):
+        return seed
+    return random.Random(seed)
+
+
+def spawn_seeds(rng, count: int) -> List[int]:
+    """
+    גוזר זרעים בלתי תלויים (למשל לכל תהליך עבודה) מתוך מחולל קיים.
+    """
+    return [rng.getrandbits(64) for _ in range(count)]
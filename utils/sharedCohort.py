@@ -0,0 +1,86 @@
+import weakref
+from multiprocessing import shared_memory
+from typing import NamedTuple, Union
+import numpy as np
+from utils.cohort import Cohort
+from utils.cohortLayout import CohortCounts, layout, pack_cohort, unpack_cohort, write_sections
+
+
+class SharedCohortHandle(NamedTuple):
+    """
+    מה שנשלח לתהליכי העבודה במקום המחזור עצמו: שם המקטע המשותף והגדלים שלו (כמה עשרות בתים).
+    """
+    name: str
+    counts: CohortCounts
+
+
+class SharedCohort:
+    """
+    עותק אחד של המערכים של מחזור (ציונים, קריטריונים, העדפות, מזהים ושמות) בזיכרון משותף,
+    שתהליכי עבודה מתחברים אליו דרך attach_cohort במקום לקבל עותק של רשימת התלמידים.
+
+    התהליך שיצר את המקטע הוא הבעלים שלו ומשחרר אותו ב-close (או ביציאה מבלוק with).
+    אם התהליך קורס לפני כן, המקטע משוחרר ביציאה מהמפרש או על ידי ה-resource tracker של multiprocessing.
+    """
+    def __init__(self, cohort: Cohort):
+        counts, data = pack_cohort(cohort)
+        self._memory = shared_memory.SharedMemory(create=True, size=max(1, layout(counts)[1]))
+        self._finalizer = weakref.finalize(self, _release, self._memory)
+        write_sections(self._memory.buf, counts, data)
+        self.handle = SharedCohortHandle(self._memory.name, counts)
+
+    def close(self) -> None:
+        """
+        משחרר את המקטע המשותף. תהליכים שעדיין מחוברים אליו ממשיכים לראות את הזיכרון עד שהם מסיימים.
+        """
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _release(memory: shared_memory.SharedMemory) -> None:
+    memory.close()
+    try:
+        memory.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    array.flags.writeable = False
+    return array
+
+
+def attach_cohort(source: Union[Cohort, SharedCohortHandle]) -> Cohort:
+    """
+    מתחבר למחזור משותף ובונה ממנו מחזור שהמערכים הבסיסיים שלו (ציונים, ערכי קריטריונים, העדפות ומזהים)
+    הם views של NumPy לקריאה בלבד על הזיכרון המשותף. מחזור רגיל מוחזר כמו שהוא, כך שאפשר להעביר לתהליכי העבודה כל אחד מהשניים.
+    """
+    if isinstance(source, Cohort):
+        return source
+
+    # תהליכי העבודה חולקים את ה-resource tracker של התהליך שיצר אותם, כך שהרישום הנוסף כאן לא משנה מי משחרר את המקטע
+    memory = shared_memory.SharedMemory(name=source.name)
+
+    def view(typecode: str, offset: int, length: int) -> np.ndarray:
+        return _read_only(np.ndarray((length,), dtype=np.dtype(typecode), buffer=memory.buf, offset=offset))
+
+    cohort = unpack_cohort(source.counts, view)
+    # ה-views מחזיקים את המקטע פתוח כל עוד המחזור קיים, והמחזור נשלח הלאה כמזהה המקטע
+    cohort._shared_memory = memory
+    cohort._reopen = (attach_cohort, (source,))
+    return cohort
+
+
+def criteria_matrix(cohort: Cohort) -> np.ndarray:
+    """
+    מטריצת הקריטריונים הגולמיים (תלמידים × קריטריונים). במחזור משותף זה view על הזיכרון המשותף, בלי העתקה.
+    """
+    num_criteria = len(cohort.criteria_names)
+    if not num_criteria:
+        return np.zeros((cohort.size, 0))
+    return np.asarray(cohort.criteria_values, dtype=np.float64).reshape(cohort.size, num_criteria)
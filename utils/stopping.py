@@ -0,0 +1,133 @@
+import math
+import time
+from itertools import count
+from typing import Callable, Optional
+
+# הסיבות האפשריות לעצירה
+STOP_ITERATIONS = "iterations"
+STOP_TIME_BUDGET = "time_budget"
+STOP_MAX_EVALUATIONS = "max_evaluations"
+STOP_PATIENCE = "patience"
+STOP_TARGET = "target"
+STOP_CANCELLED = "cancelled"
+
+
+class StoppingCriteria:
+    """
+    תנאי עצירה לאלגוריתמים: תקציב זמן, מספר הערכות מקסימלי, סבלנות (דורות בלי שיפור) וציון יעד.
+    האלגוריתם קורא ל-start בתחילת הריצה ול-update אחרי כל דור / איטרציה, ועוצר ברגע ש-update מחזיר סיבה.
+    בסוף הריצה הסיבה נשמרת ב-reason (או "iterations" אם הריצה הגיעה למספר הדורות שהתבקש),
+    יחד עם מספר הדורות, מספר ההערכות, הזמן שעבר והציון הטוב ביותר.
+    האלגוריתמים מחזירים את הסיבה יחד עם הקבוצות כשמעבירים להם return_reason=True, גם כשהאובייקט נוצר בתוכם.
+    """
+    def __init__(self, time_budget: Optional[float] = None, max_evaluations: Optional[int] = None,
+                 patience: Optional[int] = None, target_fitness: Optional[float] = None, min_delta: float = 0.0,
+                 cancelled: Optional[Callable[[], bool]] = None):
+        """
+        :param time_budget: זמן מקסימלי בשניות.
+        :param max_evaluations: מספר הערכות כושר מקסימלי (כולל הערכות שנענו מהמטמון).
+        :param patience: כמה דורות / איטרציות ברצף בלי שיפור עד לעצירה.
+        :param target_fitness: עצירה ברגע שהציון הטוב ביותר מגיע לערך הזה.
+        :param min_delta: שיפור קטן מזה לא נחשב שיפור לעניין הסבלנות.
+        :param cancelled: פונקציה שנבדקת אחרי כל דור ומחזירה True כשהריצה בוטלה מבחוץ (למשל בקשה שבוטלה בשירות).
+        """
+        self.time_budget = time_budget
+        self.max_evaluations = max_evaluations
+        self.patience = patience
+        self.target_fitness = target_fitness
+        self.min_delta = min_delta
+        self.cancelled = cancelled
+        self.start()
+
+    @property
+    def bounded(self) -> bool:
+        """
+        האם יש תנאי שמבטיח שהריצה תיעצר גם בלי מספר דורות (ציון יעד לבד לא מבטיח).
+        """
+        return self.time_budget is not None or self.max_evaluations is not None or self.patience is not None
+
+    def start(self) -> None:
+        """
+        מאפס את המצב לתחילת ריצה.
+        """
+        self.start_time = time.perf_counter()
+        self.iterations = 0
+        self.evaluations = 0
+        self.best_fitness = -math.inf
+        self.stale_iterations = 0
+        self.reason: Optional[str] = None
+
+    @property
+    def elapsed(self) -> float:
+        """
+        הזמן שעבר מתחילת הריצה, בשניות.
+        """
+        return time.perf_counter() - self.start_time
+
+    def add_evaluations(self, amount: int) -> None:
+        """
+        מוסיף הערכות שנעשו מחוץ לדורות (למשל האוכלוסייה הראשונית).
+        """
+        self.evaluations += amount
+
+    def update(self, best_fitness: float, evaluations: int = 0) -> Optional[str]:
+        """
+        מעדכן את המצב אחרי דור / איטרציה.
+        :param best_fitness: הציון הטוב ביותר עד עכשיו.
+        :param evaluations: מספר ההערכות שנעשו בדור הזה.
+        :return: סיבת העצירה, או None כדי להמשיך.
+        """
+        self.iterations += 1
+        self.evaluations += evaluations
+        if best_fitness > self.best_fitness + self.min_delta:
+            self.stale_iterations = 0
+        else:
+            self.stale_iterations += 1
+        self.best_fitness = max(self.best_fitness, best_fitness)
+
+        if self.cancelled is not None and self.cancelled():
+            self.reason = STOP_CANCELLED
+        elif self.target_fitness is not None and self.best_fitness >= self.target_fitness:
+            self.reason = STOP_TARGET
+        elif self.time_budget is not None and self.elapsed >= self.time_budget:
+            self.reason = STOP_TIME_BUDGET
+        elif self.max_evaluations is not None and self.evaluations >= self.max_evaluations:
+            self.reason = STOP_MAX_EVALUATIONS
+        elif self.patience is not None and self.stale_iterations >= self.patience:
+            self.reason = STOP_PATIENCE
+        return self.reason
+
+    def get_state(self) -> tuple:
+        """
+        המצב של הריצה לנקודת שמירה (ראו utils/checkpoint): דורות, הערכות, ציון טוב ביותר, סבלנות, סיבה וזמן שעבר.
+        """
+        return self.iterations, self.evaluations, self.best_fitness, self.stale_iterations, self.reason, self.elapsed
+
+    def set_state(self, state: tuple) -> None:
+        """
+        משחזר מצב מ-get_state. הזמן שעבר נספר מחדש מעכשיו, כך שתקציב הזמן כולל את הריצה שלפני השמירה.
+        """
+        self.iterations, self.evaluations, self.best_fitness, self.stale_iterations, self.reason, elapsed = state
+        self.start_time = time.perf_counter() - elapsed
+
+    def finish(self) -> str:
+        """
+        נקרא בסוף הריצה. אם אף תנאי לא עצר אותה, הסיבה היא שהריצה הגיעה למספר הדורות.
+        """
+        if self.reason is None:
+            self.reason = STOP_ITERATIONS
+        return self.reason
+
+
+def iteration_range(iterations: Optional[int], stopping: Optional[StoppingCriteria], start: int = 0):
+    """
+    הטווח של לולאת הדורות. iterations=None אפשרי רק עם תנאי עצירה שמבטיח סיום (זמן, הערכות או סבלנות).
+    :param start: הדור הראשון (בהמשך מנקודת שמירה). ריצה שכבר נעצרה לפני השמירה לא ממשיכה.
+    """
+    if stopping is not None and stopping.reason is not None:
+        return range(0)
+    if iterations is not None:
+        return range(start, iterations)
+    if stopping is None or not stopping.bounded:
+        raise ValueError("An iteration count is required unless a time budget, max evaluations or patience is set")
+    return count(start)
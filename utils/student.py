@@ -1,7 +1,19 @@
+from typing import List, Tuple
+
+# מקדם הנרמול של כל סוג קריטריון לסקאלה של 0-100
+CRITERIA_SCALES = {
+    "0-1": 100,
+    "0-10": 10,
+    "0-100": 1
+}
+
 class Student:
     """
     מחלקה לייצוג סטודנט, הכוללת נתונים כמו מזהה, שם, העדפות וקריטריונים לחישוב ציון.
+    הציון המנורמל של כל קריטריון והציון הכולל מחושבים פעם אחת בטעינה ונשמרים בשדות.
     """
+    __slots__ = ("id", "name", "preferences", "_criteria", "_criteria_vector", "_score")
+
     def __init__(self, student_data: dict):
         """
         אתחול אובייקט סטודנט.
@@ -14,29 +26,54 @@ class Student:
         """
         self.id = student_data.get("id")
         self.name = student_data.get("name")
-        self.preferences = student_data.get("preferences", [])  
+        self.preferences = student_data.get("preferences", [])
         self.criteria = student_data.get("criteria", [])
 
+    @property
+    def criteria(self) -> Tuple[dict, ...]:
+        """
+        הקריטריונים של הסטודנט (לקריאה בלבד, לעדכון יש להציב רשימה חדשה).
+        """
+        return self._criteria
+
+    @criteria.setter
+    def criteria(self, criteria: List[dict]) -> None:
+        """
+        מחליף את הקריטריונים ומחשב מחדש את הציון השמור.
+        """
+        self._criteria = tuple(criteria)
+        self.invalidate_score()
+
+    def invalidate_score(self) -> None:
+        """
+        מחשב מחדש את הציונים השמורים מתוך הקריטריונים.
+        יש לקרוא לה אם אחד ממילוני הקריטריונים שונה במקום.
+        """
+        self._criteria_vector = tuple(
+            float(criteria.get("value", 0)) * CRITERIA_SCALES.get(criteria.get("type"), 0)
+            for criteria in self._criteria
+        )
+
+        # חישוב הציון הכולל לפי סדר הקריטריונים
+        total_score = 0.0
+        for value in self._criteria_vector:
+            total_score += value
+        self._score = total_score
+
+    @property
+    def criteria_vector(self) -> Tuple[float, ...]:
+        """
+        הציון המנורמל (0-100) של כל קריטריון, לפי סדר הקריטריונים.
+        """
+        return self._criteria_vector
+
     def get_score(self) -> float:
         """
-        מחשב את הציון הכולל של הסטודנט על בסיס הקריטריונים.
+        מחזיר את הציון הכולל של הסטודנט על בסיס הקריטריונים.
 
         :return: הציון הכולל (float).
         """
-        total_score = 0.0
-        for criteria in self.criteria:
-            criteria_type = criteria.get("type")
-            value = float(criteria.get("value", 0))
-
-            # חישוב הציון לפי סוג הקריטריון
-            if criteria_type == "0-1":
-                total_score += value * 100
-            elif criteria_type == "0-10":
-                total_score += value * 10
-            elif criteria_type == "0-100":
-                total_score += value
-
-        return total_score
+        return self._score
 
     def __repr__(self):
         """
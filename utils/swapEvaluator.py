@@ -0,0 +1,277 @@
+import math
+from array import array
+from typing import List, Sequence, Tuple
+from utils.cohort import ASSIGNMENT_TYPECODE, Cohort, sample_stdev
+from utils.fitnessCache import combine_group_keys, mix, student_keys
+
+
+class SwapEvaluator:
+    """
+    מחזיק וקטור שיוך יחד עם סכומים רצים לכל קבוצה (סכום, סכום ריבועים, גודל) ומונה העדפות לכל תלמיד,
+    כך שאפשר לחשב את ציון הגיוון המדויק אחרי החלפה של שני תלמידים בלי לחשב מחדש את כל הפתרון.
+    עלות הערכת החלפה היא O(G + deg(a) + deg(b)) - מספר הקבוצות ועוד מספר התלמידים שמעדיפים את שני התלמידים,
+    ללא תלות במספר התלמידים הכולל.
+    """
+    def __init__(self, cohort: Cohort, assignment: Sequence[int], num_groups: int, with_preferences: bool = False):
+        """
+        :param cohort: המחזור שעליו מחושב הציון.
+        :param assignment: וקטור השיוך ההתחלתי (מועתק).
+        :param num_groups: מספר הקבוצות.
+        :param with_preferences: האם לכלול את ניקוד ההעדפות בציון.
+        """
+        self.cohort = cohort
+        self.num_groups = num_groups
+        self.with_preferences = with_preferences
+        self.assignment = array(ASSIGNMENT_TYPECODE, assignment)
+
+        # הציונים מוזזים בממוצע הכללי כדי לצמצם שגיאות עיגול בנוסחת סכום הריבועים
+        self._scores = cohort.centered_scores
+        self._preferred_by = cohort.preferred_by
+        self._keys = student_keys(cohort.size)
+
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """
+        מחשב מחדש את כל הסכומים הרצים מתוך וקטור השיוך (למשל אחרי שינוי ידני שלו).
+        """
+        num_groups = self.num_groups
+        assignment = self.assignment
+        self.sums = [0.0] * num_groups
+        self.squares = [0.0] * num_groups
+        # רשימת חברי כל קבוצה ומיקום כל תלמיד ברשימה, לבחירה והחלפה ב-O(1)
+        self.members = [[] for _ in range(num_groups)]
+        self.positions = array("i", [0]) * len(assignment)
+        for index, group_index in enumerate(assignment):
+            score = self._scores[index]
+            self.sums[group_index] += score
+            self.squares[group_index] += score * score
+            self.positions[index] = len(self.members[group_index])
+            self.members[group_index].append(index)
+
+        self.diversities = [self._group_diversity(self.sums[g], self.squares[g], len(self.members[g])) for g in range(num_groups)]
+
+        # המפתח הקנוני של הפתרון (ראו fitnessCache.assignment_key), מתעדכן בכל החלפה ב-O(1)
+        self.group_keys = [0] * num_groups
+        for index, group_index in enumerate(assignment):
+            self.group_keys[group_index] += self._keys[index]
+        self.key = combine_group_keys(self.group_keys)
+
+        # כמה מההעדפות של כל תלמיד נמצאות בקבוצה שלו, וכמה תלמידים מרוצים (לפחות העדפה אחת)
+        self.hits = array("i", [0]) * len(assignment)
+        self.satisfied = 0
+        if self.with_preferences:
+            for index, preferences in enumerate(self.cohort.preferences):
+                group_index = assignment[index]
+                count = sum(1 for preference in preferences if assignment[preference] == group_index)
+                self.hits[index] = count
+                if count:
+                    self.satisfied += 1
+
+        self.fitness = self._combine(self.diversities)
+
+    @staticmethod
+    def _group_diversity(total: float, squares: float, count: int) -> float:
+        """
+        סטיית תקן מדגמית של קבוצה מתוך הסכום וסכום הריבועים שלה.
+        """
+        if count < 2:
+            return 0.0
+        variance = (squares - total * total / count) / (count - 1)
+        return math.sqrt(variance) if variance > 0 else 0.0
+
+    def _combine(self, diversities: List[float]) -> float:
+        """
+        ממוצע הגיוון פחות השונות בין הקבוצות, ועוד ניקוד ההעדפות.
+        """
+        total_score = sum(diversities) / self.num_groups - sample_stdev(diversities)
+        if self.with_preferences:
+            total_score += self.satisfied
+        return total_score
+
+    def _swap_effect(self, a: int, b: int) -> Tuple[float, float, int, dict]:
+        """
+        מחשב את השפעת ההחלפה בין התלמידים a ו-b בלי לשנות את המצב.
+        :return: הגיוון החדש של שתי הקבוצות, השינוי במספר המרוצים והערכי hits החדשים.
+        """
+        assignment = self.assignment
+        group_a = assignment[a]
+        group_b = assignment[b]
+        difference = self._scores[b] - self._scores[a]
+        square_difference = self._scores[b] ** 2 - self._scores[a] ** 2
+        size_a = len(self.members[group_a])
+        size_b = len(self.members[group_b])
+        diversity_a = self._group_diversity(self.sums[group_a] + difference, self.squares[group_a] + square_difference, size_a)
+        diversity_b = self._group_diversity(self.sums[group_b] - difference, self.squares[group_b] - square_difference, size_b)
+
+        new_hits = {}
+        satisfied_delta = 0
+        if self.with_preferences:
+            hits = self.hits
+            # מי שמעדיף את a או את b מרוויח או מפסיד פגיעה לפי הקבוצה שלו
+            for moved, source, target in ((a, group_a, group_b), (b, group_b, group_a)):
+                for index in self._preferred_by[moved]:
+                    if index == a or index == b:
+                        continue
+                    group_index = assignment[index]
+                    if group_index == source:
+                        new_hits[index] = new_hits.get(index, hits[index]) - 1
+                    elif group_index == target:
+                        new_hits[index] = new_hits.get(index, hits[index]) + 1
+
+            # a ו-b עצמם: סופרים מחדש את ההעדפות שלהם בקבוצה החדשה
+            for moved, other, target in ((a, b, group_b), (b, a, group_a)):
+                count = 0
+                for preference in self.cohort.preferences[moved]:
+                    if preference == moved:
+                        count += 1
+                    elif preference != other and assignment[preference] == target:
+                        count += 1
+                new_hits[moved] = count
+
+            for index, count in new_hits.items():
+                satisfied_delta += (count > 0) - (hits[index] > 0)
+
+        return diversity_a, diversity_b, satisfied_delta, new_hits
+
+    def swap_key(self, a: int, b: int) -> int:
+        """
+        מחזיר את המפתח הקנוני של הפתרון שיתקבל אם נחליף את התלמידים a ו-b (בלי לבצע את ההחלפה).
+        """
+        group_a = self.assignment[a]
+        group_b = self.assignment[b]
+        if group_a == group_b:
+            return self.key
+        difference = self._keys[b] - self._keys[a]
+        old_a = self.group_keys[group_a]
+        old_b = self.group_keys[group_b]
+        return (self.key - mix(old_a) - mix(old_b) + mix(old_a + difference) + mix(old_b - difference)) & ((1 << 64) - 1)
+
+    def swap_fitness(self, a: int, b: int) -> float:
+        """
+        מחזיר את הציון המדויק שיתקבל אם נחליף את הקבוצות של התלמידים a ו-b (בלי לבצע את ההחלפה).
+        """
+        group_a = self.assignment[a]
+        group_b = self.assignment[b]
+        if group_a == group_b:
+            return self.fitness
+        diversity_a, diversity_b, satisfied_delta, _ = self._swap_effect(a, b)
+        diversities = self.diversities[:]
+        diversities[group_a] = diversity_a
+        diversities[group_b] = diversity_b
+        total_score = sum(diversities) / self.num_groups - sample_stdev(diversities)
+        if self.with_preferences:
+            total_score += self.satisfied + satisfied_delta
+        return total_score
+
+    def diversity_moments(self) -> Tuple[float, float]:
+        """
+        סכום הגיוונים וסכום ריבועי הגיוונים של כל הקבוצות, עבור swap_fitness_from_moments.
+        """
+        return sum(self.diversities), sum(diversity * diversity for diversity in self.diversities)
+
+    def swap_fitness_from_moments(self, a: int, b: int, moments: Tuple[float, float]) -> float:
+        """
+        כמו swap_fitness, אבל ממוצע הגיוון וסטיית התקן בין הקבוצות מחושבים מהסכומים שב-moments ב-O(1)
+        במקום מעבר על כל הקבוצות. מיועד לסריקת שכנים שלמה (חיפוש מקומי), שבה moments מחושב פעם אחת לכל צעד.
+        התוצאה יכולה להיות שונה מ-swap_fitness בשגיאת עיגול קטנה.
+        """
+        group_a = self.assignment[a]
+        group_b = self.assignment[b]
+        if group_a == group_b:
+            return self.fitness
+        diversity_a, diversity_b, satisfied_delta, _ = self._swap_effect(a, b)
+        old_a = self.diversities[group_a]
+        old_b = self.diversities[group_b]
+        total = moments[0] - old_a - old_b + diversity_a + diversity_b
+        squares = moments[1] - old_a * old_a - old_b * old_b + diversity_a * diversity_a + diversity_b * diversity_b
+        num_groups = self.num_groups
+        total_score = total / num_groups
+        if num_groups > 1:
+            variance = (squares - total * total / num_groups) / (num_groups - 1)
+            total_score -= math.sqrt(variance) if variance > 0 else 0.0
+        if self.with_preferences:
+            total_score += self.satisfied + satisfied_delta
+        return total_score
+
+    def apply_swap(self, a: int, b: int) -> float:
+        """
+        מבצע את ההחלפה בין התלמידים a ו-b ומעדכן את הסכומים הרצים.
+        :return: הציון החדש.
+        """
+        assignment = self.assignment
+        group_a = assignment[a]
+        group_b = assignment[b]
+        if group_a == group_b:
+            return self.fitness
+
+        diversity_a, diversity_b, satisfied_delta, new_hits = self._swap_effect(a, b)
+        difference = self._scores[b] - self._scores[a]
+        square_difference = self._scores[b] ** 2 - self._scores[a] ** 2
+        self.sums[group_a] += difference
+        self.squares[group_a] += square_difference
+        self.sums[group_b] -= difference
+        self.squares[group_b] -= square_difference
+        self.diversities[group_a] = diversity_a
+        self.diversities[group_b] = diversity_b
+
+        for index, count in new_hits.items():
+            self.hits[index] = count
+        self.satisfied += satisfied_delta
+
+        self.key = self.swap_key(a, b)
+        key_difference = self._keys[b] - self._keys[a]
+        self.group_keys[group_a] += key_difference
+        self.group_keys[group_b] -= key_difference
+
+        # עדכון רשימות החברים: כל תלמיד תופס את המקום של השני
+        position_a = self.positions[a]
+        position_b = self.positions[b]
+        self.members[group_a][position_a] = b
+        self.members[group_b][position_b] = a
+        self.positions[a] = position_b
+        self.positions[b] = position_a
+        assignment[a] = group_b
+        assignment[b] = group_a
+
+        self.fitness = self._combine(self.diversities)
+        return self.fitness
+
+    def get_state(self) -> Tuple[array, array, array, array, array]:
+        """
+        המצב של הפתרון לנקודת שמירה: רשימות החברים (ברצף, עם גודל כל קבוצה) והסכומים הרצים.
+        הסכומים נשמרים כמו שהם ולא מחושבים מחדש, כי אחרי הרבה החלפות הם שונים מחישוב מחדש בשגיאת עיגול,
+        וגם סדר החברים משפיע על בחירת השכנים, כך שפתרון משוחזר ממשיך בדיוק כמו המקורי.
+        """
+        order = array("i")
+        for members in self.members:
+            order.extend(members)
+        return order, array("i", (len(members) for members in self.members)), array("d", self.sums), array("d", self.squares), array("d", self.diversities)
+
+    @classmethod
+    def from_state(cls, cohort: Cohort, num_groups: int, with_preferences: bool, state: Tuple[array, array, array, array, array]) -> "SwapEvaluator":
+        """
+        משחזר פתרון מ-get_state.
+        """
+        order, sizes, sums, squares, diversities = state
+        members = []
+        start = 0
+        for size in sizes:
+            members.append(list(order[start:start + size]))
+            start += size
+
+        assignment = array(ASSIGNMENT_TYPECODE, [0]) * cohort.size
+        for group_index, group in enumerate(members):
+            for index in group:
+                assignment[index] = group_index
+        # המפתחות ומוני ההעדפות הם מספרים שלמים ולכן מחושבים מחדש בדיוק, והשאר נלקח מהמצב השמור
+        solution = cls(cohort, assignment, num_groups, with_preferences)
+        solution.members = members
+        for group in members:
+            for position, index in enumerate(group):
+                solution.positions[index] = position
+        solution.sums = list(sums)
+        solution.squares = list(squares)
+        solution.diversities = list(diversities)
+        solution.fitness = solution._combine(solution.diversities)
+        return solution
@@ -0,0 +1,110 @@
+import random
+from array import array
+from typing import List, Sequence
+from utils.cohort import UNASSIGNED, Cohort, group_sizes
+
+# החלק מהתלמידים שמוחלפים בכל עותק מופרע של החלוקה הקודמת (לפחות החלפה אחת)
+DEFAULT_PERTURBATION = 0.05
+
+
+def _student_id(student):
+    """
+    המזהה של תלמיד בחלוקה קודמת: אובייקט Student או המזהה עצמו (למשל חלוקה שנשמרה כ-JSON).
+    """
+    return getattr(student, "id", student)
+
+
+class WarmStart:
+    """
+    פתרון התחלתי מחלוקה קודמת (למשל התוצאה של השבוע שעבר) אחרי שינוי קטן ברשימת התלמידים.
+    המחזור הוא הרשימה החדשה, וההפרש נגזר ממנה: תלמידים מהחלוקה הקודמת שכבר לא במחזור עזבו,
+    ותלמידים במחזור שלא הופיעו בחלוקה הקודמת הצטרפו.
+    החלוקה מתוקנת לחלוקה מאוזנת (כל קבוצה בגודל N // G או אחד יותר) בכמה שפחות העברות,
+    והאוכלוסייה / המושבה ההתחלתית היא החלוקה המתוקנת ועותקים מופרעים שלה בכמה החלפות אקראיות.
+    """
+    def __init__(self, cohort: Cohort, previous_groups: Sequence[Sequence], num_groups: int, perturbation: float = DEFAULT_PERTURBATION):
+        """
+        :param previous_groups: החלוקה הקודמת - רשימת קבוצות של תלמידים או של מזהים.
+                                קבוצות מעבר ל-num_groups מתפרקות ותלמידיהן משובצים מחדש.
+        :param perturbation: החלק מהתלמידים שמוחלפים בכל עותק מופרע.
+        :raises ValueError: אם תלמיד מופיע בחלוקה הקודמת יותר מפעם אחת.
+        """
+        self.cohort = cohort
+        self.num_groups = num_groups
+        self.swaps = max(1, round(perturbation * cohort.size))
+
+        assignment = cohort.new_assignment()
+        seen = set()
+        self.removed = []
+        for group_index, group in enumerate(previous_groups):
+            for student in group:
+                student_id = _student_id(student)
+                if student_id in seen:
+                    raise ValueError(f"Student {student_id} appears more than once in the previous grouping")
+                seen.add(student_id)
+                index = cohort.index_of.get(student_id)
+                if index is None:
+                    self.removed.append(student_id)
+                elif group_index < num_groups:
+                    assignment[index] = group_index
+        self.added = [cohort.ids[index] for index in range(cohort.size) if cohort.ids[index] not in seen]
+        self.assignment = self._repair(assignment)
+
+    def _links(self, index: int, assignment: array, group_index: int) -> int:
+        """
+        מספר קשרי ההעדפה (לשני הכיוונים) בין תלמיד לתלמידי קבוצה.
+        """
+        return (sum(1 for other in self.cohort.preferences[index] if other != index and assignment[other] == group_index)
+                + sum(1 for other in self.cohort.preferred_by[index] if other != index and assignment[other] == group_index))
+
+    def _repair(self, assignment: array) -> array:
+        """
+        מתקן את החלוקה לחלוקה מאוזנת. הקבוצות הגדולות ביותר מקבלות את הגודל N // G + 1, כך שמעבירים כמה שפחות תלמידים.
+        מקבוצה גדולה מדי יוצאים התלמידים עם הכי מעט קשרי העדפה לקבוצה, וכל תלמיד שצריך שיבוץ (חדש או שהוצא)
+        נכנס לקבוצה החסרה שבה יש לו הכי הרבה קשרי העדפה. שוויון נשבר לפי הסדר, כך שהתיקון דטרמיניסטי.
+        """
+        num_groups = self.num_groups
+        sizes = group_sizes(assignment, num_groups)
+        by_size = sorted(range(num_groups), key=lambda group_index: -sizes[group_index])
+        targets = [self.cohort.size // num_groups] * num_groups
+        for group_index in by_size[:self.cohort.size % num_groups]:
+            targets[group_index] += 1
+
+        pending = [index for index in range(self.cohort.size) if assignment[index] == UNASSIGNED]
+        for group_index in range(num_groups):
+            excess = sizes[group_index] - targets[group_index]
+            if excess > 0:
+                members = [index for index in range(self.cohort.size) if assignment[index] == group_index]
+                members.sort(key=lambda index: self._links(index, assignment, group_index))
+                for index in members[:excess]:
+                    assignment[index] = UNASSIGNED
+                    pending.append(index)
+                sizes[group_index] = targets[group_index]
+
+        for index in pending:
+            open_groups = [group_index for group_index in range(num_groups) if sizes[group_index] < targets[group_index]]
+            group_index = max(open_groups, key=lambda group_index: (self._links(index, assignment, group_index), targets[group_index] - sizes[group_index]))
+            assignment[index] = group_index
+            sizes[group_index] += 1
+        return assignment
+
+    def perturb(self, rng: random.Random = random) -> array:
+        """
+        עותק של החלוקה המתוקנת עם self.swaps החלפות אקראיות בין תלמידים מקבוצות שונות (הגדלים נשמרים).
+        """
+        assignment = self.assignment[:]
+        if self.num_groups < 2 or self.cohort.size < 2:
+            return assignment
+        size = self.cohort.size
+        for _ in range(self.swaps):
+            first = rng.randrange(size)
+            second = rng.randrange(size)
+            if assignment[first] != assignment[second]:
+                assignment[first], assignment[second] = assignment[second], assignment[first]
+        return assignment
+
+    def population(self, count: int, rng: random.Random = random) -> List[array]:
+        """
+        אוכלוסייה / מושבה התחלתית: החלוקה המתוקנת עצמה ו-count - 1 עותקים מופרעים שלה.
+        """
+        return [self.assignment[:]] + [self.perturb(rng) for _ in range(count - 1)]